@@ -6,7 +6,7 @@ from django.http import HttpRequest
 from django.http import HttpResponse
 from django.shortcuts import redirect
 
-from .models import User
+from .user_cache import resolve_user
 
 
 def require_auth(view_func: Callable[..., HttpResponse]) -> Callable[..., HttpResponse]:
@@ -16,9 +16,8 @@ def require_auth(view_func: Callable[..., HttpResponse]) -> Callable[..., HttpRe
         if not user_id:
             return redirect("/authentication/login/")
 
-        try:
-            user = User.objects.get(id=user_id)
-        except User.DoesNotExist:
+        user = resolve_user(request)
+        if user is None:
             request.session.flush()
             return redirect("/authentication/login/")
 
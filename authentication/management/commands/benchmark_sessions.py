@@ -0,0 +1,77 @@
+import statistics
+import time
+import uuid
+from http import HTTPStatus
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+
+from authentication.models import User
+
+BENCHMARK_PASSWORD = "benchmark-password"
+
+
+class Command(BaseCommand):
+    help = "Compare login and authenticated page latency across the configured session engines."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--logins", type=int, default=50)
+        parser.add_argument("--views", type=int, default=200)
+        parser.add_argument("--path", default="/authentication/profile/", help="Authenticated page to request.")
+        parser.add_argument("--engines", nargs="*", default=list(settings.SESSION_ENGINES))
+
+    def handle(self, *args, **options):
+        # A fast hasher keeps password hashing from drowning out the session cost being measured.
+        with override_settings(
+            PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+            ALLOWED_HOSTS=["testserver"],
+        ):
+            email = f"session-benchmark-{uuid.uuid4().hex[:8]}@example.com"
+            user = User.objects.create_user(email, BENCHMARK_PASSWORD)
+            try:
+                for name in options["engines"]:
+                    with override_settings(SESSION_ENGINE=settings.SESSION_ENGINES[name]):
+                        self.run_engine(name, email, options)
+            finally:
+                user.delete()
+
+    def run_engine(self, name: str, email: str, options: dict):
+        login_times = []
+        client = Client()
+        for _ in range(options["logins"]):
+            client = Client()
+            started = time.perf_counter()
+            response = client.post("/authentication/login/", {"email": email, "password": BENCHMARK_PASSWORD})
+            login_times.append((time.perf_counter() - started) * 1000)
+            if response.status_code != HTTPStatus.FOUND:
+                self.stderr.write(f"{name}: login failed with status {response.status_code}")
+                return
+
+        view_times = []
+        queries = 0
+
+        def count_queries(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count_queries):
+            for _ in range(options["views"]):
+                started = time.perf_counter()
+                client.get(options["path"])
+                view_times.append((time.perf_counter() - started) * 1000)
+        client.post("/authentication/logout/")
+
+        self.stdout.write(
+            f"{name:>15}: login p50={statistics.median(login_times):.2f}ms p95={self.p95(login_times):.2f}ms | "
+            f"{options['path']} p50={statistics.median(view_times):.2f}ms p95={self.p95(view_times):.2f}ms "
+            f"queries/view={queries / options['views']:.1f}"
+        )
+
+    @staticmethod
+    def p95(values: list[float]) -> float:
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
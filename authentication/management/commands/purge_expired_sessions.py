@@ -0,0 +1,43 @@
+import time
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+DB_BACKED_ENGINES = (
+    "django.contrib.sessions.backends.db",
+    "django.contrib.sessions.backends.cached_db",
+)
+
+
+class Command(BaseCommand):
+    help = "Delete expired rows from django_session in small batches, so the purge never holds long locks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--sleep", type=float, default=0.0, help="Seconds to pause between batches.")
+
+    def handle(self, *args, **options):
+        if settings.SESSION_ENGINE not in DB_BACKED_ENGINES:
+            self.stdout.write(f"{settings.SESSION_ENGINE} does not store sessions in the database, nothing to purge.")
+            return
+
+        table = connection.ops.quote_name(Session._meta.db_table)
+        now = timezone.now()
+        total = 0
+        while True:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"DELETE FROM {table} WHERE session_key IN (SELECT session_key FROM {table} WHERE expire_date < %s LIMIT %s)",
+                    [now, options["batch_size"]],
+                )
+                deleted = cursor.rowcount
+            total += deleted
+            if deleted < options["batch_size"]:
+                break
+            if options["sleep"]:
+                time.sleep(options["sleep"])
+
+        self.stdout.write(f"Purged {total} expired sessions.")
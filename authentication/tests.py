@@ -1 +1,56 @@
-# Create your tests here.
+from http import HTTPStatus
+
+from django.contrib.auth.hashers import make_password
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from tracker.tests import VIEW_BUDGET_SETTINGS
+from tracker.tests import ViewBudget
+from tracker.tests import ViewBudgetMixin
+
+from .models import User
+
+PASSWORD = "budget-password"
+
+
+# The budgets cover the views, not the deliberately slow production password hash.
+@override_settings(**VIEW_BUDGET_SETTINGS, PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class AuthenticationViewBudgetTests(ViewBudgetMixin, TestCase):
+    urlconf = "authentication.urls"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(
+            email="budget@example.com", password=make_password(PASSWORD), age=30, height=180, goal="Stay within budget"
+        )
+
+    def budgets(self) -> list[ViewBudget]:
+        found = HTTPStatus.FOUND
+        profile = {"age": "31", "height": "181", "goal": "Still within budget"}
+        return [
+            ViewBudget(reverse("register"), queries=0),
+            ViewBudget(
+                reverse("register"),
+                queries=12,
+                method="post",
+                data={"email": "new@example.com", "password": PASSWORD, **profile},
+                status=found,
+            ),
+            ViewBudget(reverse("login"), queries=0),
+            ViewBudget(
+                reverse("login"), queries=11, method="post", data={"email": self.user.email, "password": PASSWORD}, status=found
+            ),
+            ViewBudget(reverse("logout"), queries=3, method="post", status=found),
+            ViewBudget(reverse("profile"), queries=5),
+            ViewBudget(reverse("profile_edit"), queries=5),
+            ViewBudget(reverse("profile_edit"), queries=7, method="post", data=profile, status=found),
+            ViewBudget(reverse("profile_password"), queries=5),
+            ViewBudget(
+                reverse("profile_password"),
+                queries=13,
+                method="post",
+                data={"current_password": PASSWORD, "new_password": "another-budget-password"},
+                status=found,
+            ),
+        ]
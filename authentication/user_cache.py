@@ -0,0 +1,86 @@
+import time
+
+from django.conf import settings
+from django.contrib.sessions.backends.base import SessionBase
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpRequest
+from pydantic import BaseModel
+from pydantic import ConfigDict
+
+from .models import User
+
+SNAPSHOT_SESSION_KEY = "user_snapshot"
+
+
+class UserSnapshot(BaseModel):
+    id: int
+    email: str
+    status: str
+    age: int | None = None
+    height: float | None = None
+    goal: str | None = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+def _version_key(user_id: int) -> str:
+    return f"auth:user:{user_id}:version"
+
+
+def get_user_version(user_id: int) -> int:
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        # Seeded from the clock so an evicted stamp never matches a snapshot taken before the eviction.
+        cache.add(key, time.time_ns() // 1_000_000, timeout=None)
+        version = cache.get(key, 0)
+    return version
+
+
+def invalidate_user(user_id: int) -> None:
+    """Expire every cached snapshot of the user (in all of their sessions) once the write commits."""
+
+    def bump():
+        try:
+            cache.incr(_version_key(user_id))
+        except ValueError:
+            get_user_version(user_id)
+
+    transaction.on_commit(bump)
+
+
+def store_user_snapshot(session: SessionBase, user: User) -> UserSnapshot:
+    snapshot = UserSnapshot.model_validate(user)
+    session[SNAPSHOT_SESSION_KEY] = {
+        "user": snapshot.model_dump(),
+        "version": get_user_version(user.id),
+        "loaded_at": time.time(),
+    }
+    return snapshot
+
+
+def resolve_user(request: HttpRequest) -> UserSnapshot | None:
+    """Return the logged-in user's snapshot, hitting the database only when it is missing or stale.
+
+    A snapshot is reused while its version stamp matches the one in the shared cache and it is
+    younger than ``AUTH_USER_SNAPSHOT_TTL``; the TTL bounds staleness for changes made outside the
+    profile views (e.g. in the admin).
+    """
+    user_id = request.session.get("user_id")
+    if not user_id:
+        return None
+
+    cached = request.session.get(SNAPSHOT_SESSION_KEY)
+    if (
+        cached
+        and cached["user"]["id"] == user_id
+        and cached["version"] == get_user_version(user_id)
+        and time.time() - cached["loaded_at"] < settings.AUTH_USER_SNAPSHOT_TTL
+    ):
+        return UserSnapshot.model_validate(cached["user"])
+
+    user = User.objects.filter(id=user_id).first()
+    if user is None:
+        return None
+    return store_user_snapshot(request.session, user)
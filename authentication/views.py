@@ -12,6 +12,8 @@ from django.views.decorators.csrf import csrf_protect
 
 from .decorators import require_auth
 from .models import User
+from .user_cache import invalidate_user
+from .user_cache import store_user_snapshot
 
 EMAIL_REGEX = re.compile(r"^[^@]+@[^@]+\.[^@]+$")
 PASSWORD_MIN_LEN = 8
@@ -138,6 +140,7 @@ def register_view(request: HttpRequest) -> HttpResponse:
     request.session.cycle_key()
     request.session["user_id"] = user.id
     request.session["email"] = validated_email
+    store_user_snapshot(request.session, user)
     logger.info(f"New user registered: {validated_email}")
     return redirect("/")
 
@@ -172,6 +175,7 @@ def login_view(request: HttpRequest) -> HttpResponse:
         request.session.cycle_key()
         request.session["user_id"] = user.id
         request.session["email"] = validated_email
+        store_user_snapshot(request.session, user)
         logger.info(f"User logged in: {validated_email}")
         return redirect("/")
 
@@ -222,6 +226,7 @@ def profile_edit_view(request: HttpRequest) -> HttpResponse:
     if request.method != "POST":
         return render(request, "profile_edit.html", {"user": user})
 
+    user = User.objects.get(id=user.id)
     age = request.POST.get("age", "")
     height = request.POST.get("height", "")
     goal = request.POST.get("goal", "")
@@ -245,6 +250,7 @@ def profile_edit_view(request: HttpRequest) -> HttpResponse:
             return render(request, "profile_edit.html", {"user": user, "error": str(e)})
 
     user.save()
+    invalidate_user(user.id)
     logger.info(f"User profile updated: {user.email}")
     return redirect("/authentication/profile/")
 
@@ -259,6 +265,7 @@ def change_password_view(request: HttpRequest) -> HttpResponse:
 
     current = request.POST.get("current_password", "")
     new = request.POST.get("new_password", "")
+    user = User.objects.get(id=user.id)
 
     if not check_password(current, user.password):
         return render(request, "profile_password.html", {"error": "Incorrect current password"})
@@ -277,6 +284,7 @@ def change_password_view(request: HttpRequest) -> HttpResponse:
 
     user.password = make_password(new)
     user.save()
+    invalidate_user(user.id)
     request.session.cycle_key()
     logger.info(f"User password changed: {user.email}")
     return redirect("/authentication/profile/")
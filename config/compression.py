@@ -0,0 +1,124 @@
+import zlib
+from http import HTTPStatus
+from typing import AsyncIterator
+from typing import Callable
+from typing import Iterator
+
+from django.conf import settings
+from django.http import HttpRequest
+from django.http import HttpResponseBase
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:  # installed with whitenoise[brotli]; without it only gzip is offered
+    brotli = None
+
+Encoder = tuple[Callable[[bytes], bytes], Callable[[], bytes]]
+
+
+def supported_codings() -> tuple[str, ...]:
+    """Content codings in order of preference."""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate(accept_encoding: str) -> str | None:
+    """Pick the preferred supported coding the client accepts, honouring q-values (``br;q=0`` refuses br)."""
+    weights = {}
+    for item in accept_encoding.split(","):
+        coding, *params = (part.strip() for part in item.split(";"))
+        weight = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        if coding:
+            weights[coding.lower()] = weight
+
+    best, best_weight = None, 0.0
+    for coding in supported_codings():
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+def encoder(coding: str) -> Encoder:
+    """``(compress, finish)`` for an incremental compressor of the given coding."""
+    if coding == "br":
+        compressor = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+        return compressor.process, compressor.finish
+    compressor = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress, compressor.flush
+
+
+def compress_iterator(chunks: Iterator[bytes], coding: str) -> Iterator[bytes]:
+    # No flush per chunk: streamed rows are small, and flushing each one would throw the ratio away.
+    compress, finish = encoder(coding)
+    for chunk in chunks:
+        if data := compress(chunk):
+            yield data
+    yield finish()
+
+
+async def acompress_iterator(chunks: AsyncIterator[bytes], coding: str) -> AsyncIterator[bytes]:
+    compress, finish = encoder(coding)
+    async for chunk in chunks:
+        if data := compress(chunk):
+            yield data
+    yield finish()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Brotli/gzip compression of dynamic responses.
+
+    Only ``COMPRESSION_CONTENT_TYPES`` are touched, and non-streaming bodies under ``COMPRESSION_MIN_SIZE``
+    are left alone. Streaming responses (sync or async) are compressed incrementally. ``Accept-Encoding``
+    is added to ``Vary`` next to the ``Cookie`` that sessions and CSRF set, so shared caches key on both.
+    Static files never reach this middleware: WhiteNoise answers them first with its precompressed copies.
+
+    Unlike GZipMiddleware there is no random padding against BREACH; the secrets that end up in
+    pages, CSRF tokens, are already masked with a fresh salt on every response.
+    """
+
+    def process_response(self, request: HttpRequest, response: HttpResponseBase) -> HttpResponseBase:
+        if response.has_header("Content-Encoding") or not self.compressible(response):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        coding = negotiate(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if coding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = acompress_iterator(response.streaming_content, coding)
+            else:
+                response.streaming_content = compress_iterator(response.streaming_content, coding)
+            del response.headers["Content-Length"]
+        else:
+            compress, finish = encoder(coding)
+            content = compress(response.content) + finish()
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response.headers["Content-Length"] = str(len(content))
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = coding
+        return response
+
+    @staticmethod
+    def compressible(response: HttpResponseBase) -> bool:
+        if response.status_code < HTTPStatus.OK or response.status_code in (HTTPStatus.NO_CONTENT, HTTPStatus.NOT_MODIFIED):
+            return False
+        content_type = response.get("Content-Type", "").split(";")[0].strip().lower()
+        if content_type not in settings.COMPRESSION_CONTENT_TYPES:
+            return False
+        return response.streaming or len(response.content) >= settings.COMPRESSION_MIN_SIZE
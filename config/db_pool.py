@@ -0,0 +1,11 @@
+from django.db import connections
+
+
+def pool_stats() -> dict[str, dict[str, int]]:
+    """Return psycopg pool counters (pool_size, pool_available, requests_waiting, ...) per database alias."""
+    stats = {}
+    for alias in connections:
+        pool = getattr(connections[alias], "pool", None)
+        if pool is not None:
+            stats[alias] = pool.get_stats()
+    return stats
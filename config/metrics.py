@@ -0,0 +1,164 @@
+import os
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction
+from asgiref.sync import markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpRequest
+from django.http import HttpResponseBase
+from prometheus_client import CollectorRegistry
+from prometheus_client import Counter
+from prometheus_client import Gauge
+from prometheus_client import Histogram
+from prometheus_client import multiprocess
+from prometheus_client import registry
+from prometheus_client.core import GaugeMetricFamily
+
+from tracker.models import WorkoutSession
+from tracker.repository.caching import cache_stats
+from tracker.repository.session import get_session_repository
+
+from .db_pool import pool_stats
+
+# With PROMETHEUS_MULTIPROC_DIR set (before this module is imported), every worker writes its samples to
+# mmapped files in that directory and a scrape of any worker aggregates all of them.
+MULTIPROCESS = bool(os.getenv("PROMETHEUS_MULTIPROC_DIR"))
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time spent in Django views and the middleware inside MetricsMiddleware.",
+    ["view", "method", "status"],
+)
+DB_TIME = Histogram(
+    "http_request_db_duration_seconds",
+    "Time spent executing SQL per request.",
+    ["view"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "SQL statements executed per request.",
+    ["view"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89),
+)
+CACHE_EVENTS = Counter(
+    "repository_cache_events_total",
+    "Lookups (hits, misses), evictions and invalidations of the per-process repository caches.",
+    ["cache", "event"],
+)
+
+# Each worker has its own pool; "livesum" adds up the values last set by the workers still running.
+DB_POOL_SIZE = Gauge("db_pool_connections", "Connections open in the psycopg pools.", ["alias"], multiprocess_mode="livesum")
+DB_POOL_AVAILABLE = Gauge(
+    "db_pool_connections_available", "Idle connections in the psycopg pools.", ["alias"], multiprocess_mode="livesum"
+)
+DB_POOL_WAITING = Gauge(
+    "db_pool_requests_waiting",
+    "Requests waiting for a connection from the psycopg pools.",
+    ["alias"],
+    multiprocess_mode="livesum",
+)
+
+UNRESOLVED_VIEW = "<unresolved>"
+ACTIVE_SESSIONS_CACHE_KEY = "metrics:workout_sessions_active"
+_CACHE_EVENTS = ("hits", "misses", "evictions", "invalidations")
+_cache_seen: dict[tuple[str, str], int] = {}
+_cache_lock = threading.Lock()
+
+
+class MetricsMiddleware:
+    """Feed each request's latency, and the SQL numbers ``QueryInstrumentationMiddleware`` counted, to the histograms.
+
+    It goes right before the query instrumentation in ``MIDDLEWARE``: that leaves its ``QueryStats`` on
+    ``request.query_stats``, and a request without them is not recorded.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponseBase:
+        if self.is_async:
+            return self.__acall__(request)
+        started = time.perf_counter()
+        response = self.get_response(request)
+        self.record(request, response, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponseBase:
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        self.record(request, response, time.perf_counter() - started)
+        return response
+
+    @staticmethod
+    def record(request: HttpRequest, response: HttpResponseBase, elapsed: float) -> None:
+        if not settings.METRICS_ENABLED:
+            return
+        stats = getattr(request, "query_stats", None)
+        if stats is None:
+            return
+        record_request(request, response.status_code, elapsed, stats.duration, stats.count)
+
+
+def record_request(request: HttpRequest, status: int, elapsed: float, db_time: float, db_queries: int) -> None:
+    match = request.resolver_match
+    # Raw paths of unresolved requests (404s, scanners) would make the label set unbounded.
+    view = match.view_name if match else UNRESOLVED_VIEW
+    REQUEST_LATENCY.labels(view, request.method, str(status)).observe(elapsed)
+    DB_TIME.labels(view).observe(db_time)
+    DB_QUERIES.labels(view).observe(db_queries)
+    sync_cache_events()
+    sync_pool_stats()
+
+
+def sync_pool_stats() -> None:
+    """Publish this worker's pool counters; the totals are as fresh as each worker's last request."""
+    for alias, stats in pool_stats().items():
+        DB_POOL_SIZE.labels(alias).set(stats.get("pool_size", 0))
+        DB_POOL_AVAILABLE.labels(alias).set(stats.get("pool_available", 0))
+        DB_POOL_WAITING.labels(alias).set(stats.get("requests_waiting", 0))
+
+
+def sync_cache_events() -> None:
+    """Carry the growth of ``cache_stats()`` since the last call over to the shared counters."""
+    with _cache_lock:
+        for name, stats in cache_stats().items():
+            for event in _CACHE_EVENTS:
+                delta = stats[event] - _cache_seen.get((name, event), 0)
+                if delta:
+                    CACHE_EVENTS.labels(name, event).inc(delta)
+                    _cache_seen[name, event] = stats[event]
+
+
+class ActiveSessionCollector(registry.Collector):
+    """Workout sessions currently in progress (served by the partial active-session index).
+
+    The count is kept in the shared cache for ``METRICS_ACTIVE_SESSIONS_CACHE_TIMEOUT`` seconds, so however
+    many scrapers and workers there are, the table is counted at most once per interval.
+    """
+
+    def collect(self):
+        count = cache.get_or_set(
+            ACTIVE_SESSIONS_CACHE_KEY,
+            lambda: get_session_repository().count(status=WorkoutSession.Status.ACTIVE),
+            settings.METRICS_ACTIVE_SESSIONS_CACHE_TIMEOUT,
+        )
+        yield GaugeMetricFamily("workout_sessions_active", "Workout sessions that have been started and not finished.", count)
+
+
+def scrape_registry() -> CollectorRegistry:
+    scrape = CollectorRegistry()
+    if MULTIPROCESS:
+        multiprocess.MultiProcessCollector(scrape)
+    else:
+        scrape.register(registry.REGISTRY)
+    scrape.register(ActiveSessionCollector())
+    return scrape
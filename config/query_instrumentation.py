@@ -0,0 +1,130 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+from dataclasses import dataclass
+from dataclasses import field
+
+from asgiref.sync import iscoroutinefunction
+from asgiref.sync import markcoroutinefunction
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.http import HttpRequest
+from django.http import HttpResponseBase
+
+logger = logging.getLogger(__name__)
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST_RE = re.compile(r"\((?:\s*(?:%s|\?)\s*,)+\s*(?:%s|\?)\s*\)")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+class NPlusOneError(AssertionError):
+    pass
+
+
+def fingerprint(sql: str) -> str:
+    """The statement with literals and parameter lists collapsed, so repeats with different values match."""
+    sql = _STRING_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = sql.replace("%s", "?")
+    sql = _PLACEHOLDER_LIST_RE.sub("(...)", sql)
+    return _WHITESPACE_RE.sub(" ", sql).strip()
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    duration: float = 0.0
+    fingerprints: Counter = field(default_factory=Counter)
+
+    def __call__(self, execute, sql, params, many, context):
+        """``connection.execute_wrapper`` hook."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        return [(sql, n) for sql, n in self.fingerprints.most_common() if n >= threshold]
+
+
+class QueryInstrumentationMiddleware:
+    """Count the SQL statements of each request, time them and flag repeated ones (the N+1 signature).
+
+    Statements are captured through ``execute_wrapper`` on every configured connection; for async
+    views the wrappers go on the connections of the request's thread-sensitive ``sync_to_async``
+    thread, where all of its ORM calls run. Queries issued while a streaming response is iterated
+    happen after the middleware returns and are not included.
+
+    Every request is logged at DEBUG; one where a statement fingerprint repeats
+    ``QUERY_REPEAT_THRESHOLD`` times or more is logged at WARNING, or raises ``NPlusOneError``
+    when ``QUERY_RAISE_ON_REPEAT`` is set (meant for tests). ``QUERY_SERVER_TIMING`` adds a
+    ``Server-Timing`` header with the database and total time for the browser's network panel.
+    The stats are left on ``request.query_stats`` for ``config.metrics.MetricsMiddleware``.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponseBase:
+        if self.is_async:
+            return self.__acall__(request)
+        stats, started = QueryStats(), time.perf_counter()
+        request.query_stats = stats
+        with self.recording(stats):
+            response = self.get_response(request)
+        return self.report(request, response, stats, time.perf_counter() - started)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponseBase:
+        stats, started = QueryStats(), time.perf_counter()
+        request.query_stats = stats
+        # The ORM only runs in the thread-sensitive sync_to_async thread, whose connections are not the loop's.
+        stack = await sync_to_async(self.recording)(stats)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self.report(request, response, stats, time.perf_counter() - started)
+
+    @staticmethod
+    def recording(stats: QueryStats) -> ExitStack:
+        stack = ExitStack()
+        for alias in settings.DATABASES:
+            stack.enter_context(connections[alias].execute_wrapper(stats))
+        return stack
+
+    def report(self, request: HttpRequest, response: HttpResponseBase, stats: QueryStats, elapsed: float) -> HttpResponseBase:
+        match = request.resolver_match
+        view = match.view_name if match else request.path
+        summary = (
+            f"{request.method} {request.path} ({view}): {stats.count} queries, "
+            f"db {stats.duration * 1000:.1f}ms, total {elapsed * 1000:.1f}ms"
+        )
+
+        repeated = stats.repeated(settings.QUERY_REPEAT_THRESHOLD)
+        if repeated:
+            details = "; ".join(f"{n}x {sql}" for sql, n in repeated)
+            if settings.QUERY_RAISE_ON_REPEAT:
+                raise NPlusOneError(f"Repeated queries in {summary}: {details}")
+            logger.warning(f"Repeated queries in {summary}: {details}")
+        else:
+            logger.debug(summary)
+
+        if settings.QUERY_SERVER_TIMING:
+            response.headers["Server-Timing"] = (
+                f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries", app;dur={elapsed * 1000:.1f}'
+            )
+        return response
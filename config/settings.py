@@ -45,11 +45,15 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
 ]
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    "config.metrics.MetricsMiddleware",
+    "config.query_instrumentation.QueryInstrumentationMiddleware",
+    "config.compression.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -81,6 +85,8 @@ WSGI_APPLICATION = "config.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+DB_POOL_ENABLED = os.getenv("DB_POOL", "True").lower() == "true"
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
@@ -89,9 +95,68 @@ DATABASES = {
         "PASSWORD": os.getenv("DB_PASSWORD"),
         "HOST": os.getenv("DB_HOST", "localhost"),
         "PORT": os.getenv("DB_PORT", "5432"),
+        # Pooled connections are already persistent; without the pool fall back to CONN_MAX_AGE reuse.
+        "CONN_MAX_AGE": 0 if DB_POOL_ENABLED else int(os.getenv("DB_CONN_MAX_AGE", "60")),
+        # With the pool, Django skips its own check on checkout and instead builds the pool with
+        # check=ConnectionPool.check_connection, which pings each connection as it is handed out.
+        # Passing "check" in the pool options as well fails with a duplicate keyword argument.
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            "options": f"-c pg_trgm.word_similarity_threshold={os.getenv('SEARCH_TRIGRAM_THRESHOLD', '0.3')}",
+        },
     }
 }
 
+# One pool per gunicorn worker: keep workers * DB_POOL_MAX_SIZE below the server's max_connections.
+if DB_POOL_ENABLED:
+    DATABASES["default"]["OPTIONS"]["pool"] = {
+        "name": "default",
+        "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+        "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+        "timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+        "max_lifetime": float(os.getenv("DB_POOL_MAX_LIFETIME", "1800")),
+        "max_idle": float(os.getenv("DB_POOL_MAX_IDLE", "300")),
+    }
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Must be shared by all gunicorn workers (file, redis or memcached), as cache versions are used for invalidation.
+
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("CACHE_BACKEND", "django.core.cache.backends.filebased.FileBasedCache"),
+        "LOCATION": os.getenv("CACHE_LOCATION", "/tmp/fitness-tracker-cache"),
+    },
+    "sessions": {
+        "BACKEND": os.getenv("SESSION_CACHE_BACKEND", "django.core.cache.backends.filebased.FileBasedCache"),
+        "LOCATION": os.getenv("SESSION_CACHE_LOCATION", "/tmp/fitness-tracker-sessions"),
+        "OPTIONS": {"MAX_ENTRIES": int(os.getenv("SESSION_CACHE_MAX_ENTRIES", "10000"))},
+    },
+}
+CATALOG_CACHE_TIMEOUT = int(os.getenv("CATALOG_CACHE_TIMEOUT", "86400"))
+AUTH_USER_SNAPSHOT_TTL = int(os.getenv("AUTH_USER_SNAPSHOT_TTL", "300"))
+WEIGHT_TREND_CACHE_TIMEOUT = int(os.getenv("WEIGHT_TREND_CACHE_TIMEOUT", "86400"))
+# Per-process cache of session/weight detail lookups, checked against the shared per-user data version; 0 disables it.
+REPOSITORY_CACHE_TTL = float(os.getenv("REPOSITORY_CACHE_TTL", "30"))
+REPOSITORY_CACHE_MAX_ENTRIES = int(os.getenv("REPOSITORY_CACHE_MAX_ENTRIES", "1024"))
+# Per-user data version stamps behind ETag/Last-Modified; expiry bounds how long out-of-band writes go unnoticed.
+DATA_VERSION_TIMEOUT = int(os.getenv("DATA_VERSION_TIMEOUT", "3600"))
+
+# Sessions
+# https://docs.djangoproject.com/en/5.2/topics/http/sessions/#configuring-the-session-engine
+# db: one SELECT per request and a table that grows until purge_expired_sessions runs.
+# cached_db: reads served from the "sessions" cache, writes go through to the database.
+# signed_cookies: no server-side storage; the payload (user id, email, user snapshot) lives in the cookie,
+# so a logged-out cookie stays valid until SESSION_COOKIE_AGE if it was copied.
+
+SESSION_ENGINES = {
+    "db": "django.contrib.sessions.backends.db",
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+}
+SESSION_ENGINE = SESSION_ENGINES[os.getenv("SESSION_BACKEND", "db")]
+SESSION_CACHE_ALIAS = "sessions"
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -136,7 +201,33 @@ STORAGES = {
         "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
     },
 }
-STATICFILES_DIRS = [BASE_DIR / "static"]
+
+# Compression of dynamic responses (config.compression); static files come precompressed from WhiteNoise.
+COMPRESSION_CONTENT_TYPES = (
+    "text/html",
+    "text/plain",
+    "text/csv",
+    "application/json",
+    "application/x-ndjson",
+)
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "512"))
+# Tuned for per-request CPU: on our pages brotli 11 is ~15-20% smaller than 4 but costs 5-40ms instead of ~0.1ms.
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+
+# Per-request SQL instrumentation (config.query_instrumentation).
+QUERY_REPEAT_THRESHOLD = int(os.getenv("QUERY_REPEAT_THRESHOLD", "5"))
+QUERY_RAISE_ON_REPEAT = os.getenv("QUERY_RAISE_ON_REPEAT", "False").lower() == "true"
+QUERY_SERVER_TIMING = os.getenv("QUERY_SERVER_TIMING", "False").lower() == "true"
+
+# Prometheus metrics served on /metrics (config.metrics). Under gunicorn, set PROMETHEUS_MULTIPROC_DIR
+# to a directory writable by every worker; gunicorn.conf.py empties it on start.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "True").lower() == "true"
+# /metrics answers requests from METRICS_ALLOWED_IPS (REMOTE_ADDR, so the proxy's address behind one) or
+# carrying "Authorization: Bearer <METRICS_TOKEN>"; everything else gets a 403.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+METRICS_ALLOWED_IPS = [ip.strip() for ip in os.getenv("METRICS_ALLOWED_IPS", "127.0.0.1,::1").split(",") if ip.strip()]
+METRICS_ACTIVE_SESSIONS_CACHE_TIMEOUT = int(os.getenv("METRICS_ACTIVE_SESSIONS_CACHE_TIMEOUT", "30"))
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -181,5 +272,10 @@ LOGGING = {
             "level": "DEBUG",
             "propagate": False,
         },
+        "config": {
+            "handlers": ["console"],
+            "level": LOG_LEVEL,
+            "propagate": False,
+        },
     },
 }
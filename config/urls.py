@@ -19,8 +19,11 @@ from django.contrib import admin
 from django.urls import include
 from django.urls import path
 
+from .views import metrics_view
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("", include("tracker.urls")),
     path("authentication/", include("authentication.urls")),
+    path("metrics", metrics_view, name="metrics"),
 ]
@@ -0,0 +1,29 @@
+import hmac
+
+from django.conf import settings
+from django.http import HttpRequest
+from django.http import HttpResponse
+from django.http import HttpResponseForbidden
+from prometheus_client import CONTENT_TYPE_LATEST
+from prometheus_client import generate_latest
+
+from .metrics import scrape_registry
+from .metrics import sync_pool_stats
+
+
+def metrics_view(request: HttpRequest) -> HttpResponse:
+    if not may_scrape(request):
+        return HttpResponseForbidden()
+    sync_pool_stats()
+    return HttpResponse(generate_latest(scrape_registry()), content_type=CONTENT_TYPE_LATEST)
+
+
+def may_scrape(request: HttpRequest) -> bool:
+    if request.META.get("REMOTE_ADDR") in settings.METRICS_ALLOWED_IPS:
+        return True
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    return (
+        bool(settings.METRICS_TOKEN)
+        and scheme.lower() == "bearer"
+        and hmac.compare_digest(token.encode(), settings.METRICS_TOKEN.encode())
+    )
@@ -0,0 +1,18 @@
+# Picked up by gunicorn from the working directory; the command line in docker-compose.yml still applies.
+import os
+import shutil
+
+from prometheus_client import multiprocess
+
+
+def on_starting(server):
+    """Start from an empty metrics directory; files left by a previous run would be summed into the new one."""
+    path = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if path:
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path)
+
+
+def child_exit(server, worker):
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(worker.pid)
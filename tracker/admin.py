@@ -9,6 +9,7 @@ from django.http import HttpRequest
 
 from .models import Exercise
 from .models import ExerciseSet
+from .models import TrainingAggregate
 from .models import WeightTracker
 from .models import WorkoutPlan
 from .models import WorkoutSession
@@ -34,4 +35,5 @@ class WorkoutPlanAdmin(admin.ModelAdmin):
 admin.site.register(Exercise)
 admin.site.register(ExerciseSet)
 admin.site.register(WorkoutSession)
+admin.site.register(TrainingAggregate)
 admin.site.register(WeightTracker)
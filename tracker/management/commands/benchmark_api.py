@@ -0,0 +1,85 @@
+import http.client
+import statistics
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from importlib import import_module
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from authentication.models import User
+from tracker.models import Exercise
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test the JSON API of a running server (e.g. the sync gunicorn deployment vs. uvicorn workers) "
+        "and report throughput and latency per concurrency level."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000", help="Base URL of the running server.")
+        parser.add_argument("--concurrency", type=int, nargs="*", default=[1, 8, 32, 64], help="Concurrent connections.")
+        parser.add_argument("--requests", type=int, default=2000, help="Requests per concurrency level.")
+        parser.add_argument("--paths", nargs="*", help="API paths to cycle through (default: exercise list and detail).")
+
+    def handle(self, *args, **options):
+        # The session is written straight into the configured store, so the server under test must share it.
+        user = User.objects.create_user(f"api-benchmark-{uuid.uuid4().hex[:8]}@example.com", uuid.uuid4().hex)
+        session = import_module(settings.SESSION_ENGINE).SessionStore()
+        session["user_id"] = user.id
+        session.save()
+
+        paths = options["paths"] or self.default_paths()
+        try:
+            for concurrency in options["concurrency"]:
+                self.run_level(options["url"], paths, session.session_key, concurrency, options["requests"])
+        finally:
+            session.delete()
+            user.delete()
+
+    @staticmethod
+    def default_paths() -> list[str]:
+        paths = ["/api/exercises/"]
+        exercise_id = Exercise.objects.order_by("id").values_list("id", flat=True).first()
+        if exercise_id:
+            paths.append(f"/api/exercises/{exercise_id}/")
+        return paths
+
+    def run_level(self, url: str, paths: list[str], session_key: str, concurrency: int, total: int):
+        target = urlsplit(url)
+        headers = {"Cookie": f"{settings.SESSION_COOKIE_NAME}={session_key}", "Host": target.netloc}
+        local = threading.local()
+
+        def fetch(i: int) -> tuple[float, int]:
+            # One keep-alive connection per worker thread, like a browser or an upstream proxy would hold.
+            if not hasattr(local, "conn"):
+                local.conn = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=30)
+            started = time.perf_counter()
+            try:
+                local.conn.request("GET", paths[i % len(paths)], headers=headers)
+                response = local.conn.getresponse()
+                response.read()
+                status = response.status
+            except (OSError, http.client.HTTPException):
+                local.conn.close()
+                del local.conn
+                status = 0
+            return (time.perf_counter() - started) * 1000, status
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(fetch, range(total)))
+        elapsed = time.perf_counter() - started
+
+        timings = sorted(t for t, _ in results)
+        errors = sum(1 for _, status in results if status != HTTPStatus.OK)
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        self.stdout.write(
+            f"concurrency={concurrency:>3}: {total / elapsed:8.1f} req/s p50={statistics.median(timings):.2f}ms "
+            f"p95={p95:.2f}ms max={timings[-1]:.2f}ms errors={errors}"
+        )
@@ -0,0 +1,55 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.test import Client
+from django.test.utils import override_settings
+
+from authentication.models import User
+from config.compression import encoder
+from config.compression import supported_codings
+
+DEFAULT_PATHS = ["/exercises/", "/sessions/", "/weight-tracker/", "/api/exercises/?limit=100", "/api/export/?format=ndjson"]
+
+
+class Command(BaseCommand):
+    help = "Measure bytes on the wire and compression CPU time per response for each supported content coding."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", required=True, help="Email or id of the user whose pages are fetched.")
+        parser.add_argument("--paths", nargs="*", default=DEFAULT_PATHS)
+        parser.add_argument("--repeat", type=int, default=20, help="Timed compressions per response and coding.")
+
+    def handle(self, *args, **options):
+        lookup = {"id": options["user"]} if options["user"].isdigit() else {"email": options["user"]}
+        user = User.objects.filter(**lookup).first()
+        if user is None:
+            raise CommandError(f"User {options['user']} not found.")
+
+        with override_settings(ALLOWED_HOSTS=["testserver"]):
+            client = Client()
+            session = client.session
+            session["user_id"] = user.id
+            session["email"] = user.email
+            session.save()
+            client.cookies[settings.SESSION_COOKIE_NAME] = session.session_key
+
+            codings = supported_codings()
+            self.stdout.write(f"{'path':<32} {'identity':>9} " + " ".join(f"{c:>9} {c + ' cpu':>10}" for c in codings))
+            for path in options["paths"]:
+                response = client.get(path, HTTP_ACCEPT_ENCODING="identity")
+                body = b"".join(response.streaming_content) if response.streaming else response.content
+                columns = [f"{path:<32} {len(body):>9}"]
+                for coding in codings:
+                    size, cpu_ms = self.measure(body, coding, options["repeat"])
+                    columns.append(f"{size:>9} {cpu_ms:>8.2f}ms")
+                self.stdout.write(" ".join(columns))
+
+    @staticmethod
+    def measure(body: bytes, coding: str, repeat: int) -> tuple[int, float]:
+        started = time.process_time()
+        for _ in range(repeat):
+            compress, finish = encoder(coding)
+            size = len(compress(body) + finish())
+        return size, (time.process_time() - started) * 1000 / repeat
@@ -0,0 +1,66 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from tracker.models import Exercise
+from tracker.repository.pagination import DEFAULT_PAGE_SIZE
+from tracker.service.exercise import list_exercises
+
+MOVEMENTS = ["squat", "deadlift", "press", "row", "curl", "lunge", "pull-up", "dip", "raise", "extension", "fly", "shrug"]
+MODIFIERS = ["barbell", "dumbbell", "kettlebell", "cable", "machine", "single-arm", "incline", "decline", "seated", "standing"]
+TYPES = ["strength", "cardio", "mobility", "plyometric", "core"]
+QUERIES = ["squat", "sqaut", "dumbell press", "incline", "cable fly", "pull", "kettlebell swing", "core"]
+
+
+class Command(BaseCommand):
+    help = "Measure exercise catalog search latency, optionally against extra synthetic rows that are rolled back afterwards."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed-rows",
+            type=int,
+            default=0,
+            help="Add this many synthetic exercises for the run only; they are inserted in a transaction that is rolled back.",
+        )
+        parser.add_argument("--repeat", type=int, default=20, help="Timed runs per query.")
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options["seed_rows"] > 0:
+                self.seed(options["seed_rows"], random.Random(options["seed"]))
+            self.benchmark(options["repeat"])
+            transaction.set_rollback(True)
+
+    def seed(self, rows: int, rng: random.Random) -> None:
+        self.stdout.write(f"Seeding {rows} synthetic exercises (rolled back afterwards)...")
+        Exercise.objects.bulk_create(
+            (
+                Exercise(
+                    name=f"{rng.choice(MODIFIERS).title()} {rng.choice(MOVEMENTS).title()} #{i}",
+                    type=rng.choice(TYPES),
+                    description=" ".join(rng.choices(MOVEMENTS + MODIFIERS, k=12)),
+                )
+                for i in range(rows)
+            ),
+            batch_size=5000,
+        )
+
+    def benchmark(self, repeat: int) -> None:
+        self.stdout.write(f"Catalog size: {Exercise.objects.count()}")
+        for query in QUERIES:
+            timings = []
+            page = None
+            for _ in range(repeat):
+                started = time.perf_counter()
+                page = list_exercises(query, "", None, DEFAULT_PAGE_SIZE)
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            self.stdout.write(
+                f"{query!r:>20}: p50={statistics.median(timings):.2f}ms p95={p95:.2f}ms "
+                f"max={timings[-1]:.2f}ms hits={len(page) if page else 0}"
+            )
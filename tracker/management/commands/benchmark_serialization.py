@@ -0,0 +1,76 @@
+import statistics
+import time
+from typing import Callable
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.http import JsonResponse
+
+from tracker.models import Exercise
+from tracker.schemas.exercise_schema import ExerciseSchema
+from tracker.serialization import SchemaJsonResponse
+from tracker.serialization import validate_rows
+from tracker.service.exercise import EXERCISE_FIELDS
+
+
+class Command(BaseCommand):
+    help = "Compare the per-instance model_validate + JsonResponse path with values() rows + SchemaJsonResponse."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10_000, help="Rows per response.")
+        parser.add_argument("--repeat", type=int, default=10, help="Timed runs per variant.")
+        parser.add_argument(
+            "--seed-rows",
+            action="store_true",
+            help="Top the catalog up to --rows with synthetic exercises for the run only; they are rolled back afterwards.",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            missing = options["rows"] - Exercise.objects.count()
+            if missing > 0 and options["seed_rows"]:
+                self.stdout.write(f"Seeding {missing} synthetic exercises (rolled back afterwards)...")
+                Exercise.objects.bulk_create(
+                    (Exercise(name=f"Benchmark exercise #{i}", type="strength", description="x" * 80) for i in range(missing)),
+                    batch_size=5000,
+                )
+            self.benchmark(min(options["rows"], Exercise.objects.count()), options["repeat"])
+            transaction.set_rollback(True)
+
+    def benchmark(self, rows: int, repeat: int) -> None:
+        queryset = Exercise.objects.order_by("id")[:rows]
+        instances = list(queryset)
+        values = list(queryset.values(*EXERCISE_FIELDS))
+        schemas = validate_rows(ExerciseSchema, values)
+
+        def instance_path():
+            data = [ExerciseSchema.model_validate(e).model_dump() for e in queryset]
+            return JsonResponse({"results": data}).content
+
+        def values_path():
+            return SchemaJsonResponse({"results": validate_rows(ExerciseSchema, queryset.values(*EXERCISE_FIELDS))}).content
+
+        self.stdout.write(f"{rows} rows, best of {repeat} runs, median in brackets")
+        self.report("query + serialize (before)", instance_path, repeat)
+        self.report("query + serialize (after)", values_path, repeat)
+        self.report(
+            "validate, from instances",
+            lambda: [ExerciseSchema.model_validate(e) for e in instances],
+            repeat,
+        )
+        self.report("validate, from values()", lambda: validate_rows(ExerciseSchema, values), repeat)
+        self.report(
+            "encode, model_dump + JsonResponse",
+            lambda: JsonResponse({"results": [s.model_dump() for s in schemas]}).content,
+            repeat,
+        )
+        self.report("encode, SchemaJsonResponse", lambda: SchemaJsonResponse({"results": schemas}).content, repeat)
+
+    def report(self, label: str, run: Callable, repeat: int) -> None:
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = run()
+            timings.append((time.perf_counter() - started) * 1000)
+        size = f" {len(result) / 1024:.0f} KiB" if isinstance(result, bytes) else ""
+        self.stdout.write(f"{label:>36}: {min(timings):8.2f}ms ({statistics.median(timings):.2f}ms){size}")
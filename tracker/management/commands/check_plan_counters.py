@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.db import transaction
+from django.db.models import F
+from django.db.models import Q
+from django.db.models.functions import Abs
+
+from tracker.models import WorkoutPlan
+from tracker.service.exercise_set import lock_plans
+from tracker.service.exercise_set import plan_totals
+from tracker.service.exercise_set import refresh_plan_totals
+
+VOLUME_TOLERANCE = 1e-6
+
+
+class Command(BaseCommand):
+    help = "Compare WorkoutPlan.exercise_count/total_volume with their ExerciseSet rows and optionally repair them."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fix", action="store_true", help="Recompute the counters of every inconsistent plan.")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        mismatched = (
+            WorkoutPlan.objects.annotate(**{f"actual_{name}": expr for name, expr in plan_totals().items()})
+            .annotate(volume_diff=Abs(F("total_volume") - F("actual_total_volume")))
+            .filter(~Q(exercise_count=F("actual_exercise_count")) | Q(volume_diff__gt=VOLUME_TOLERANCE))
+            .order_by("id")
+            .values("id", "exercise_count", "actual_exercise_count", "total_volume", "actual_total_volume")
+        )
+
+        plan_ids = []
+        for row in mismatched.iterator(chunk_size=options["batch_size"]):
+            plan_ids.append(row["id"])
+            self.stdout.write(
+                f"plan {row['id']}: exercise_count {row['exercise_count']} != {row['actual_exercise_count']} or "
+                f"total_volume {row['total_volume']} != {row['actual_total_volume']}"
+            )
+
+        if not plan_ids:
+            self.stdout.write("All plan counters are consistent.")
+            return
+
+        if not options["fix"]:
+            raise CommandError(f"{len(plan_ids)} plans have inconsistent counters; rerun with --fix to repair them.")
+
+        for start in range(0, len(plan_ids), options["batch_size"]):
+            with transaction.atomic():
+                refresh_plan_totals(lock_plans(plan_ids[start : start + options["batch_size"]]))
+        self.stdout.write(f"Repaired {len(plan_ids)} plans.")
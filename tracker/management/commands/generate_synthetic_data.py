@@ -0,0 +1,452 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import as_completed
+from dataclasses import dataclass
+from datetime import UTC
+from datetime import date
+from datetime import datetime
+from datetime import timedelta
+
+import django
+import numpy as np
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.core.management.color import no_style
+from django.db import connection
+from django.db import models
+from django.db import transaction
+from django.db.models import Max
+
+from authentication.models import User
+from tracker.models import Exercise
+from tracker.models import ExerciseSet
+from tracker.models import TrainingAggregate
+from tracker.models import WeightTracker
+from tracker.models import WorkoutPlan
+from tracker.models import WorkoutSession
+from tracker.repository.training_aggregate import get_training_aggregate_repository
+from tracker.service.catalog_cache import catalog_cache
+from tracker.service.exercise_set import lock_plans
+from tracker.service.exercise_set import refresh_plan_totals
+
+# Generated users and exercises are recognisable by these, which is what --reset deletes.
+EMAIL_DOMAIN = "synthetic.example"
+EXERCISE_MARKER = "Synthetic:"
+
+MOVEMENTS = [
+    ("Squat", "Legs"),
+    ("Front Squat", "Legs"),
+    ("Lunge", "Legs"),
+    ("Leg Press", "Legs"),
+    ("Calf Raise", "Legs"),
+    ("Deadlift", "Back"),
+    ("Romanian Deadlift", "Hamstrings"),
+    ("Hip Thrust", "Glutes"),
+    ("Row", "Back"),
+    ("Pull-up", "Back"),
+    ("Lat Pulldown", "Back"),
+    ("Bench Press", "Chest"),
+    ("Incline Press", "Chest"),
+    ("Fly", "Chest"),
+    ("Dip", "Chest"),
+    ("Overhead Press", "Shoulders"),
+    ("Lateral Raise", "Shoulders"),
+    ("Face Pull", "Shoulders"),
+    ("Shrug", "Traps"),
+    ("Curl", "Arms"),
+    ("Triceps Extension", "Arms"),
+    ("Plank", "Core"),
+    ("Crunch", "Core"),
+    ("Russian Twist", "Core"),
+]
+EQUIPMENT = ["Barbell", "Dumbbell", "Kettlebell", "Cable", "Machine", "Bodyweight", "Resistance Band", "Smith Machine"]
+PLAN_NAMES = ["Full body", "Push day", "Pull day", "Leg day", "Upper body", "Lower body", "Core", "5x5 strength", "Hypertrophy"]
+GOALS = ["Lose weight", "Build muscle", "Get stronger", "Improve endurance", "Stay healthy", "Train for a marathon"]
+REPS = [5, 6, 8, 10, 12, 15, 20]
+
+USER_FIELDS = [
+    "id",
+    "email",
+    "password",
+    "is_superuser",
+    "first_name",
+    "last_name",
+    "is_staff",
+    "is_active",
+    "date_joined",
+    "status",
+    "age",
+    "height",
+    "goal",
+]
+GENERATED_MODELS = (User, WorkoutPlan, ExerciseSet, WorkoutSession, WeightTracker)
+MAX_SETS_PER_PLAN = 10
+MORNING_SESSION_SHARE = 0.35
+ACTIVE_USER_SHARE = 0.03
+# Exercise sets are drawn for this many plans at a time; the score matrix is plans x exercises.
+PLAN_BATCH = 1000
+
+
+@dataclass(frozen=True)
+class Distribution:
+    plans_per_user: float
+    sessions_per_user: float
+    weights_per_user: float
+    max_history_days: int
+
+
+@dataclass(frozen=True)
+class ChunkCounts:
+    """Row counts of one chunk of users, drawn from their own RNG stream so the parent can assign id ranges."""
+
+    history_days: np.ndarray
+    plans: np.ndarray
+    sets: np.ndarray  # per plan
+    sessions: np.ndarray
+    weights: np.ndarray
+
+    def totals(self) -> dict[type[models.Model], int]:
+        return {
+            User: len(self.plans),
+            WorkoutPlan: int(self.plans.sum()),
+            ExerciseSet: int(self.sets.sum()),
+            WorkoutSession: int(self.sessions.sum()),
+            WeightTracker: int(self.weights.sum()),
+        }
+
+
+@dataclass(frozen=True)
+class Chunk:
+    seed: int
+    index: int
+    first_user: int  # position of the chunk's first user among all generated users
+    size: int
+    first_ids: dict[type[models.Model], int]
+    exercise_ids: np.ndarray
+    exercise_popularity: np.ndarray  # log-probabilities
+    bodyweight: np.ndarray
+    distribution: Distribution
+    end: datetime
+    password: str
+
+
+def draw_counts(seed: int, index: int, size: int, distribution: Distribution, exercise_count: int) -> ChunkCounts:
+    rng = np.random.default_rng([seed, index, 0])
+    # Engagement is lognormal with mean 1: most users are light, a few train and weigh in daily.
+    engagement = rng.lognormal(mean=-0.32, sigma=0.8, size=size)
+    history_days = rng.integers(14, distribution.max_history_days + 1, size=size)
+    plans = 1 + np.minimum(rng.poisson(max(distribution.plans_per_user - 1, 0) * engagement), 29)
+    sets = np.minimum(rng.integers(3, MAX_SETS_PER_PLAN + 1, size=int(plans.sum())), exercise_count)
+    sessions = np.minimum(
+        rng.poisson(distribution.sessions_per_user * engagement * history_days / distribution.max_history_days), 3000
+    )
+    weights = np.minimum(rng.poisson(distribution.weights_per_user * engagement), history_days)
+    return ChunkCounts(history_days, plans, sets, sessions, weights)
+
+
+def copy_rows(model: type[models.Model], fields: list[str], columns: list) -> int:
+    """COPY column lists (all of equal length) into the model's table."""
+    quote = connection.ops.quote_name
+    names = ", ".join(quote(model._meta.get_field(name).column) for name in fields)
+    with connection.cursor() as cursor:
+        with cursor.cursor.copy(f"COPY {quote(model._meta.db_table)} ({names}) FROM STDIN") as copy:
+            for row in zip(*columns, strict=True):
+                copy.write_row(row)
+    return len(columns[0])
+
+
+def timestamps(values: np.ndarray) -> list[str]:
+    """ISO strings for datetime64 values in UTC, which COPY reads into timestamptz columns."""
+    return [f"{value}+00:00" for value in values.astype("datetime64[s]").astype(str)]
+
+
+def generate_chunk(chunk: Chunk) -> dict[str, int]:
+    counts = draw_counts(chunk.seed, chunk.index, chunk.size, chunk.distribution, len(chunk.exercise_ids))
+    rng = np.random.default_rng([chunk.seed, chunk.index, 1])
+    end = np.datetime64(chunk.end.replace(tzinfo=None), "s")
+    updated_at = chunk.end.isoformat()
+    totals = counts.totals()
+    ids = {model: first + np.arange(totals[model]) for model, first in chunk.first_ids.items()}
+    written = {}
+
+    # Signing up `history_days` ago; everything the user did since falls between then and the end.
+    joined = end - counts.history_days.astype("timedelta64[D]")
+    positions = chunk.first_user + np.arange(chunk.size)
+
+    user_rows = [
+        ids[User].tolist(),
+        [f"user{position}@{EMAIL_DOMAIN}" for position in positions.tolist()],
+        [chunk.password] * chunk.size,
+        [False] * chunk.size,
+        [""] * chunk.size,
+        [""] * chunk.size,
+        [False] * chunk.size,
+        [True] * chunk.size,
+        timestamps(joined),
+        [User.Status.CUSTOMER.value] * chunk.size,
+        np.clip(rng.normal(33, 11, chunk.size), 16, 80).astype(int).tolist(),
+        np.round(np.clip(rng.normal(172, 10, chunk.size), 145, 210), 1).tolist(),
+        rng.choice(GOALS, chunk.size).tolist(),
+    ]
+
+    plan_owner = np.repeat(np.arange(chunk.size), counts.plans)
+    exercise_columns, volumes = draw_exercise_sets(chunk, counts, rng, ids)
+    plan_rows = [
+        ids[WorkoutPlan].tolist(),
+        ids[User][plan_owner].tolist(),
+        rng.choice(PLAN_NAMES, len(plan_owner)).tolist(),
+        [1] * len(plan_owner),
+        [""] * len(plan_owner),
+        counts.sets.tolist(),
+        volumes.tolist(),
+        [updated_at] * len(plan_owner),
+    ]
+
+    # Sessions mostly use the user's first plans; start times cluster around 7:00 and 18:30.
+    session_user = np.repeat(np.arange(chunk.size), counts.sessions)
+    first_plan = np.concatenate(([0], np.cumsum(counts.plans)[:-1]))
+    plan_pick = (rng.random(len(session_user)) ** 2 * counts.plans[session_user]).astype(int)
+    day = (rng.random(len(session_user)) * counts.history_days[session_user]).astype(int)
+    hour = np.where(
+        rng.random(len(session_user)) < MORNING_SESSION_SHARE,
+        rng.normal(7, 1.5, len(session_user)),
+        rng.normal(18.5, 1.5, len(session_user)),
+    )
+    start = joined[session_user] + day.astype("timedelta64[D]") + (np.clip(hour, 5, 23) * 3600).astype("timedelta64[s]")
+    start = np.minimum(start, end - np.timedelta64(1, "h"))
+    duration = np.clip(rng.normal(55, 15, len(session_user)), 10, 150).astype(int)
+    status = np.full(len(session_user), WorkoutSession.Status.COMPLETED.value, dtype=object)
+    # A few users are mid-workout: their last session started within the hour and has no duration yet.
+    last = np.cumsum(counts.sessions)[counts.sessions > 0] - 1
+    active = last[rng.random(len(last)) < ACTIVE_USER_SHARE]
+    status[active] = WorkoutSession.Status.ACTIVE.value
+    start[active] = end - (rng.integers(5, 60, len(active)) * 60).astype("timedelta64[s]")
+    duration[active] = 0
+    session_rows = [
+        ids[WorkoutSession].tolist(),
+        ids[User][session_user].tolist(),
+        ids[WorkoutPlan][first_plan[session_user] + plan_pick].tolist(),
+        duration.tolist(),
+        status.tolist(),
+        timestamps(start),
+        [updated_at] * len(session_user),
+    ]
+
+    # Weigh-ins on distinct days, following a slow personal trend with day-to-day noise.
+    weight_user = np.repeat(np.arange(chunk.size), counts.weights)
+    weight_day = np.concatenate(
+        [
+            np.sort(rng.choice(days, n, replace=False))
+            for days, n in zip(counts.history_days.tolist(), counts.weights.tolist(), strict=True)
+            if n
+        ]
+        or [np.empty(0, dtype=int)]
+    )
+    baseline = np.clip(rng.normal(80, 14, chunk.size), 45, 150)
+    trend = rng.normal(-0.01, 0.015, chunk.size)
+    weight = baseline[weight_user] + trend[weight_user] * weight_day + rng.normal(0, 0.5, len(weight_user))
+    weight_rows = [
+        ids[WeightTracker].tolist(),
+        ids[User][weight_user].tolist(),
+        (joined[weight_user].astype("datetime64[D]") + weight_day.astype("timedelta64[D]")).astype(str).tolist(),
+        np.round(np.clip(weight, 40, 200), 1).tolist(),
+        [updated_at] * len(weight_user),
+    ]
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL synchronous_commit TO OFF")
+        written["users"] = copy_rows(User, USER_FIELDS, user_rows)
+        written["plans"] = copy_rows(
+            WorkoutPlan,
+            ["id", "creator", "name", "version", "description", "exercise_count", "total_volume", "updated_at"],
+            plan_rows,
+        )
+        written["exercise_sets"] = copy_rows(
+            ExerciseSet, ["id", "workout_plan", "exercise", "sets", "reps", "weight"], exercise_columns
+        )
+        written["sessions"] = copy_rows(
+            WorkoutSession, ["id", "user", "plan", "duration_minutes", "status", "start_time", "updated_at"], session_rows
+        )
+        written["weights"] = copy_rows(WeightTracker, ["id", "user", "date", "weight", "updated_at"], weight_rows)
+        # Users never span chunks, so each chunk's rollups are complete and are built in parallel.
+        written["training_aggregates"] = get_training_aggregate_repository().rebuild(ids[User].tolist())
+    return written
+
+
+def draw_exercise_sets(chunk: Chunk, counts: ChunkCounts, rng: np.random.Generator, ids: dict) -> tuple[list, np.ndarray]:
+    """Pick each plan's exercises without repeats, weighted by popularity (Gumbel top-k), and their sets x reps x weight."""
+    picks = []
+    for start in range(0, len(counts.sets), PLAN_BATCH):
+        sizes = counts.sets[start : start + PLAN_BATCH]
+        scores = chunk.exercise_popularity + rng.gumbel(size=(len(sizes), len(chunk.exercise_ids)))
+        k = min(MAX_SETS_PER_PLAN, len(chunk.exercise_ids))
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        picks.append(top[np.arange(k) < sizes[:, None]])
+    exercise = np.concatenate(picks) if picks else np.empty(0, dtype=int)
+
+    plan = np.repeat(np.arange(len(counts.sets)), counts.sets)
+    sets = rng.integers(3, 6, len(exercise))
+    reps = rng.choice(REPS, len(exercise))
+    load = np.round(rng.lognormal(np.log(30), 0.6, len(exercise)) / 2.5) * 2.5
+    load[chunk.bodyweight[exercise]] = 0
+    volumes = np.bincount(plan, weights=sets * reps * load, minlength=len(counts.sets))
+    columns = [
+        ids[ExerciseSet].tolist(),
+        ids[WorkoutPlan][plan].tolist(),
+        chunk.exercise_ids[exercise].tolist(),
+        sets.tolist(),
+        reps.tolist(),
+        load.tolist(),
+    ]
+    return columns, volumes
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a deterministic synthetic dataset (users, exercises, plans, exercise sets, sessions, weights) "
+        "for load testing, written with COPY from several worker processes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10_000)
+        parser.add_argument("--exercises", type=int, default=500)
+        parser.add_argument("--plans-per-user", type=float, default=3, help="Mean number of plans per user.")
+        parser.add_argument("--sessions-per-user", type=float, default=120, help="Mean sessions of a user with a full history.")
+        parser.add_argument("--weights-per-user", type=float, default=150, help="Mean weigh-ins per user.")
+        parser.add_argument("--history-days", type=int, default=730, help="Longest user history.")
+        parser.add_argument("--end-date", type=date.fromisoformat, default=date.today(), help="Last day of the history.")
+        parser.add_argument(
+            "--seed", type=int, default=0, help="With the same --chunk-size and --end-date, the same rows whatever --workers is."
+        )
+        parser.add_argument("--workers", type=int, default=os.cpu_count())
+        parser.add_argument("--chunk-size", type=int, default=1000, help="Users generated and committed per task.")
+        parser.add_argument("--password", default="synthetic-password", help="Password of every generated user.")
+        parser.add_argument("--reset", action="store_true", help="Delete previously generated data first.")
+
+    def handle(self, *args, **options):
+        if options["reset"]:
+            self.reset()
+        elif User.objects.filter(email__endswith=f"@{EMAIL_DOMAIN}").exists():
+            raise CommandError("Synthetic data already exists; pass --reset to replace it.")
+
+        started = time.perf_counter()
+        seed, chunk_size = options["seed"], options["chunk_size"]
+        distribution = Distribution(
+            options["plans_per_user"], options["sessions_per_user"], options["weights_per_user"], options["history_days"]
+        )
+        end = datetime.combine(options["end_date"], datetime.min.time(), tzinfo=UTC) + timedelta(days=1)
+        exercise_ids, popularity, bodyweight = self.create_exercises(seed, options["exercises"], end)
+
+        # Ids are assigned here from each chunk's counts, so the dataset is the same whatever the worker count.
+        next_ids = {model: (model.objects.aggregate(last=Max("id"))["last"] or 0) + 1 for model in GENERATED_MODELS}
+        password = make_password(options["password"])
+        chunks = []
+        for index, first_user in enumerate(range(0, options["users"], chunk_size)):
+            size = min(chunk_size, options["users"] - first_user)
+            chunks.append(
+                Chunk(
+                    seed=seed,
+                    index=index,
+                    first_user=first_user,
+                    size=size,
+                    first_ids=dict(next_ids),
+                    exercise_ids=exercise_ids,
+                    exercise_popularity=popularity,
+                    bodyweight=bodyweight,
+                    distribution=distribution,
+                    end=end,
+                    password=password,
+                )
+            )
+            for model, total in draw_counts(seed, index, size, distribution, len(exercise_ids)).totals().items():
+                next_ids[model] += total
+
+        totals: dict[str, int] = {}
+        # Fresh interpreters rather than forks: a forked connection pool or open connection is unusable in the child.
+        connection.close()
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=options["workers"], mp_context=context, initializer=django.setup) as pool:
+            for done, future in enumerate(as_completed(pool.submit(generate_chunk, chunk) for chunk in chunks), start=1):
+                for table, count in future.result().items():
+                    totals[table] = totals.get(table, 0) + count
+                self.stdout.write(f"chunk {done}/{len(chunks)} written ({time.perf_counter() - started:.1f}s)")
+
+        self.finish()
+        summary = ", ".join(f"{count} {table}" for table, count in totals.items())
+        self.stdout.write(f"Generated {len(exercise_ids)} exercises, {summary} in {time.perf_counter() - started:.1f}s.")
+
+    def create_exercises(self, seed: int, count: int, end: datetime) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Insert the exercise catalog; popularity follows a Zipf-like curve over a shuffled order."""
+        rng = np.random.default_rng([seed])
+        combos = [(equipment, movement, muscle) for movement, muscle in MOVEMENTS for equipment in EQUIPMENT]
+        variants, order = np.divmod(rng.permutation(count), len(combos))
+        first_id = (Exercise.objects.aggregate(last=Max("id"))["last"] or 0) + 1
+        ids = first_id + np.arange(count)
+
+        names, types, descriptions = [], [], []
+        for combo, variant in zip(order.tolist(), variants.tolist(), strict=True):
+            equipment, movement, muscle = combos[combo]
+            names.append(f"{equipment} {movement}" + (f" (variation {variant})" if variant else ""))
+            types.append(muscle)
+            descriptions.append(f"{EXERCISE_MARKER} {movement.lower()} with {equipment.lower()}, targets the {muscle.lower()}.")
+        with transaction.atomic():
+            copy_rows(
+                Exercise,
+                ["id", "name", "type", "description", "updated_at"],
+                [ids.tolist(), names, types, descriptions, [end.isoformat()] * count],
+            )
+
+        rank = rng.permutation(count) + 1
+        popularity = -1.1 * np.log(rank)
+        popularity -= np.logaddexp.reduce(popularity)
+        bodyweight = np.array([combos[combo][0] == "Bodyweight" for combo in order.tolist()], dtype=bool)
+        return ids, popularity, bodyweight
+
+    def reset(self) -> None:
+        """Delete generated users, exercises and everything hanging off them with set-based DELETEs (no ORM cascade)."""
+        started = time.perf_counter()
+        users = User.objects.filter(email__endswith=f"@{EMAIL_DOMAIN}").values("id")
+        plans = WorkoutPlan.objects.filter(creator__in=users).values("id")
+        exercises = Exercise.objects.filter(description__startswith=EXERCISE_MARKER).values("id")
+        # Real plans that picked up generated exercises keep their counters right.
+        touched = set(
+            ExerciseSet.objects.filter(exercise__in=exercises)
+            .exclude(workout_plan__in=plans)
+            .values_list("workout_plan_id", flat=True)
+        )
+        with transaction.atomic():
+            for queryset in (
+                ExerciseSet.objects.filter(workout_plan__in=plans),
+                ExerciseSet.objects.filter(exercise__in=exercises),
+                WorkoutSession.objects.filter(plan__in=plans),
+                WorkoutSession.objects.filter(user__in=users),
+                WeightTracker.objects.filter(user__in=users),
+                TrainingAggregate.objects.filter(user__in=users),
+                User.workout_plans.through.objects.filter(user__in=users),
+                User.workout_plans.through.objects.filter(workoutplan__in=plans),
+                WorkoutPlan.objects.filter(id__in=plans),
+                Exercise.objects.filter(id__in=exercises),
+                User.objects.filter(id__in=users),
+            ):
+                sql, params = queryset.values("pk").query.sql_with_params()
+                table = connection.ops.quote_name(queryset.model._meta.db_table)
+                with connection.cursor() as cursor:
+                    cursor.execute(f"DELETE FROM {table} WHERE id IN ({sql})", params)
+            if touched:
+                refresh_plan_totals(lock_plans(touched))
+        self.stdout.write(f"Removed previous synthetic data in {time.perf_counter() - started:.1f}s.")
+
+    def finish(self) -> None:
+        started = time.perf_counter()
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), [Exercise, *GENERATED_MODELS]):
+                cursor.execute(sql)
+        with connection.cursor() as cursor:
+            for model in (Exercise, *GENERATED_MODELS, TrainingAggregate):
+                cursor.execute(f"ANALYZE {connection.ops.quote_name(model._meta.db_table)}")
+        catalog_cache.invalidate()
+        self.stdout.write(f"Reset sequences and analyzed tables in {time.perf_counter() - started:.1f}s.")
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from authentication.models import User
+from tracker.service.exceptions import ServiceError
+from tracker.service.weight_import import detect_format
+from tracker.service.weight_tracker import get_weight_tracker_service
+
+
+class Command(BaseCommand):
+    help = "Import a user's weight history from a CSV (date,weight) or JSONL file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--user", required=True, help="Email or id of the user the entries belong to.")
+        parser.add_argument("--format", help="csv or jsonl (default: taken from the file extension).")
+
+    def handle(self, *args, **options):
+        lookup = {"id": options["user"]} if options["user"].isdigit() else {"email": options["user"]}
+        user = User.objects.filter(**lookup).first()
+        if user is None:
+            raise CommandError(f"User {options['user']} not found.")
+
+        started = time.perf_counter()
+        try:
+            fmt = detect_format(options["format"] or options["path"])
+            with open(options["path"], "rb") as lines:
+                result = get_weight_tracker_service().import_weight_trackers(user.id, lines, fmt)
+        except (OSError, ServiceError) as e:
+            raise CommandError(str(e))
+
+        for error in result.errors:
+            self.stderr.write(f"line {error.line}: {error.error}")
+        self.stdout.write(
+            f"Imported {result.created} entries in {time.perf_counter() - started:.2f}s, {result.error_count} rows rejected."
+        )
@@ -0,0 +1,17 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from tracker.repository.training_aggregate import get_training_aggregate_repository
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-user daily and weekly training rollups from workout sessions."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", type=int, action="append", dest="users", help="Only rebuild this user id (repeatable).")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        created = get_training_aggregate_repository().rebuild(options["users"])
+        self.stdout.write(f"Rebuilt {created} training aggregate rows in {time.perf_counter() - started:.2f}s.")
@@ -0,0 +1,80 @@
+import gzip
+import os
+import re
+from http import HTTPStatus
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.test import Client
+from django.test.utils import override_settings
+
+from authentication.models import User
+from tracker.models import Exercise
+from tracker.models import WeightTracker
+from tracker.models import WorkoutPlan
+from tracker.models import WorkoutSession
+
+STYLESHEET_RE = re.compile(r'<link rel="stylesheet" href="([^"]+)"')
+
+
+class Command(BaseCommand):
+    help = "Report the HTML size of every page (and the stylesheets it links) as seen by the given user."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", required=True, help="Email or id of the user whose pages are rendered.")
+
+    def handle(self, *args, **options):
+        lookup = {"id": options["user"]} if options["user"].isdigit() else {"email": options["user"]}
+        user = User.objects.filter(**lookup).first()
+        if user is None:
+            raise CommandError(f"User {options['user']} not found.")
+
+        with override_settings(ALLOWED_HOSTS=["testserver"]):
+            client = Client()
+            session = client.session
+            session["user_id"] = user.id
+            session["email"] = user.email
+            session.save()
+            client.cookies[settings.SESSION_COOKIE_NAME] = session.session_key
+
+            self.stdout.write(f"{'page':<28} {'html':>8} {'gzip':>8}  stylesheets")
+            total = 0
+            for path in self.pages(user):
+                response = client.get(path)
+                if response.status_code != HTTPStatus.OK:
+                    self.stderr.write(f"{path}: HTTP {response.status_code}")
+                    continue
+                html = response.content
+                total += len(html)
+                sheets = ", ".join(self.describe(url) for url in STYLESHEET_RE.findall(html.decode("utf-8")))
+                self.stdout.write(f"{path:<28} {len(html):>8} {len(gzip.compress(html)):>8}  {sheets}")
+            self.stdout.write(f"{'total':<28} {total:>8}")
+
+    @staticmethod
+    def pages(user: User) -> list[str]:
+        pages = ["/", "/exercises/", "/plans/", "/plans/create/", "/sessions/", "/weight-tracker/"]
+        detail_pages = [
+            ("/exercises/{}/", Exercise.objects.order_by("id")),
+            ("/plans/{}/", WorkoutPlan.objects.filter(creator=user).order_by("id")),
+            ("/plans/{}/add-exercise/", WorkoutPlan.objects.filter(creator=user).order_by("id")),
+            ("/sessions/{}/", WorkoutSession.objects.filter(user=user).order_by("id")),
+            ("/weight-tracker/{}/", WeightTracker.objects.filter(user=user).order_by("id")),
+        ]
+        for template, queryset in detail_pages:
+            pk = queryset.values_list("id", flat=True).first()
+            if pk is not None:
+                pages.append(template.format(pk))
+        return pages
+
+    @staticmethod
+    def describe(url: str) -> str:
+        """Size of a linked stylesheet in STATIC_ROOT, with its precompressed variants when collectstatic made them."""
+        if not url.startswith(settings.STATIC_URL) and not url.startswith(f"/{settings.STATIC_URL}"):
+            return f"{url} (external)"
+        path = os.path.join(settings.STATIC_ROOT, url.split(settings.STATIC_URL, 1)[1])
+        if not os.path.exists(path):
+            return f"{url} (not collected)"
+        sizes = [f"{os.path.getsize(path)}"]
+        sizes += [f"{ext} {os.path.getsize(path + ext)}" for ext in (".gz", ".br") if os.path.exists(path + ext)]
+        return f"{os.path.basename(path)} ({', '.join(sizes)})"
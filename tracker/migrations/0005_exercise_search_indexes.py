@@ -0,0 +1,26 @@
+# Generated by Django 5.2.5 on 2026-10-18 16:42
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("tracker", "0004_exercise_search_vector"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="exercise",
+            index=django.contrib.postgres.indexes.GinIndex(fields=["search_vector"], name="exercise_search_vector_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="exercise",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["name"], name="exercise_name_trgm_idx", opclasses=["gin_trgm_ops"]
+            ),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.5 on 2026-10-18 16:43
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("tracker", "0005_exercise_search_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="weighttracker",
+            index=models.Index(fields=["user", "date", "id"], include=("weight",), name="weight_user_date_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="workoutplan",
+            index=models.Index(fields=["creator", "id"], name="plan_creator_id_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="workoutsession",
+            index=models.Index(fields=["user", "start_time", "id"], name="session_user_start_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="workoutsession",
+            index=models.Index(condition=models.Q(("status", "active")), fields=["user", "id"], name="session_user_active_idx"),
+        ),
+    ]
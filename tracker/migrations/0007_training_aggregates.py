@@ -0,0 +1,34 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:03
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tracker", "0006_hot_query_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TrainingAggregate",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("period", models.CharField(choices=[("day", "Day"), ("week", "Week")], max_length=8)),
+                ("period_start", models.DateField()),
+                ("session_count", models.PositiveIntegerField(default=0)),
+                ("completed_count", models.PositiveIntegerField(default=0)),
+                ("active_count", models.PositiveIntegerField(default=0)),
+                ("total_minutes", models.PositiveIntegerField(default=0)),
+                ("user", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(fields=("user", "period", "period_start"), name="training_aggregate_user_period_uniq")
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:05
+
+from django.db import migrations
+from django.db import models
+from django.db.models import Count
+from django.db.models import F
+from django.db.models import FloatField
+from django.db.models import OuterRef
+from django.db.models import Subquery
+from django.db.models import Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_plan_counters(apps, schema_editor):
+    WorkoutPlan = apps.get_model("tracker", "WorkoutPlan")
+    ExerciseSet = apps.get_model("tracker", "ExerciseSet")
+
+    sets = ExerciseSet.objects.filter(workout_plan_id=OuterRef("pk")).order_by().values("workout_plan_id")
+    WorkoutPlan.objects.update(
+        exercise_count=Coalesce(Subquery(sets.annotate(c=Count("id")).values("c")), 0),
+        total_volume=Coalesce(
+            Subquery(sets.annotate(v=Sum(F("sets") * F("reps") * F("weight"), output_field=FloatField())).values("v")),
+            0.0,
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tracker", "0007_training_aggregates"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="workoutplan",
+            name="exercise_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="workoutplan",
+            name="total_volume",
+            field=models.FloatField(default=0),
+        ),
+        migrations.RunPython(backfill_plan_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:14
+
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tracker", "0008_plan_counters"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="exercise",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="weighttracker",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="workoutplan",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="workoutsession",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
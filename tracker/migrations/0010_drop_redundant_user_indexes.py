@@ -0,0 +1,45 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tracker", "0009_updated_at"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="weighttracker",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                limit_choices_to=models.Q(("status", "CUSTOMER"), ("status", "ADMIN"), _connector="OR"),
+                on_delete=django.db.models.deletion.CASCADE,
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="workoutplan",
+            name="creator",
+            field=models.ForeignKey(
+                db_index=False,
+                limit_choices_to=models.Q(("status", "CUSTOMER"), ("status", "ADMIN"), _connector="OR"),
+                on_delete=django.db.models.deletion.CASCADE,
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="workoutsession",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                limit_choices_to=models.Q(("status", "CUSTOMER"), ("status", "ADMIN"), _connector="OR"),
+                on_delete=django.db.models.deletion.CASCADE,
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+    ]
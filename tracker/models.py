@@ -1,4 +1,7 @@
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.db.models import ManyToManyField
 from django.db.models import Q
@@ -10,6 +13,22 @@ class Exercise(models.Model):
     name = models.CharField(max_length=256)
     type = models.CharField(max_length=256)
     description = models.TextField()
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector("name", weight="A", config="english")
+            + SearchVector("type", weight="B", config="english")
+            + SearchVector("description", weight="C", config="english")
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=["search_vector"], name="exercise_search_vector_idx"),
+            GinIndex(fields=["name"], name="exercise_name_trgm_idx", opclasses=["gin_trgm_ops"]),
+        ]
 
 
 class WeightTracker(models.Model):
@@ -17,9 +36,17 @@ class WeightTracker(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
         limit_choices_to=Q(status="CUSTOMER") | Q(status="ADMIN"),
+        # Covered by the composite index below, which leads with this column.
+        db_index=False,
     )
     date = models.DateField()
     weight = models.FloatField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "date", "id"], include=["weight"], name="weight_user_date_idx"),
+        ]
 
 
 class WorkoutPlan(models.Model):
@@ -27,12 +54,23 @@ class WorkoutPlan(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
         limit_choices_to=Q(status="CUSTOMER") | Q(status="ADMIN"),
+        # Covered by the composite index below, which leads with this column.
+        db_index=False,
     )
     name = models.CharField(max_length=256)
     version = models.PositiveIntegerField(default=1)
     description = models.TextField()
     exercises: ManyToManyField
     exercises = models.ManyToManyField("Exercise", through="ExerciseSet", related_name="workout_plans")
+    # Denormalized from ExerciseSet by tracker.service.exercise_set; check_plan_counters verifies them.
+    exercise_count = models.PositiveIntegerField(default=0)
+    total_volume = models.FloatField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["creator", "id"], name="plan_creator_id_idx"),
+        ]
 
 
 class WorkoutSession(models.Model):
@@ -44,11 +82,41 @@ class WorkoutSession(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
         limit_choices_to=Q(status="CUSTOMER") | Q(status="ADMIN"),
+        # Covered by the composite index below, which leads with this column.
+        db_index=False,
     )
     plan = models.ForeignKey("WorkoutPlan", on_delete=models.CASCADE)
     duration_minutes = models.PositiveIntegerField()
     status = models.CharField(max_length=16, choices=Status.choices, default=Status.ACTIVE)
     start_time = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "start_time", "id"], name="session_user_start_idx"),
+            models.Index(fields=["user", "id"], condition=Q(status="active"), name="session_user_active_idx"),
+        ]
+
+
+class TrainingAggregate(models.Model):
+    """Per-user rollup of workout sessions for one day or one week (keyed by its Monday)."""
+
+    class Period(models.TextChoices):
+        DAY = "day", "Day"
+        WEEK = "week", "Week"
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    period = models.CharField(max_length=8, choices=Period.choices)
+    period_start = models.DateField()
+    session_count = models.PositiveIntegerField(default=0)
+    completed_count = models.PositiveIntegerField(default=0)
+    active_count = models.PositiveIntegerField(default=0)
+    total_minutes = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "period", "period_start"], name="training_aggregate_user_period_uniq"),
+        ]
 
 
 class ExerciseSet(models.Model):
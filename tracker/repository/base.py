@@ -1,13 +1,22 @@
 from abc import ABC
 from abc import abstractmethod
+from itertools import islice
+from typing import Any
 from typing import Generic
+from typing import Iterable
+from typing import Iterator
+from typing import Sequence
 from typing import Type
 from typing import TypeVar
 
 from django.db import models
+from django.db.models import Prefetch
+from django.utils import timezone
 
 T = TypeVar("T", bound=models.Model)
 
+BATCH_SIZE = 1000
+
 
 class CRUDRepository(ABC, Generic[T]):
     @abstractmethod
@@ -26,10 +35,53 @@ class CRUDRepository(ABC, Generic[T]):
     def delete(self, instance: T) -> None:
         raise NotImplementedError()
 
+    @abstractmethod
+    def create_many(self, rows: Iterable[dict], batch_size: int = BATCH_SIZE) -> int:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def update_many(self, instances: Sequence[T], fields: Sequence[str], batch_size: int = BATCH_SIZE) -> int:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def get_many(self, ids: Iterable[Any]) -> dict[Any, T]:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def exists(self, **filters) -> bool:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def count(self, **filters) -> int:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def values(self, *fields: str, order_by: Sequence[str] = (), **filters) -> list[dict]:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def values_list(self, *fields: str, order_by: Sequence[str] = (), **filters) -> list[tuple]:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def iter_all(
+        self,
+        *,
+        order_by: Sequence[str] = ("pk",),
+        chunk_size: int = BATCH_SIZE,
+        select_related: Sequence[str] = (),
+        prefetch_related: Sequence[str | Prefetch] = (),
+        **filters,
+    ) -> Iterator[T]:
+        raise NotImplementedError()
+
 
 class CRUDRepositorySQLAlchemy(CRUDRepository[T]):
     def __init__(self, model: Type[T]):
         self.model = model
+        # save(update_fields=...) and bulk_update() only touch the fields they are given, so auto_now
+        # fields (updated_at) have to be added explicitly.
+        self.auto_now_fields = [f.name for f in model._meta.concrete_fields if getattr(f, "auto_now", False)]
 
     def create(self, **kwargs) -> T:
         return self.model.objects.create(**kwargs)
@@ -40,8 +92,61 @@ class CRUDRepositorySQLAlchemy(CRUDRepository[T]):
     def update(self, instance: T, **fields) -> T:
         for key, value in fields.items():
             setattr(instance, key, value)
-        instance.save(update_fields=list(fields.keys()))
+        instance.save(update_fields=[*fields, *self.auto_now_fields])
         return instance
 
     def delete(self, instance: T) -> None:
         instance.delete()
+
+    def create_many(self, rows: Iterable[dict], batch_size: int = BATCH_SIZE) -> int:
+        """Insert ``rows`` (field dicts, as passed to ``create``) ``batch_size`` at a time and return how many were written.
+
+        The iterable is consumed lazily, so a generator over a large upload never has to fit in memory.
+        Wrap the call in a transaction when the batches must be written all or nothing.
+        """
+        created = 0
+        rows = iter(rows)
+        while batch := [self.model(**row) for row in islice(rows, batch_size)]:
+            created += len(self.model.objects.bulk_create(batch))
+        return created
+
+    def update_many(self, instances: Sequence[T], fields: Sequence[str], batch_size: int = BATCH_SIZE) -> int:
+        now = timezone.now()
+        for instance in instances:
+            for name in self.auto_now_fields:
+                setattr(instance, name, now)
+        return self.model.objects.bulk_update(instances, [*fields, *self.auto_now_fields], batch_size=batch_size)
+
+    def get_many(self, ids: Iterable[Any]) -> dict[Any, T]:
+        """Fetch the rows with the given primary keys in one query, keyed by primary key; missing ids are left out."""
+        return self.model.objects.in_bulk(list(ids))
+
+    def exists(self, **filters) -> bool:
+        return self.model.objects.filter(**filters).exists()
+
+    def count(self, **filters) -> int:
+        return self.model.objects.filter(**filters).count()
+
+    def values(self, *fields: str, order_by: Sequence[str] = (), **filters) -> list[dict]:
+        """Only the given columns of the matching rows, as dicts, without building model instances."""
+        return list(self.model.objects.filter(**filters).order_by(*order_by).values(*fields))
+
+    def values_list(self, *fields: str, order_by: Sequence[str] = (), **filters) -> list[tuple]:
+        """Only the given columns of the matching rows, as tuples, without building model instances."""
+        return list(self.model.objects.filter(**filters).order_by(*order_by).values_list(*fields))
+
+    def iter_all(
+        self,
+        *,
+        order_by: Sequence[str] = ("pk",),
+        chunk_size: int = BATCH_SIZE,
+        select_related: Sequence[str] = (),
+        prefetch_related: Sequence[str | Prefetch] = (),
+        **filters,
+    ) -> Iterator[T]:
+        """Stream the matching rows through a server-side cursor, ``chunk_size`` rows per round trip.
+
+        ``prefetch_related`` lookups are run once per chunk, so memory stays flat however many rows match.
+        """
+        queryset = self.model.objects.filter(**filters).select_related(*select_related).prefetch_related(*prefetch_related)
+        return queryset.order_by(*order_by).iterator(chunk_size=chunk_size)
@@ -0,0 +1,196 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+from typing import Callable
+from typing import Iterable
+from typing import Iterator
+from typing import Sequence
+
+from django.db import transaction
+from django.db.models import Prefetch
+
+from .base import BATCH_SIZE
+from .base import CRUDRepository
+from .base import T
+
+_MISSING = object()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+
+class LRUCache:
+    """Per-process, size-bounded LRU map whose entries also expire ``ttl`` seconds after they were stored.
+
+    An entry stored with a ``stamp`` is only returned to a lookup passing the same stamp.
+    """
+
+    def __init__(self, max_entries: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.stats = CacheStats()
+        self._entries: OrderedDict[Any, tuple[float, Any, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any, stamp: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self.clock() or entry[1] != stamp:
+                if entry is not None:
+                    del self._entries[key]
+                self.stats.misses += 1
+                return _MISSING
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return entry[2]
+
+    def set(self, key: Any, value: Any, stamp: Any = None) -> None:
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl, stamp, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def delete(self, key: Any) -> None:
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self.stats.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_registry: dict[str, LRUCache] = {}
+
+
+def get_lru_cache(name: str, max_entries: int, ttl: float) -> LRUCache:
+    """The process-wide cache registered under ``name``; repositories are built per service, their caches are not."""
+    if name not in _registry:
+        _registry[name] = LRUCache(max_entries, ttl)
+    return _registry[name]
+
+
+def cache_stats() -> dict[str, dict]:
+    return {name: {**vars(lru.stats), "size": len(lru)} for name, lru in _registry.items()}
+
+
+def clear_caches() -> None:
+    for lru in _registry.values():
+        lru.clear()
+
+
+class CachingRepository(CRUDRepository[T]):
+    """Read-through cache around a repository's ``get_by_id_and_user`` lookups.
+
+    The rest of ``CRUDRepository`` is delegated to the wrapped repository; subclasses delegate the
+    methods of the repository interface they implement. ``update``/``update_many``/``delete`` drop
+    the rows' entries before writing and again once the transaction commits, so a read that raced the
+    write cannot leave the old row behind. Locked reads always go to the database.
+
+    The cache lives in process memory, so each entry is stamped with the owner's ``version(user_id)``
+    at the time it was read, and a hit is only served while the version is unchanged. With the
+    per-user data version (bumped by every service write, kept in the shared cache), a write committed
+    by any worker makes the other workers' entries for that user miss. Writes that bypass the services
+    (admin, cascades) are only seen once the entry expires, so keep the TTL short.
+    """
+
+    def __init__(self, repo: CRUDRepository[T], lru: LRUCache, version: Callable[[int], Any]):
+        self.repo = repo
+        self.lru = lru
+        self.version = version
+
+    def get_by_id_and_user(self, entry_id: int, user_id: int, lock: bool = False) -> T | None:
+        if lock:
+            return self.repo.get_by_id_and_user(entry_id, user_id, lock=True)
+
+        key = (entry_id, user_id)
+        # Read before the row, so a write committed in between leaves the entry with an old stamp.
+        version = self.version(user_id)
+        instance = self.lru.get(key, version)
+        if instance is _MISSING:
+            instance = self.repo.get_by_id_and_user(entry_id, user_id)
+            if instance is None:
+                return None
+            self.lru.set(key, copy.copy(instance), version)
+        # Callers mutate what they get back, so the cached instance is never handed out itself.
+        return copy.copy(instance)
+
+    def create(self, **kwargs) -> T:
+        return self.repo.create(**kwargs)
+
+    def get(self, **filters) -> T | None:
+        return self.repo.get(**filters)
+
+    def update(self, instance: T, **fields) -> T:
+        self.invalidate(instance)
+        return self.repo.update(instance, **fields)
+
+    def delete(self, instance: T) -> None:
+        self.invalidate(instance)
+        self.repo.delete(instance)
+
+    def create_many(self, rows: Iterable[dict], batch_size: int = BATCH_SIZE) -> int:
+        return self.repo.create_many(rows, batch_size=batch_size)
+
+    def update_many(self, instances: Sequence[T], fields: Sequence[str], batch_size: int = BATCH_SIZE) -> int:
+        self.invalidate(*instances)
+        return self.repo.update_many(instances, fields, batch_size=batch_size)
+
+    def get_many(self, ids: Iterable[Any]) -> dict[Any, T]:
+        return self.repo.get_many(ids)
+
+    def exists(self, **filters) -> bool:
+        return self.repo.exists(**filters)
+
+    def count(self, **filters) -> int:
+        return self.repo.count(**filters)
+
+    def values(self, *fields: str, order_by: Sequence[str] = (), **filters) -> list[dict]:
+        return self.repo.values(*fields, order_by=order_by, **filters)
+
+    def values_list(self, *fields: str, order_by: Sequence[str] = (), **filters) -> list[tuple]:
+        return self.repo.values_list(*fields, order_by=order_by, **filters)
+
+    def iter_all(
+        self,
+        *,
+        order_by: Sequence[str] = ("pk",),
+        chunk_size: int = BATCH_SIZE,
+        select_related: Sequence[str] = (),
+        prefetch_related: Sequence[str | Prefetch] = (),
+        **filters,
+    ) -> Iterator[T]:
+        return self.repo.iter_all(
+            order_by=order_by,
+            chunk_size=chunk_size,
+            select_related=select_related,
+            prefetch_related=prefetch_related,
+            **filters,
+        )
+
+    def invalidate(self, *instances: T) -> None:
+        keys = [self._key(instance) for instance in instances]
+        self._drop(keys)
+        transaction.on_commit(lambda: self._drop(keys))
+
+    def _drop(self, keys: Iterable[tuple[int, int]]) -> None:
+        for key in keys:
+            self.lru.delete(key)
+
+    @staticmethod
+    def _key(instance: T) -> tuple[int, int]:
+        return instance.pk, instance.user_id
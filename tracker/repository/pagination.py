@@ -0,0 +1,128 @@
+import base64
+import json
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Generic
+from typing import TypeVar
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.db.models import QuerySet
+
+T = TypeVar("T")
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+# Largest value of a Postgres bigint; anything outside it fails in the database rather than here.
+MAX_CURSOR_INT = 2**63 - 1
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+@dataclass
+class Page(Generic[T]):
+    items: list[T] = field(default_factory=list)
+    next_cursor: str | None = None
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+
+def clamp_limit(limit: int | str | None) -> int:
+    try:
+        value = int(limit) if limit else DEFAULT_PAGE_SIZE
+    except (TypeError, ValueError):
+        value = DEFAULT_PAGE_SIZE
+    return max(1, min(value, MAX_PAGE_SIZE))
+
+
+def encode_cursor(values: list) -> str:
+    raw = json.dumps(values, default=str, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError):
+        raise InvalidCursorError("Malformed cursor")
+    if not isinstance(values, list):
+        raise InvalidCursorError("Malformed cursor")
+    return values
+
+
+def keyset_paginate(queryset: QuerySet, key: tuple[str, str], cursor: str | None, limit: int, descending: bool = False) -> Page:
+    """Return one page of ``queryset`` ordered by ``key`` (sort column, unique tie-breaker).
+
+    Rows are located with a ``WHERE (sort, id) < (last_sort, last_id)`` style predicate instead
+    of ``OFFSET``, so the cost of a page does not grow with how deep the client has paged.
+    The sort column may also be an annotation (e.g. a search rank) already present on the queryset.
+    ``.values()`` querysets work too, as long as both key columns are selected.
+    """
+    queryset = _page_queryset(queryset, key, cursor, descending)
+    return _build_page(list(queryset[: limit + 1]), key, limit)
+
+
+async def akeyset_paginate(
+    queryset: QuerySet, key: tuple[str, str], cursor: str | None, limit: int, descending: bool = False
+) -> Page:
+    queryset = _page_queryset(queryset, key, cursor, descending)
+    return _build_page([row async for row in queryset[: limit + 1]], key, limit)
+
+
+def _page_queryset(queryset: QuerySet, key: tuple[str, str], cursor: str | None, descending: bool) -> QuerySet:
+    sort_field, tie_field = key
+    prefix = "-" if descending else ""
+    queryset = queryset.order_by(f"{prefix}{sort_field}", f"{prefix}{tie_field}")
+    if not cursor:
+        return queryset
+
+    values = decode_cursor(cursor)
+    if len(values) != len(key):
+        raise InvalidCursorError("Malformed cursor")
+    try:
+        sort_value = _to_python(queryset, sort_field, values[0])
+        tie_value = _to_python(queryset, tie_field, values[1])
+    except (ValidationError, TypeError, ValueError, OverflowError):
+        raise InvalidCursorError("Malformed cursor")
+    if any(isinstance(v, int) and abs(v) > MAX_CURSOR_INT for v in (sort_value, tie_value)):
+        raise InvalidCursorError("Malformed cursor")
+    lookup = "lt" if descending else "gt"
+    # Same as (sort < v) OR (sort = v AND tie < t), plus a redundant bound on the sort column
+    # alone so the planner can turn it into an index range condition.
+    return queryset.filter(
+        Q(**{f"{sort_field}__{lookup}e": sort_value}),
+        Q(**{f"{sort_field}__{lookup}": sort_value}) | Q(**{f"{tie_field}__{lookup}": tie_value}),
+    )
+
+
+def _build_page(rows: list, key: tuple[str, str], limit: int) -> Page:
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([last[name] if isinstance(last, dict) else getattr(last, name) for name in key])
+    return Page(items=rows, next_cursor=next_cursor)
+
+
+def _to_python(queryset: QuerySet, name: str, value):
+    # Cursors are client input: only the scalar types encode_cursor writes are accepted.
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        raise InvalidCursorError("Malformed cursor")
+    try:
+        return queryset.model._meta.get_field(name).to_python(value)
+    except FieldDoesNotExist:
+        if name not in queryset.query.annotations or not isinstance(value, (int, float)):
+            raise InvalidCursorError("Malformed cursor")
+        return value
@@ -1,39 +1,99 @@
-from abc import ABC
 from abc import abstractmethod
+from typing import Iterator
 from typing import Sequence
 
+from django.conf import settings
+from django.db.models import Prefetch
+
+from tracker.models import ExerciseSet
 from tracker.models import WorkoutSession
+from tracker.service.data_version import get_data_version
 
+from .base import CRUDRepository
 from .base import CRUDRepositorySQLAlchemy
+from .caching import CachingRepository
+from .caching import get_lru_cache
+from .pagination import Page
+from .pagination import keyset_paginate
 
 
-class WorkoutSessionRepository(ABC):
+class WorkoutSessionRepository(CRUDRepository[WorkoutSession]):
     @abstractmethod
-    def get_by_id_and_user(self, session_id: int, user_id: int) -> WorkoutSession | None:
+    def get_by_id_and_user(self, session_id: int, user_id: int, lock: bool = False) -> WorkoutSession | None:
         raise NotImplementedError()
 
     @abstractmethod
     def get_all_by_user(self, user_id: int) -> Sequence[WorkoutSession]:
         raise NotImplementedError()
 
+    @abstractmethod
+    def get_page_by_user(self, user_id: int, cursor: str | None, limit: int) -> Page[WorkoutSession]:
+        raise NotImplementedError()
+
     @abstractmethod
     def get_active_by_user(self, user_id: int) -> WorkoutSession | None:
         raise NotImplementedError()
 
+    @abstractmethod
+    def iter_history_by_user(self, user_id: int, chunk_size: int) -> Iterator[WorkoutSession]:
+        raise NotImplementedError()
+
 
 class WorkoutSessionRepositoryImpl(CRUDRepositorySQLAlchemy[WorkoutSession], WorkoutSessionRepository):
     def __init__(self):
         super().__init__(WorkoutSession)
 
-    def get_by_id_and_user(self, session_id: int, user_id: int) -> WorkoutSession | None:
-        return self.model.objects.filter(id=session_id, user_id=user_id).first()
+    def get_by_id_and_user(self, session_id: int, user_id: int, lock: bool = False) -> WorkoutSession | None:
+        queryset = self.model.objects.filter(id=session_id, user_id=user_id)
+        if lock:
+            queryset = queryset.select_for_update()
+        return queryset.first()
 
     def get_all_by_user(self, user_id: int) -> Sequence[WorkoutSession]:
         return self.model.objects.filter(user_id=user_id).order_by("-start_time")
 
+    def get_page_by_user(self, user_id: int, cursor: str | None, limit: int) -> Page[WorkoutSession]:
+        queryset = self.model.objects.filter(user_id=user_id).select_related("plan")
+        return keyset_paginate(queryset, ("start_time", "id"), cursor, limit, descending=True)
+
     def get_active_by_user(self, user_id: int) -> WorkoutSession | None:
-        return self.model.objects.filter(user_id=user_id, status=WorkoutSession.Status.ACTIVE).first()
+        return self.get(user_id=user_id, status=WorkoutSession.Status.ACTIVE)
+
+    def iter_history_by_user(self, user_id: int, chunk_size: int) -> Iterator[WorkoutSession]:
+        """Oldest first, with each session's plan and the plan's exercise sets (and their exercises) loaded."""
+        return self.iter_all(
+            order_by=("start_time", "id"),
+            chunk_size=chunk_size,
+            select_related=("plan",),
+            prefetch_related=(
+                Prefetch("plan__exerciseset_set", queryset=ExerciseSet.objects.select_related("exercise").order_by("id")),
+            ),
+            user_id=user_id,
+        )
+
+
+class CachingWorkoutSessionRepository(CachingRepository[WorkoutSession], WorkoutSessionRepository):
+    repo: WorkoutSessionRepository
+
+    def get_all_by_user(self, user_id: int) -> Sequence[WorkoutSession]:
+        return self.repo.get_all_by_user(user_id)
+
+    def get_page_by_user(self, user_id: int, cursor: str | None, limit: int) -> Page[WorkoutSession]:
+        return self.repo.get_page_by_user(user_id, cursor, limit)
+
+    def get_active_by_user(self, user_id: int) -> WorkoutSession | None:
+        return self.repo.get_active_by_user(user_id)
+
+    def iter_history_by_user(self, user_id: int, chunk_size: int) -> Iterator[WorkoutSession]:
+        return self.repo.iter_history_by_user(user_id, chunk_size)
 
 
 def get_session_repository() -> WorkoutSessionRepository:
-    return WorkoutSessionRepositoryImpl()
+    repo = WorkoutSessionRepositoryImpl()
+    if not settings.REPOSITORY_CACHE_TTL:
+        return repo
+    return CachingWorkoutSessionRepository(
+        repo,
+        get_lru_cache("sessions", settings.REPOSITORY_CACHE_MAX_ENTRIES, settings.REPOSITORY_CACHE_TTL),
+        get_data_version,
+    )
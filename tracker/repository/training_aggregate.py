@@ -0,0 +1,132 @@
+from abc import ABC
+from abc import abstractmethod
+from datetime import date
+from datetime import timedelta
+from typing import Sequence
+
+from django.db import connection
+from django.db import transaction
+from django.db.models import Count
+from django.db.models import DateField
+from django.db.models import Q
+from django.db.models import Sum
+from django.db.models.functions import Trunc
+from django.utils import timezone
+
+from tracker.models import TrainingAggregate
+from tracker.models import WorkoutSession
+
+REBUILD_BATCH_SIZE = 5000
+
+
+class TrainingAggregateRepository(ABC):
+    @abstractmethod
+    def apply_delta(
+        self, user_id: int, day: date, *, sessions: int = 0, completed: int = 0, active: int = 0, minutes: int = 0
+    ) -> None:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def get_recent(self, user_id: int, period: str, limit: int) -> Sequence[TrainingAggregate]:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def rebuild(self, user_ids: Sequence[int] | None = None) -> int:
+        raise NotImplementedError()
+
+
+class TrainingAggregateRepositoryImpl(TrainingAggregateRepository):
+    def apply_delta(
+        self, user_id: int, day: date, *, sessions: int = 0, completed: int = 0, active: int = 0, minutes: int = 0
+    ) -> None:
+        """Add the deltas to the user's day and week rows in one upsert.
+
+        Missing rows are inserted with the positive part of each delta; counters are clamped at zero
+        so a decrement against a row that predates the backfill cannot violate the column checks.
+        Rows left without sessions are removed, matching what a rebuild produces.
+        """
+        table = connection.ops.quote_name(TrainingAggregate._meta.db_table)
+        deltas = {"sessions": sessions, "completed": completed, "active": active, "minutes": minutes}
+        params = {
+            "user_id": user_id,
+            "day": day,
+            "week": day - timedelta(days=day.weekday()),
+            **deltas,
+            **{f"initial_{name}": max(value, 0) for name, value in deltas.items()},
+        }
+        initial = ", ".join(f"%(initial_{name})s" for name in deltas)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {table} (user_id, period, period_start, session_count, completed_count, active_count, total_minutes)
+                VALUES
+                    (%(user_id)s, 'day', %(day)s, {initial}),
+                    (%(user_id)s, 'week', %(week)s, {initial})
+                ON CONFLICT (user_id, period, period_start) DO UPDATE SET
+                    session_count = GREATEST({table}.session_count + %(sessions)s, 0),
+                    completed_count = GREATEST({table}.completed_count + %(completed)s, 0),
+                    active_count = GREATEST({table}.active_count + %(active)s, 0),
+                    total_minutes = GREATEST({table}.total_minutes + %(minutes)s, 0)
+                """,
+                params,
+            )
+            if sessions < 0:
+                cursor.execute(
+                    f"""
+                    DELETE FROM {table}
+                    WHERE user_id = %(user_id)s AND session_count = 0
+                        AND ((period = 'day' AND period_start = %(day)s) OR (period = 'week' AND period_start = %(week)s))
+                    """,
+                    params,
+                )
+
+    def get_recent(self, user_id: int, period: str, limit: int) -> Sequence[TrainingAggregate]:
+        return TrainingAggregate.objects.filter(user_id=user_id, period=period).order_by("-period_start")[:limit]
+
+    def rebuild(self, user_ids: Sequence[int] | None = None) -> int:
+        """Recompute the rollups of the given users (all users by default) from their sessions."""
+        sessions = WorkoutSession.objects.all()
+        aggregates = TrainingAggregate.objects.all()
+        if user_ids is not None:
+            sessions = sessions.filter(user_id__in=user_ids)
+            aggregates = aggregates.filter(user_id__in=user_ids)
+
+        created = 0
+        with transaction.atomic():
+            aggregates.delete()
+            for period in TrainingAggregate.Period.values:
+                rows = (
+                    sessions.annotate(
+                        bucket=Trunc("start_time", period, output_field=DateField(), tzinfo=timezone.get_default_timezone())
+                    )
+                    .values("user_id", "bucket")
+                    .annotate(
+                        session_count=Count("id"),
+                        completed_count=Count("id", filter=Q(status=WorkoutSession.Status.COMPLETED)),
+                        active_count=Count("id", filter=Q(status=WorkoutSession.Status.ACTIVE)),
+                        total_minutes=Sum("duration_minutes"),
+                    )
+                    .order_by()
+                )
+                batch = []
+                for row in rows.iterator(chunk_size=REBUILD_BATCH_SIZE):
+                    batch.append(
+                        TrainingAggregate(
+                            user_id=row["user_id"],
+                            period=period,
+                            period_start=row["bucket"],
+                            session_count=row["session_count"],
+                            completed_count=row["completed_count"],
+                            active_count=row["active_count"],
+                            total_minutes=row["total_minutes"] or 0,
+                        )
+                    )
+                    if len(batch) >= REBUILD_BATCH_SIZE:
+                        created += len(TrainingAggregate.objects.bulk_create(batch))
+                        batch = []
+                created += len(TrainingAggregate.objects.bulk_create(batch))
+        return created
+
+
+def get_training_aggregate_repository() -> TrainingAggregateRepository:
+    return TrainingAggregateRepositoryImpl()
@@ -1,21 +1,42 @@
-from abc import ABC
 from abc import abstractmethod
+from datetime import date
+from typing import Iterator
 from typing import Sequence
 
+from django.conf import settings
+
 from tracker.models import WeightTracker
+from tracker.service.data_version import get_data_version
 
+from .base import CRUDRepository
 from .base import CRUDRepositorySQLAlchemy
+from .caching import CachingRepository
+from .caching import get_lru_cache
+from .pagination import Page
+from .pagination import keyset_paginate
 
 
-class WeightTrackerRepository(ABC):
+class WeightTrackerRepository(CRUDRepository[WeightTracker]):
     @abstractmethod
     def get_all_by_user(self, user_id: int) -> Sequence[WeightTracker]:
         raise NotImplementedError()
 
+    @abstractmethod
+    def get_page_by_user(self, user_id: int, cursor: str | None, limit: int) -> Page[WeightTracker]:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def get_series_by_user(self, user_id: int) -> Sequence[tuple[date, float]]:
+        raise NotImplementedError()
+
     @abstractmethod
     def get_by_id_and_user(self, entry_id: int, user_id: int) -> WeightTracker | None:
         raise NotImplementedError()
 
+    @abstractmethod
+    def iter_history_by_user(self, user_id: int, chunk_size: int) -> Iterator[WeightTracker]:
+        raise NotImplementedError()
+
 
 class WeightTrackerRepositoryImpl(CRUDRepositorySQLAlchemy[WeightTracker], WeightTrackerRepository):
     def __init__(self):
@@ -24,9 +45,42 @@ class WeightTrackerRepositoryImpl(CRUDRepositorySQLAlchemy[WeightTracker], Weigh
     def get_all_by_user(self, user_id: int) -> Sequence[WeightTracker]:
         return self.model.objects.filter(user_id=user_id).order_by("-date")
 
+    def get_page_by_user(self, user_id: int, cursor: str | None, limit: int) -> Page[WeightTracker]:
+        queryset = self.model.objects.filter(user_id=user_id)
+        return keyset_paginate(queryset, ("date", "id"), cursor, limit, descending=True)
+
+    def get_series_by_user(self, user_id: int) -> Sequence[tuple[date, float]]:
+        return self.values_list("date", "weight", order_by=("date", "id"), user_id=user_id)
+
     def get_by_id_and_user(self, entry_id: int, user_id: int) -> WeightTracker | None:
-        return self.model.objects.filter(id=entry_id, user_id=user_id).first()
+        return self.get(id=entry_id, user_id=user_id)
+
+    def iter_history_by_user(self, user_id: int, chunk_size: int) -> Iterator[WeightTracker]:
+        return self.iter_all(order_by=("date", "id"), chunk_size=chunk_size, user_id=user_id)
+
+
+class CachingWeightTrackerRepository(CachingRepository[WeightTracker], WeightTrackerRepository):
+    repo: WeightTrackerRepository
+
+    def get_all_by_user(self, user_id: int) -> Sequence[WeightTracker]:
+        return self.repo.get_all_by_user(user_id)
+
+    def get_page_by_user(self, user_id: int, cursor: str | None, limit: int) -> Page[WeightTracker]:
+        return self.repo.get_page_by_user(user_id, cursor, limit)
+
+    def get_series_by_user(self, user_id: int) -> Sequence[tuple[date, float]]:
+        return self.repo.get_series_by_user(user_id)
+
+    def iter_history_by_user(self, user_id: int, chunk_size: int) -> Iterator[WeightTracker]:
+        return self.repo.iter_history_by_user(user_id, chunk_size)
 
 
 def get_weight_tracker_repository() -> WeightTrackerRepository:
-    return WeightTrackerRepositoryImpl()
+    repo = WeightTrackerRepositoryImpl()
+    if not settings.REPOSITORY_CACHE_TTL:
+        return repo
+    return CachingWeightTrackerRepository(
+        repo,
+        get_lru_cache("weight_trackers", settings.REPOSITORY_CACHE_MAX_ENTRIES, settings.REPOSITORY_CACHE_TTL),
+        get_data_version,
+    )
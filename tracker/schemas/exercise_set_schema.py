@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from pydantic import ConfigDict
+from pydantic import Field
 
 
 class ExerciseSetSchema(BaseModel):
@@ -11,3 +12,14 @@ class ExerciseSetSchema(BaseModel):
     weight: float
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class ExerciseSetInputSchema(BaseModel):
+    exercise_id: int
+    sets: int = Field(default=3, ge=0)
+    reps: int = Field(default=10, ge=0)
+    weight: float = Field(default=0, ge=0)
+
+
+class ExerciseSetBatchSchema(BaseModel):
+    exercise_sets: list[ExerciseSetInputSchema]
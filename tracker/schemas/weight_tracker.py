@@ -1,7 +1,9 @@
+from datetime import date
 from datetime import datetime
 
 from pydantic import BaseModel
 from pydantic import ConfigDict
+from pydantic import Field
 
 
 class WeightTrackerSchema(BaseModel):
@@ -11,3 +13,30 @@ class WeightTrackerSchema(BaseModel):
     weight: float
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class WeightEntryImportSchema(BaseModel):
+    date: date
+    weight: float = Field(gt=0, lt=1000)
+
+
+class WeekTrendSchema(BaseModel):
+    week_start: date
+    average: float
+    delta: float | None = None
+
+
+class WeightTrendSchema(BaseModel):
+    count: int
+    latest: float | None = None
+    rolling_average: float | None = None
+    ema: float | None = None
+    week_over_week: float | None = None
+    weeks: list[WeekTrendSchema] = []
+
+
+class WeightTrendPointSchema(BaseModel):
+    date: date
+    weight: float
+    rolling_average: float
+    ema: float
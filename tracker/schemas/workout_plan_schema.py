@@ -7,5 +7,7 @@ class WorkoutPlanSchema(BaseModel):
     name: str
     version: int
     description: str
+    exercise_count: int = 0
+    total_volume: float = 0
 
     model_config = ConfigDict(from_attributes=True)
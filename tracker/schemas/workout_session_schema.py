@@ -1,3 +1,4 @@
+from datetime import date
 from datetime import datetime
 
 from pydantic import BaseModel
@@ -13,3 +14,13 @@ class WorkoutSessionSchema(BaseModel):
     start_time: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class TrainingAggregateSchema(BaseModel):
+    period_start: date
+    session_count: int
+    completed_count: int
+    active_count: int
+    total_minutes: int
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,37 @@
+from functools import cache
+from typing import Any
+from typing import Iterable
+from typing import TypeVar
+
+from django.http import HttpResponse
+from pydantic import BaseModel
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+
+S = TypeVar("S", bound=BaseModel)
+
+
+@cache
+def _list_adapter(schema: type[S]) -> TypeAdapter[list[S]]:
+    return TypeAdapter(list[schema])
+
+
+def validate_rows(schema: type[S], rows: Iterable[Any]) -> list[S]:
+    """Validate a whole result set in one call, from ``.values()`` dicts or model instances alike.
+
+    Dict rows skip the per-attribute lookups ``from_attributes`` needs; keys the schema does not
+    declare (sort annotations and the like) are ignored.
+    """
+    return _list_adapter(schema).validate_python(rows if isinstance(rows, list) else list(rows), from_attributes=True)
+
+
+class SchemaJsonResponse(HttpResponse):
+    """JSON response encoded by pydantic-core.
+
+    ``data`` may mix plain containers with schema instances at any depth; everything is written
+    straight to bytes, without dumping the schemas to intermediate dicts first.
+    """
+
+    def __init__(self, data: Any, **kwargs):
+        kwargs.setdefault("content_type", "application/json")
+        super().__init__(content=to_json(data), **kwargs)
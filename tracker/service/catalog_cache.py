@@ -0,0 +1,130 @@
+import threading
+import time
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+from typing import TypeVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+T = TypeVar("T")
+
+_MISSING = object()
+
+
+class CatalogCache:
+    """Two-tier cache for data derived from the exercise catalog.
+
+    L1 is a per-process dict, L2 the configured Django cache shared by every worker. Keys are
+    scoped by a catalog version stored in L2; writers bump it, which makes every older entry
+    unreachable in all workers at once. A read costs one L2 lookup of the version number and
+    is otherwise served from process memory.
+
+    A missing version (first start, or evicted from L2) is seeded from the clock rather than 1,
+    so it never lands on a version whose entries may still be in L2.
+    """
+
+    def __init__(self, alias: str = "default", namespace: str = "catalog", max_local_entries: int = 256):
+        self.alias = alias
+        self.namespace = namespace
+        self.max_local_entries = max_local_entries
+        self._local: dict[str, Any] = {}
+        self._local_version: int | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    @property
+    def version_key(self) -> str:
+        return f"{self.namespace}:version"
+
+    def version(self) -> int:
+        version = self.backend.get(self.version_key)
+        if version is None:
+            self._seed_version()
+            version = self.backend.get(self.version_key, 0)
+        return version
+
+    async def aversion(self) -> int:
+        version = await self.backend.aget(self.version_key)
+        if version is None:
+            await self.backend.aadd(self.version_key, self._clock_version(), timeout=None)
+            version = await self.backend.aget(self.version_key, 0)
+        return version
+
+    def get_or_set(self, name: str, loader: Callable[[], T]) -> T:
+        version = self.version()
+        value = self._local_get(version, name)
+        if value is not _MISSING:
+            return value
+
+        key = self._key(version, name)
+        value = self.backend.get(key, _MISSING)
+        if value is _MISSING:
+            value = loader()
+            self.backend.set(key, value, timeout=settings.CATALOG_CACHE_TIMEOUT)
+
+        self._local_set(version, name, value)
+        return value
+
+    async def aget_or_set(self, name: str, loader: Callable[[], Awaitable[T]]) -> T:
+        version = await self.aversion()
+        value = self._local_get(version, name)
+        if value is not _MISSING:
+            return value
+
+        key = self._key(version, name)
+        value = await self.backend.aget(key, _MISSING)
+        if value is _MISSING:
+            value = await loader()
+            await self.backend.aset(key, value, timeout=settings.CATALOG_CACHE_TIMEOUT)
+
+        self._local_set(version, name, value)
+        return value
+
+    def bump(self) -> None:
+        try:
+            self.backend.incr(self.version_key)
+        except ValueError:
+            self._seed_version()
+
+    async def abump(self) -> None:
+        try:
+            await self.backend.aincr(self.version_key)
+        except ValueError:
+            await self.backend.aadd(self.version_key, self._clock_version(), timeout=None)
+
+    def _key(self, version: int, name: str) -> str:
+        return f"{self.namespace}:{version}:{name}"
+
+    def _local_get(self, version: int, name: str) -> Any:
+        with self._lock:
+            if self._local_version != version:
+                self._local = {}
+                self._local_version = version
+            return self._local.get(name, _MISSING)
+
+    def _local_set(self, version: int, name: str, value: Any) -> None:
+        with self._lock:
+            if self._local_version == version:
+                if len(self._local) >= self.max_local_entries:
+                    self._local = {}
+                self._local[name] = value
+
+    def _seed_version(self) -> None:
+        self.backend.add(self.version_key, self._clock_version(), timeout=None)
+
+    @staticmethod
+    def _clock_version() -> int:
+        return time.time_ns() // 1_000_000
+
+    def invalidate(self) -> None:
+        """Bump the catalog version once the current transaction (if any) commits."""
+        transaction.on_commit(self.bump)
+
+
+catalog_cache = CatalogCache()
@@ -0,0 +1,56 @@
+import time
+from datetime import UTC
+from datetime import datetime
+from typing import Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from ..models import WorkoutPlan
+from ..models import WorkoutSession
+
+
+def _version_key(user_id: int) -> str:
+    return f"user:{user_id}:data_version"
+
+
+def _now_ms() -> int:
+    return time.time_ns() // 1_000_000
+
+
+def get_data_version(user_id: int) -> int:
+    """Millisecond timestamp of the user's last tracked write, kept in the cache so checking it never hits the database.
+
+    A missing version (never written, expired or evicted) is seeded from the clock, which only ever
+    makes clients refetch. Writes that bypass the service layer (admin, cascades from deleting the user)
+    are picked up once the version expires after ``DATA_VERSION_TIMEOUT``.
+    """
+    version = cache.get(_version_key(user_id))
+    if version is None:
+        cache.add(_version_key(user_id), _now_ms(), timeout=settings.DATA_VERSION_TIMEOUT)
+        version = cache.get(_version_key(user_id), 0)
+    return version
+
+
+def bump_data_version(*user_ids: int) -> None:
+    """Move the users' versions forward once the current transaction (if any) commits."""
+
+    def bump():
+        for user_id in user_ids:
+            current = cache.get(_version_key(user_id)) or 0
+            cache.set(_version_key(user_id), max(_now_ms(), current + 1), timeout=settings.DATA_VERSION_TIMEOUT)
+
+    transaction.on_commit(bump)
+
+
+def bump_plan_data_version(plan_ids: Iterable[int]) -> None:
+    """Bump the creators of the plans and every user with a session on them, whose session lists show the plan."""
+    plan_ids = list(plan_ids)
+    creators = WorkoutPlan.objects.filter(id__in=plan_ids).values_list("creator_id", flat=True)
+    trainees = WorkoutSession.objects.filter(plan_id__in=plan_ids).values_list("user_id", flat=True).distinct()
+    bump_data_version(*{*creators, *trainees})
+
+
+def version_timestamp(version: int) -> datetime:
+    return datetime.fromtimestamp(version / 1000, tz=UTC)
@@ -1,7 +1,25 @@
+import hashlib
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+
+from tracker.repository.pagination import InvalidCursorError
+from tracker.repository.pagination import Page
+from tracker.repository.pagination import akeyset_paginate
+from tracker.repository.pagination import keyset_paginate
 from tracker.schemas.exercise_schema import ExerciseSchema
+from tracker.serialization import validate_rows
 
+from .catalog_cache import catalog_cache
 from .exceptions import ServiceError
+from .exercise_search import RANK_FIELD
+from .exercise_search import search_exercises
+from .exercise_set import lock_plans
+from .exercise_set import refresh_plan_totals
 from ..models import Exercise
+from ..models import ExerciseSet
+
+EXERCISE_FIELDS = tuple(ExerciseSchema.model_fields)
 
 
 def get_exercise_by_id(exercise_id: int) -> ExerciseSchema:
@@ -12,7 +30,86 @@ def get_exercise_by_id(exercise_id: int) -> ExerciseSchema:
     return ExerciseSchema.model_validate(exercise)
 
 
-def create_exercise(payload: dict) -> ExerciseSchema:
+async def aget_exercise_by_id(exercise_id: int) -> ExerciseSchema:
+    try:
+        exercise = await Exercise.objects.aget(id=exercise_id)
+    except Exercise.DoesNotExist:
+        raise ServiceError(f"Exercise with id {exercise_id} not found", code=404)
+    return ExerciseSchema.model_validate(exercise)
+
+
+# Only first pages of an existing type (or of every type) are cached: cursors and type filters come
+# from the client, and caching every value sent would let any client fill the shared cache.
+def list_exercises(search: str, exercise_type: str, cursor: str | None, limit: int) -> Page[ExerciseSchema]:
+    if search or cursor or (exercise_type and exercise_type not in get_exercise_types()):
+        return _load_exercise_page(search, exercise_type, cursor, limit)
+    return catalog_cache.get_or_set(
+        _page_cache_name(exercise_type, limit),
+        lambda: _load_exercise_page(search, exercise_type, cursor, limit),
+    )
+
+
+async def alist_exercises(search: str, exercise_type: str, cursor: str | None, limit: int) -> Page[ExerciseSchema]:
+    if search or cursor or (exercise_type and exercise_type not in await aget_exercise_types()):
+        return await _aload_exercise_page(search, exercise_type, cursor, limit)
+    return await catalog_cache.aget_or_set(
+        _page_cache_name(exercise_type, limit),
+        lambda: _aload_exercise_page(search, exercise_type, cursor, limit),
+    )
+
+
+def get_exercise_types() -> list[str]:
+    return catalog_cache.get_or_set(
+        "types",
+        lambda: list(Exercise.objects.order_by("type").values_list("type", flat=True).distinct()),
+    )
+
+
+async def aget_exercise_types() -> list[str]:
+    async def load() -> list[str]:
+        return [t async for t in Exercise.objects.order_by("type").values_list("type", flat=True).distinct()]
+
+    return await catalog_cache.aget_or_set("types", load)
+
+
+def get_exercise_catalog() -> list[ExerciseSchema]:
+    return catalog_cache.get_or_set(
+        "all",
+        lambda: validate_rows(ExerciseSchema, Exercise.objects.order_by("name").values(*EXERCISE_FIELDS)),
+    )
+
+
+def _page_cache_name(exercise_type: str, limit: int) -> str:
+    params = hashlib.sha1(f"{exercise_type}\0{limit}".encode("utf-8")).hexdigest()
+    return f"page:{params}"
+
+
+def _page_args(search: str, exercise_type: str, cursor: str | None, limit: int) -> tuple:
+    qs = Exercise.objects.all()
+    if exercise_type:
+        qs = qs.filter(type=exercise_type)
+    if search:
+        return search_exercises(qs, search).values(*EXERCISE_FIELDS, RANK_FIELD), (RANK_FIELD, "id"), cursor, limit, True
+    return qs.values(*EXERCISE_FIELDS), ("name", "id"), cursor, limit, False
+
+
+def _load_exercise_page(search: str, exercise_type: str, cursor: str | None, limit: int) -> Page[ExerciseSchema]:
+    try:
+        page = keyset_paginate(*_page_args(search, exercise_type, cursor, limit))
+    except InvalidCursorError:
+        raise ServiceError("Invalid page cursor.", code=400)
+    return Page(items=validate_rows(ExerciseSchema, page.items), next_cursor=page.next_cursor)
+
+
+async def _aload_exercise_page(search: str, exercise_type: str, cursor: str | None, limit: int) -> Page[ExerciseSchema]:
+    try:
+        page = await akeyset_paginate(*_page_args(search, exercise_type, cursor, limit))
+    except InvalidCursorError:
+        raise ServiceError("Invalid page cursor.", code=400)
+    return Page(items=validate_rows(ExerciseSchema, page.items), next_cursor=page.next_cursor)
+
+
+def _check_required_fields(payload: dict) -> None:
     missing_fields = []
     if "name" not in payload:
         missing_fields.append("name")
@@ -22,11 +119,34 @@ def create_exercise(payload: dict) -> ExerciseSchema:
     if missing_fields:
         raise ServiceError(f"Missing required fields: {', '.join(missing_fields)}", code=400)
 
+
+def _apply_payload(exercise: Exercise, payload: dict) -> None:
+    exercise.name = payload.get("name", exercise.name)
+    exercise.type = payload.get("type", exercise.type)
+    exercise.description = payload.get("description", exercise.description)
+
+
+def create_exercise(payload: dict) -> ExerciseSchema:
+    _check_required_fields(payload)
+
     exercise = Exercise.objects.create(
         name=payload["name"],
         type=payload["type"],
         description=payload.get("description", ""),
     )
+    catalog_cache.invalidate()
+    return ExerciseSchema.model_validate(exercise)
+
+
+async def acreate_exercise(payload: dict) -> ExerciseSchema:
+    _check_required_fields(payload)
+
+    exercise = await Exercise.objects.acreate(
+        name=payload["name"],
+        type=payload["type"],
+        description=payload.get("description", ""),
+    )
+    await catalog_cache.abump()
     return ExerciseSchema.model_validate(exercise)
 
 
@@ -37,25 +157,43 @@ def update_exercise(exercise_id: int, payload: dict, full: bool = False) -> Exer
         raise ServiceError(f"Exercise with id {exercise_id} not found", code=404)
 
     if full:
-        missing_fields = []
-        if "name" not in payload:
-            missing_fields.append("name")
-        if "type" not in payload:
-            missing_fields.append("type")
+        _check_required_fields(payload)
 
-        if missing_fields:
-            raise ServiceError(f"Missing required fields: {', '.join(missing_fields)}", code=400)
-
-    exercise.name = payload.get("name", exercise.name)
-    exercise.type = payload.get("type", exercise.type)
-    exercise.description = payload.get("description", exercise.description)
+    _apply_payload(exercise, payload)
     exercise.save()
+    catalog_cache.invalidate()
     return ExerciseSchema.model_validate(exercise)
 
 
-def delete_exercise(exercise_id: int) -> None:
+async def aupdate_exercise(exercise_id: int, payload: dict, full: bool = False) -> ExerciseSchema:
     try:
-        exercise = Exercise.objects.get(id=exercise_id)
+        exercise = await Exercise.objects.aget(id=exercise_id)
     except Exercise.DoesNotExist:
         raise ServiceError(f"Exercise with id {exercise_id} not found", code=404)
-    exercise.delete()
+
+    if full:
+        _check_required_fields(payload)
+
+    _apply_payload(exercise, payload)
+    await exercise.asave()
+    await catalog_cache.abump()
+    return ExerciseSchema.model_validate(exercise)
+
+
+def delete_exercise(exercise_id: int) -> None:
+    with transaction.atomic():
+        try:
+            exercise = Exercise.objects.get(id=exercise_id)
+        except Exercise.DoesNotExist:
+            raise ServiceError(f"Exercise with id {exercise_id} not found", code=404)
+
+        # Deleting the exercise cascades to its exercise sets, so the plans using it need new totals.
+        plan_ids = lock_plans(ExerciseSet.objects.filter(exercise_id=exercise_id).values_list("workout_plan_id", flat=True))
+        exercise.delete()
+        refresh_plan_totals(plan_ids)
+    catalog_cache.invalidate()
+
+
+async def adelete_exercise(exercise_id: int) -> None:
+    # Plan totals are refreshed in the same transaction, which the async ORM cannot open.
+    await sync_to_async(delete_exercise)(exercise_id)
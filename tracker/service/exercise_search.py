@@ -0,0 +1,31 @@
+from django.contrib.postgres.search import SearchQuery
+from django.contrib.postgres.search import SearchRank
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db.models import F
+from django.db.models import FloatField
+from django.db.models import Q
+from django.db.models import QuerySet
+from django.db.models.functions import Cast
+
+from ..models import Exercise
+
+SEARCH_CONFIG = "english"
+RANK_FIELD = "rank"
+
+
+def search_exercises(queryset: QuerySet[Exercise], term: str) -> QuerySet[Exercise]:
+    """Filter ``queryset`` to exercises matching ``term`` and annotate them with a relevance ``rank``.
+
+    A row matches when the weighted ``search_vector`` (name > type > description) satisfies the
+    websearch query, or when the name is trigram-similar to the term, which keeps partial words
+    and typos ("sqaut") matching. Both predicates are served by the GIN indexes on ``Exercise``;
+    the trigram cut-off is ``pg_trgm.word_similarity_threshold`` (see ``DATABASES`` options).
+
+    The rank is cast to double precision so the value handed out in a page cursor compares
+    exactly against the recomputed rank on the next request.
+    """
+    query = SearchQuery(term, search_type="websearch", config=SEARCH_CONFIG)
+    rank = SearchRank(F("search_vector"), query) + TrigramWordSimilarity(term, "name")
+    return queryset.annotate(**{RANK_FIELD: Cast(rank, FloatField())}).filter(
+        Q(search_vector=query) | Q(name__trigram_word_similar=term)
+    )
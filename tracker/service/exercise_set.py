@@ -1,4 +1,19 @@
+from typing import Iterable
+
+from django.db import connection
+from django.db import transaction
+from django.db.models import Count
+from django.db.models import F
+from django.db.models import FloatField
+from django.db.models import OuterRef
+from django.db.models import Subquery
+from django.db.models import Sum
+from django.db.models.functions import Coalesce
+from django.db.models.functions import Now
+
+from tracker.schemas.exercise_set_schema import ExerciseSetInputSchema
 from tracker.schemas.exercise_set_schema import ExerciseSetSchema
+from tracker.serialization import validate_rows
 
 from .exceptions import ServiceError
 from ..models import Exercise
@@ -7,52 +22,168 @@ from ..models import WorkoutPlan
 
 
 def list_exercise_sets(plan_id: int) -> list[ExerciseSetSchema]:
-    sets = ExerciseSet.objects.filter(workout_plan_id=plan_id).select_related("exercise")
-    return [ExerciseSetSchema.model_validate(es) for es in sets]
+    sets = (
+        ExerciseSet.objects.filter(workout_plan_id=plan_id)
+        .annotate(exercise_name=F("exercise__name"))
+        .order_by("id")
+        .values(*ExerciseSetSchema.model_fields)
+    )
+    return validate_rows(ExerciseSetSchema, sets)
+
+
+EXERCISE_SET_FIELDS = ("sets", "reps", "weight")
+EXERCISE_SET_DEFAULTS = {"sets": 3, "reps": 10, "weight": 0}
 
 
 def add_exercise_set(plan_id: int, payload: dict) -> ExerciseSetSchema:
+    """Add an exercise to a plan, or update the fields given in ``payload`` if the plan already has it.
+
+    The existence checks, the upsert, the plan counters and the exercise name all come from one statement:
+    the new row is selected from the (locked) plan joined with the exercise, so a missing parent yields no
+    row instead of an error. Django creates foreign keys ``DEFERRABLE INITIALLY DEFERRED``, so relying on
+    the FK violation would only surface it at commit.
+
+    The counters move by the difference between the upserted row and the one it replaced. ``previous``
+    re-reads that row with ``FOR UPDATE`` after the plan lock is taken, which returns its latest version
+    even if a writer we waited for changed it. A row inserted by such a writer is invisible to the
+    statement's snapshot, though; then the delta is unknown and the totals are recomputed under the lock.
+    """
     if "exercise_id" not in payload:
         raise ServiceError("Missing required field: exercise_id", code=400)
 
-    if not Exercise.objects.filter(id=payload["exercise_id"]).exists():
+    qn = connection.ops.quote_name
+    es_table, plan_table = qn(ExerciseSet._meta.db_table), qn(WorkoutPlan._meta.db_table)
+    # Only the fields present in the payload overwrite an existing row; "sets = sets" keeps RETURNING working.
+    updates = [f"{field} = EXCLUDED.{field}" for field in EXERCISE_SET_FIELDS if field in payload] or ["sets = es.sets"]
+    params = {"plan_id": plan_id, "exercise_id": payload["exercise_id"]}
+    params.update({field: payload.get(field, default) for field, default in EXERCISE_SET_DEFAULTS.items()})
+
+    # Joining ``previous`` into the insert's source makes it lock and read the old row before the upsert replaces it.
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            WITH plan AS (
+                SELECT id FROM {plan_table} WHERE id = %(plan_id)s FOR UPDATE
+            ), exercise AS (
+                SELECT id, name FROM {qn(Exercise._meta.db_table)} WHERE id = %(exercise_id)s
+            ), previous AS (
+                SELECT old.volume FROM plan CROSS JOIN LATERAL (
+                    SELECT sets * reps * weight AS volume FROM {es_table}
+                    WHERE workout_plan_id = plan.id AND exercise_id = %(exercise_id)s FOR UPDATE
+                ) old
+            ), upserted AS (
+                INSERT INTO {es_table} AS es (exercise_id, workout_plan_id, sets, reps, weight)
+                SELECT exercise.id, plan.id, %(sets)s, %(reps)s, %(weight)s
+                FROM plan CROSS JOIN exercise LEFT JOIN previous ON TRUE
+                ON CONFLICT (exercise_id, workout_plan_id) DO UPDATE SET {", ".join(updates)}
+                RETURNING id, exercise_id, sets, reps, weight, xmax = 0 AS inserted
+            ), counted AS (
+                UPDATE {plan_table} AS wp
+                SET exercise_count = wp.exercise_count + upserted.inserted::int,
+                    total_volume = wp.total_volume - COALESCE(previous.volume, 0)
+                        + upserted.sets * upserted.reps * upserted.weight,
+                    updated_at = NOW()
+                FROM upserted LEFT JOIN previous ON TRUE
+                WHERE wp.id = %(plan_id)s AND upserted.inserted = (previous.volume IS NULL)
+                RETURNING wp.id
+            )
+            SELECT upserted.id, upserted.exercise_id, exercise.name, upserted.sets, upserted.reps, upserted.weight,
+                   EXISTS (SELECT 1 FROM counted)
+            FROM upserted, exercise
+            """,
+            params,
+        )
+        row = cursor.fetchone()
+
+    if row is None:
+        if not WorkoutPlan.objects.filter(id=plan_id).exists():
+            raise ServiceError(f"Workout plan with id {plan_id} not found", code=404)
         raise ServiceError(f"Exercise with id {payload['exercise_id']} not found", code=404)
 
-    if not WorkoutPlan.objects.filter(id=plan_id).exists():
-        raise ServiceError(f"Workout plan with id {plan_id} not found", code=404)
-
-    es, created = ExerciseSet.objects.get_or_create(
-        workout_plan_id=plan_id,
-        exercise_id=payload["exercise_id"],
-        defaults={
-            "sets": payload.get("sets", 3),
-            "reps": payload.get("reps", 10),
-            "weight": payload.get("weight", 0),
-        },
-    )
+    es_id, exercise_id, exercise_name, sets, reps, weight, counted = row
+    if not counted:
+        with transaction.atomic():
+            refresh_plan_totals(lock_plans([plan_id]))
+    return ExerciseSetSchema(id=es_id, exercise_id=exercise_id, exercise_name=exercise_name, sets=sets, reps=reps, weight=weight)
 
-    if not created:
-        update_fields(es, payload, ("sets", "reps", "weight"))
 
-    return ExerciseSetSchema.model_validate(es)
+def save_exercise_sets(plan_id: int, items: list[ExerciseSetInputSchema], replace: bool = False) -> list[ExerciseSetSchema]:
+    """Insert or update all of a plan's exercise sets in one transaction.
 
+    Every item is written with a single ``INSERT ... ON CONFLICT DO UPDATE``; with ``replace`` the
+    plan's sets missing from ``items`` are deleted too, so the list becomes the plan's full content.
+    """
+    exercise_ids = [item.exercise_id for item in items]
+    if len(set(exercise_ids)) != len(exercise_ids):
+        raise ServiceError("Each exercise may appear only once per plan.", code=400)
 
-def update_exercise_set(es_id: int, payload: dict) -> ExerciseSetSchema:
-    try:
-        es = ExerciseSet.objects.get(id=es_id)
-    except ExerciseSet.DoesNotExist:
-        raise ServiceError(f"ExerciseSet with id {es_id} not found", code=404)
+    with transaction.atomic():
+        if not lock_plans([plan_id]):
+            raise ServiceError(f"Workout plan with id {plan_id} not found", code=404)
+
+        unknown = set(exercise_ids) - set(Exercise.objects.filter(id__in=exercise_ids).values_list("id", flat=True))
+        if unknown:
+            raise ServiceError(f"Exercises not found: {', '.join(map(str, sorted(unknown)))}", code=400)
+
+        ExerciseSet.objects.bulk_create(
+            [ExerciseSet(workout_plan_id=plan_id, **item.model_dump()) for item in items],
+            update_conflicts=True,
+            unique_fields=["exercise", "workout_plan"],
+            update_fields=["sets", "reps", "weight"],
+        )
+        if replace:
+            ExerciseSet.objects.filter(workout_plan_id=plan_id).exclude(exercise_id__in=exercise_ids).delete()
+        refresh_plan_totals([plan_id])
+
+    return list_exercise_sets(plan_id)
 
-    update_fields(es, payload, ("sets", "reps", "weight"))
+
+def update_exercise_set(es_id: int, payload: dict) -> ExerciseSetSchema:
+    with transaction.atomic():
+        es = _get_locked_exercise_set(es_id)
+        update_fields(es, payload, EXERCISE_SET_FIELDS)
+        refresh_plan_totals([es.workout_plan_id])
     return ExerciseSetSchema.model_validate(es)
 
 
 def delete_exercise_set(es_id: int):
+    with transaction.atomic():
+        es = _get_locked_exercise_set(es_id)
+        es.delete()
+        refresh_plan_totals([es.workout_plan_id])
+
+
+def _get_locked_exercise_set(es_id: int) -> ExerciseSet:
+    plan_id = ExerciseSet.objects.filter(id=es_id).values_list("workout_plan_id", flat=True).first()
+    if plan_id is None or not lock_plans([plan_id]):
+        raise ServiceError(f"ExerciseSet with id {es_id} not found", code=404)
     try:
-        es = ExerciseSet.objects.get(id=es_id)
+        return ExerciseSet.objects.get(id=es_id)
     except ExerciseSet.DoesNotExist:
         raise ServiceError(f"ExerciseSet with id {es_id} not found", code=404)
-    es.delete()
+
+
+def lock_plans(plan_ids: Iterable[int]) -> list[int]:
+    """Lock the plans' rows until the transaction ends, serializing writers of their exercise sets.
+
+    Returns the ids that exist. Rows are locked in id order so concurrent multi-plan writers cannot deadlock.
+    """
+    return list(WorkoutPlan.objects.select_for_update().filter(id__in=plan_ids).order_by("id").values_list("id", flat=True))
+
+
+def plan_totals() -> dict:
+    """Subquery expressions computing a plan's exercise count and volume (sets x reps x weight) from ExerciseSet."""
+    sets = ExerciseSet.objects.filter(workout_plan_id=OuterRef("pk")).order_by().values("workout_plan_id")
+    volume = Sum(F("sets") * F("reps") * F("weight"), output_field=FloatField())
+    return {
+        "exercise_count": Coalesce(Subquery(sets.annotate(count=Count("id")).values("count")), 0),
+        "total_volume": Coalesce(Subquery(sets.annotate(volume=volume).values("volume")), 0.0),
+    }
+
+
+def refresh_plan_totals(plan_ids: Iterable[int]) -> None:
+    """Recompute the denormalized counters of the given plans; callers hold the plans' locks."""
+    WorkoutPlan.objects.filter(id__in=plan_ids).update(**plan_totals(), updated_at=Now())
 
 
 def update_fields(instance, data: dict, fields: tuple[str, ...]):
@@ -0,0 +1,90 @@
+import csv
+import json
+from typing import Iterator
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .exceptions import ServiceError
+from ..repository.session import get_session_repository
+from ..repository.weight_tracker import get_weight_tracker_repository
+
+EXPORT_FORMATS = ("csv", "ndjson")
+EXPORT_CHUNK_SIZE = 500
+
+CSV_COLUMNS = [
+    "record",
+    "date",
+    "session_id",
+    "plan",
+    "status",
+    "duration_minutes",
+    "exercise",
+    "sets",
+    "reps",
+    "set_weight",
+    "body_weight",
+]
+
+
+class _Echo:
+    """File-like object whose ``write`` hands the value back, so ``csv.writer`` yields rows instead of buffering."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def iter_history(user_id: int) -> Iterator[dict]:
+    """Yield the user's workout sessions (with plan and exercise sets) followed by their weight history.
+
+    Rows are read through server-side cursors ``EXPORT_CHUNK_SIZE`` at a time and exercise sets are
+    prefetched per chunk, so memory stays flat however long the history is.
+    """
+    for session in get_session_repository().iter_history_by_user(user_id, EXPORT_CHUNK_SIZE):
+        yield {
+            "record": "session",
+            "id": session.id,
+            "start_time": session.start_time,
+            "status": session.status,
+            "duration_minutes": session.duration_minutes,
+            "plan": {"id": session.plan_id, "name": session.plan.name},
+            "exercise_sets": [
+                {"exercise": es.exercise.name, "sets": es.sets, "reps": es.reps, "weight": es.weight}
+                for es in session.plan.exerciseset_set.all()
+            ],
+        }
+
+    for entry in get_weight_tracker_repository().iter_history_by_user(user_id, EXPORT_CHUNK_SIZE):
+        yield {"record": "weight", "id": entry.id, "date": entry.date, "weight": entry.weight}
+
+
+def stream_ndjson(user_id: int) -> Iterator[str]:
+    for record in iter_history(user_id):
+        yield json.dumps(record, cls=DjangoJSONEncoder) + "\n"
+
+
+def stream_csv(user_id: int) -> Iterator[str]:
+    """One row per exercise set of every session (a bare row for a plan without sets), then one per weight."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CSV_COLUMNS)
+    for record in iter_history(user_id):
+        if record["record"] == "weight":
+            yield writer.writerow(["weight", record["date"].isoformat(), "", "", "", "", "", "", "", "", record["weight"]])
+            continue
+
+        session_columns = [
+            "session",
+            record["start_time"].isoformat(),
+            record["id"],
+            record["plan"]["name"],
+            record["status"],
+            record["duration_minutes"],
+        ]
+        for es in record["exercise_sets"] or [None]:
+            set_columns = [es["exercise"], es["sets"], es["reps"], es["weight"]] if es else ["", "", "", ""]
+            yield writer.writerow(session_columns + set_columns + [""])
+
+
+def stream_history(user_id: int, fmt: str) -> Iterator[str]:
+    if fmt not in EXPORT_FORMATS:
+        raise ServiceError(f"Unsupported export format, expected one of: {', '.join(EXPORT_FORMATS)}", code=400)
+    return stream_csv(user_id) if fmt == "csv" else stream_ndjson(user_id)
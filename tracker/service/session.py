@@ -1,12 +1,23 @@
 from abc import ABC
 from abc import abstractmethod
+from datetime import date
+from datetime import datetime
+from typing import Sequence
 
+from asgiref.sync import sync_to_async
+from django.db import transaction
 from django.utils import timezone
 
+from tracker.models import TrainingAggregate
 from tracker.models import WorkoutPlan
 from tracker.models import WorkoutSession
+from tracker.repository.pagination import InvalidCursorError
+from tracker.repository.pagination import Page
 from tracker.repository.session import WorkoutSessionRepository
 from tracker.repository.session import get_session_repository
+from tracker.repository.training_aggregate import TrainingAggregateRepository
+from tracker.repository.training_aggregate import get_training_aggregate_repository
+from tracker.service.data_version import bump_data_version
 from tracker.service.exceptions import ServiceError
 
 
@@ -23,6 +34,14 @@ class WorkoutSessionService(ABC):
     def delete_session(self, session_id: int, user_id: int) -> None:
         raise NotImplementedError()
 
+    @abstractmethod
+    async def afinish_session(self, session_id: int, user_id: int) -> WorkoutSession:
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def adelete_session(self, session_id: int, user_id: int) -> None:
+        raise NotImplementedError()
+
     @abstractmethod
     def get_by_id(self, session_id: int, user_id: int) -> WorkoutSession:
         raise NotImplementedError()
@@ -31,14 +50,26 @@ class WorkoutSessionService(ABC):
     def get_all_by_user(self, user_id: int) -> list[WorkoutSession]:
         raise NotImplementedError()
 
+    @abstractmethod
+    def get_page_by_user(self, user_id: int, cursor: str | None, limit: int) -> Page[WorkoutSession]:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def get_training_summary(self, user_id: int, period: str, limit: int) -> Sequence[TrainingAggregate]:
+        raise NotImplementedError()
+
+
+def training_day(start_time: datetime) -> date:
+    return timezone.localdate(start_time, timezone.get_default_timezone())
+
 
 class WorkoutSessionServiceImpl(WorkoutSessionService):
-    def __init__(self, repo: WorkoutSessionRepository):
+    def __init__(self, repo: WorkoutSessionRepository, aggregates: TrainingAggregateRepository):
         self.repo = repo
+        self.aggregates = aggregates
 
     def start_session(self, user_id: int, plan_id: int) -> WorkoutSession:
-        active_session = self.repo.get_active_by_user(user_id)
-        if active_session:
+        if self.repo.exists(user_id=user_id, status=WorkoutSession.Status.ACTIVE):
             raise ServiceError("You already have an active session.", code=400)
 
         try:
@@ -46,37 +77,64 @@ class WorkoutSessionServiceImpl(WorkoutSessionService):
         except WorkoutPlan.DoesNotExist:
             raise ServiceError(f"Workout plan {plan_id} not found.", code=404)
 
-        return self.repo.create(
-            user_id=user_id,
-            plan=plan,
-            start_time=timezone.now(),
-            status=WorkoutSession.Status.ACTIVE,
-            duration_minutes=0,
-        )
+        with transaction.atomic():
+            session = self.repo.create(
+                user_id=user_id,
+                plan=plan,
+                start_time=timezone.now(),
+                status=WorkoutSession.Status.ACTIVE,
+                duration_minutes=0,
+            )
+            self.aggregates.apply_delta(user_id, training_day(session.start_time), sessions=1, active=1)
+            bump_data_version(user_id)
+        return session
 
     def finish_session(self, session_id: int, user_id: int) -> WorkoutSession:
-        session = self.repo.get_by_id_and_user(session_id, user_id)
-        if not session:
-            raise ServiceError("Session not found.", code=404)
+        with transaction.atomic():
+            session = self.repo.get_by_id_and_user(session_id, user_id, lock=True)
+            if not session:
+                raise ServiceError("Session not found.", code=404)
+
+            session = self.repo.update(session, **self._completion_fields(session))
+            self.aggregates.apply_delta(
+                user_id, training_day(session.start_time), completed=1, active=-1, minutes=session.duration_minutes
+            )
+            bump_data_version(user_id)
+        return session
 
+    def delete_session(self, session_id: int, user_id: int) -> None:
+        with transaction.atomic():
+            session = self.repo.get_by_id_and_user(session_id, user_id, lock=True)
+            if not session:
+                raise ServiceError("Session not found.", code=404)
+
+            completed = session.status == WorkoutSession.Status.COMPLETED
+            self.repo.delete(session)
+            self.aggregates.apply_delta(
+                user_id,
+                training_day(session.start_time),
+                sessions=-1,
+                completed=-1 if completed else 0,
+                active=0 if completed else -1,
+                minutes=-session.duration_minutes,
+            )
+            bump_data_version(user_id)
+
+    # The async ORM has no transactions, so the async entry points run the transactional path in a thread.
+    async def afinish_session(self, session_id: int, user_id: int) -> WorkoutSession:
+        return await sync_to_async(self.finish_session)(session_id, user_id)
+
+    async def adelete_session(self, session_id: int, user_id: int) -> None:
+        return await sync_to_async(self.delete_session)(session_id, user_id)
+
+    @staticmethod
+    def _completion_fields(session: WorkoutSession) -> dict:
         if session.status != WorkoutSession.Status.ACTIVE:
             raise ServiceError("Only active sessions can be completed.", code=400)
 
         end_time = timezone.now()
         duration = int((end_time - session.start_time).total_seconds() // 60)
-
-        return self.repo.update(
-            session,
-            status=WorkoutSession.Status.COMPLETED,
-            duration_minutes=duration,
-        )
-
-    def delete_session(self, session_id: int, user_id: int) -> None:
-        session = self.repo.get_by_id_and_user(session_id, user_id)
-        if not session:
-            raise ServiceError("Session not found.", code=404)
-
-        return self.repo.delete(session)
+        return {"status": WorkoutSession.Status.COMPLETED, "duration_minutes": duration}
 
     def get_by_id(self, session_id: int, user_id: int) -> WorkoutSession:
         session = self.repo.get_by_id_and_user(session_id, user_id)
@@ -87,7 +145,18 @@ class WorkoutSessionServiceImpl(WorkoutSessionService):
     def get_all_by_user(self, user_id: int) -> list[WorkoutSession]:
         return self.repo.get_all_by_user(user_id)
 
+    def get_page_by_user(self, user_id: int, cursor: str | None, limit: int) -> Page[WorkoutSession]:
+        try:
+            return self.repo.get_page_by_user(user_id, cursor, limit)
+        except InvalidCursorError:
+            raise ServiceError("Invalid page cursor.", code=400)
+
+    def get_training_summary(self, user_id: int, period: str, limit: int) -> Sequence[TrainingAggregate]:
+        if period not in TrainingAggregate.Period.values:
+            raise ServiceError(f"Unknown summary period '{period}'.", code=400)
+        return self.aggregates.get_recent(user_id, period, limit)
+
 
 def get_session_service() -> WorkoutSessionService:
     repo = get_session_repository()
-    return WorkoutSessionServiceImpl(repo)
+    return WorkoutSessionServiceImpl(repo, get_training_aggregate_repository())
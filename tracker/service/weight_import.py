@@ -0,0 +1,93 @@
+import codecs
+import csv
+import json
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Iterable
+from typing import Iterator
+
+from pydantic import ValidationError
+
+from tracker.schemas.weight_tracker import WeightEntryImportSchema
+
+from .exceptions import ServiceError
+
+IMPORT_FORMATS = ("csv", "jsonl")
+MAX_REPORTED_ERRORS = 100
+
+_FORMAT_ALIASES = {
+    "csv": "csv",
+    "text/csv": "csv",
+    "jsonl": "jsonl",
+    "ndjson": "jsonl",
+    "application/jsonl": "jsonl",
+    "application/x-ndjson": "jsonl",
+}
+
+
+@dataclass
+class RowError:
+    line: int
+    error: str
+
+
+@dataclass
+class WeightImportResult:
+    created: int = 0
+    error_count: int = 0
+    errors: list[RowError] = field(default_factory=list)
+
+    def add_error(self, line: int, error: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(RowError(line, error))
+
+
+def detect_format(hint: str | None) -> str:
+    """Map an explicit format, a file name or a content type onto one of ``IMPORT_FORMATS``."""
+    hint = (hint or "").split(";")[0].strip().lower()
+    fmt = _FORMAT_ALIASES.get(hint) or _FORMAT_ALIASES.get(hint.rsplit(".", 1)[-1])
+    if fmt is None:
+        raise ServiceError(f"Unsupported import format, expected one of: {', '.join(IMPORT_FORMATS)}", code=400)
+    return fmt
+
+
+def iter_weight_rows(
+    lines: Iterable[bytes], fmt: str, result: WeightImportResult
+) -> Iterator[tuple[int, WeightEntryImportSchema]]:
+    """Yield ``(line, entry)`` for every valid row of an upload, recording the invalid ones on ``result``.
+
+    ``lines`` is consumed lazily (an ``UploadedFile``, an ``HttpRequest`` or an open file all iterate
+    over their lines), so memory use does not grow with the size of the upload.
+    """
+    text = codecs.iterdecode(lines, "utf-8-sig", errors="replace")
+    rows = _iter_csv(text) if fmt == "csv" else _iter_jsonl(text)
+    for line, row in rows:
+        if isinstance(row, str):
+            result.add_error(line, row)
+            continue
+        try:
+            yield line, WeightEntryImportSchema.model_validate(row)
+        except ValidationError as e:
+            result.add_error(line, "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()))
+
+
+def _iter_csv(text: Iterator[str]) -> Iterator[tuple[int, dict | str]]:
+    reader = csv.DictReader(text)
+    if reader.fieldnames is None or not {"date", "weight"} <= {name.strip().lower() for name in reader.fieldnames}:
+        raise ServiceError("CSV header must contain 'date' and 'weight' columns.", code=400)
+    reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+    for row in reader:
+        yield reader.line_num, row
+
+
+def _iter_jsonl(text: Iterator[str]) -> Iterator[tuple[int, dict | str]]:
+    for line, raw in enumerate(text, start=1):
+        if not raw.strip():
+            continue
+        try:
+            row = json.loads(raw)
+        except json.JSONDecodeError as e:
+            yield line, f"Invalid JSON: {e.msg}"
+            continue
+        yield line, row if isinstance(row, dict) else "Expected a JSON object."
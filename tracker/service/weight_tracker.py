@@ -1,12 +1,25 @@
 from abc import ABC
 from abc import abstractmethod
 from datetime import date
+from typing import Iterable
 from typing import Sequence
 
+from django.db import transaction
+
 from tracker.models import WeightTracker
+from tracker.repository.pagination import InvalidCursorError
+from tracker.repository.pagination import Page
 from tracker.repository.weight_tracker import WeightTrackerRepository
 from tracker.repository.weight_tracker import get_weight_tracker_repository
+from tracker.schemas.weight_tracker import WeightTrendPointSchema
+from tracker.schemas.weight_tracker import WeightTrendSchema
+from tracker.service import weight_trends
+from tracker.service.data_version import bump_data_version
 from tracker.service.exceptions import ServiceError
+from tracker.service.weight_import import WeightImportResult
+from tracker.service.weight_import import iter_weight_rows
+
+IMPORT_BATCH_SIZE = 1000
 
 
 class WeightTrackerService(ABC):
@@ -14,6 +27,10 @@ class WeightTrackerService(ABC):
     def create_weight_tracker(self, user_id: int, weight: float, entry_date: date | None) -> WeightTracker:
         raise NotImplementedError()
 
+    @abstractmethod
+    def import_weight_trackers(self, user_id: int, lines: Iterable[bytes], fmt: str) -> WeightImportResult:
+        raise NotImplementedError()
+
     @abstractmethod
     def delete_weight_tracker(self, weight_tracker_id: int, user_id: int) -> None:
         raise NotImplementedError()
@@ -22,10 +39,22 @@ class WeightTrackerService(ABC):
     def get_all_by_user(self, user_id: int) -> Sequence[WeightTracker]:
         raise NotImplementedError()
 
+    @abstractmethod
+    def get_page_by_user(self, user_id: int, cursor: str | None, limit: int) -> Page[WeightTracker]:
+        raise NotImplementedError()
+
     @abstractmethod
     def get_by_id(self, weight_tracker_id: int, user_id: int) -> WeightTracker:
         raise NotImplementedError()
 
+    @abstractmethod
+    def get_trend(self, user_id: int) -> WeightTrendSchema:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def get_trend_series(self, user_id: int) -> list[WeightTrendPointSchema]:
+        raise NotImplementedError()
+
 
 class WeightTrackerServiceImpl(WeightTrackerService):
     def __init__(self, repo: WeightTrackerRepository):
@@ -38,11 +67,29 @@ class WeightTrackerServiceImpl(WeightTrackerService):
         if entry_date is None:
             entry_date = date.today()
 
-        return self.repo.create(
+        weight_tracker = self.repo.create(
             user_id=user_id,
             weight=weight,
             date=entry_date,
         )
+        weight_trends.record_entry(user_id, entry_date, weight)
+        bump_data_version(user_id)
+        return weight_tracker
+
+    def import_weight_trackers(self, user_id: int, lines: Iterable[bytes], fmt: str) -> WeightImportResult:
+        """Stream-parse an upload and insert its valid rows in batches inside one transaction.
+
+        Invalid rows are skipped and reported on the result; the valid ones are written all or nothing.
+        """
+        result = WeightImportResult()
+        rows = (
+            {"user_id": user_id, "date": entry.date, "weight": entry.weight} for _, entry in iter_weight_rows(lines, fmt, result)
+        )
+        with transaction.atomic():
+            result.created = self.repo.create_many(rows, batch_size=IMPORT_BATCH_SIZE)
+            weight_trends.invalidate_trend(user_id)
+            bump_data_version(user_id)
+        return result
 
     def delete_weight_tracker(self, weight_tracker_id: int, user_id: int) -> None:
         weight_tracker = self.repo.get_by_id_and_user(weight_tracker_id, user_id)
@@ -50,16 +97,34 @@ class WeightTrackerServiceImpl(WeightTrackerService):
             raise ServiceError("Weight entry not found.", code=404)
 
         self.repo.delete(weight_tracker)
+        weight_trends.invalidate_trend(user_id)
+        bump_data_version(user_id)
 
     def get_all_by_user(self, user_id: int) -> list[WeightTracker]:
         return self.repo.get_all_by_user(user_id)
 
+    def get_page_by_user(self, user_id: int, cursor: str | None, limit: int) -> Page[WeightTracker]:
+        try:
+            return self.repo.get_page_by_user(user_id, cursor, limit)
+        except InvalidCursorError:
+            raise ServiceError("Invalid page cursor.", code=400)
+
     def get_by_id(self, weight_tracker_id: int, user_id: int) -> WeightTracker:
         weight_tracker = self.repo.get_by_id_and_user(weight_tracker_id, user_id)
         if not weight_tracker:
             raise ServiceError("Weight entry not found.", code=404)
         return weight_tracker
 
+    def get_trend(self, user_id: int) -> WeightTrendSchema:
+        state = weight_trends.get_cached_state(user_id)
+        if state is None:
+            state = weight_trends.build_state(self.repo.get_series_by_user(user_id))
+            weight_trends.store_state(user_id, state)
+        return weight_trends.to_schema(state)
+
+    def get_trend_series(self, user_id: int) -> list[WeightTrendPointSchema]:
+        return weight_trends.build_series(self.repo.get_series_by_user(user_id))
+
 
 def get_weight_tracker_service() -> WeightTrackerService:
     repo = get_weight_tracker_repository()
@@ -0,0 +1,201 @@
+import math
+from datetime import date
+from datetime import timedelta
+from typing import Sequence
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from pydantic import BaseModel
+from pydantic import ValidationError
+
+from tracker.schemas.weight_tracker import WeekTrendSchema
+from tracker.schemas.weight_tracker import WeightEntryImportSchema
+from tracker.schemas.weight_tracker import WeightTrendPointSchema
+from tracker.schemas.weight_tracker import WeightTrendSchema
+
+ROLLING_WINDOW_DAYS = 7
+EMA_SPAN = 10
+EMA_ALPHA = 2 / (EMA_SPAN + 1)
+WEEKS_KEPT = 12
+
+
+class WeekTotal(BaseModel):
+    week_start: date
+    total: float
+    count: int
+
+
+class WeightTrendState(BaseModel):
+    """Running aggregates of a user's weight series, enough to fold in a newer entry without the history."""
+
+    count: int = 0
+    last_date: date | None = None
+    latest: float | None = None
+    ema: float | None = None
+    window: list[tuple[date, float]] = []
+    weeks: list[WeekTotal] = []
+
+
+def _state_key(user_id: int) -> str:
+    return f"weight:trend:{user_id}"
+
+
+def week_start(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+def rolling_mean(days: np.ndarray, weights: np.ndarray, window_days: int = ROLLING_WINDOW_DAYS) -> np.ndarray:
+    """Mean of every entry within the trailing ``window_days`` calendar days of each entry (``days`` sorted)."""
+    starts = np.searchsorted(days, days - np.timedelta64(window_days - 1, "D"), side="left")
+    sums = np.concatenate(([0.0], np.cumsum(weights)))
+    ends = np.arange(1, len(weights) + 1)
+    return (sums[ends] - sums[starts]) / (ends - starts)
+
+
+def ema(weights: np.ndarray, alpha: float = EMA_ALPHA) -> np.ndarray:
+    """Exponential moving average seeded with the first value, ``e[i] = a * w[i] + (1 - a) * e[i - 1]``.
+
+    Each block uses the closed form ``e[j] = d**(j+1) * (prev + a * sum(w[k] / d**(k+1)))`` with ``d = 1 - a``
+    and ``prev`` the value before the block; blocks are short enough that ``d**-k`` stays inside float64 range.
+    """
+    result = np.empty_like(weights, dtype=np.float64)
+    if not len(weights):
+        return result
+    decay = 1 - alpha
+    block = max(1, int(500 / -math.log(decay)))
+    previous = weights[0]
+    for start in range(0, len(weights), block):
+        chunk = weights[start : start + block]
+        powers = decay ** np.arange(1, len(chunk) + 1)
+        result[start : start + len(chunk)] = powers * (previous + alpha * np.cumsum(chunk / powers))
+        previous = result[start + len(chunk) - 1]
+    return result
+
+
+def build_state(entries: Sequence[tuple[date, float]]) -> WeightTrendState:
+    """Compute the running state from the full ``(date, weight)`` series, ordered by date."""
+    if not entries:
+        return WeightTrendState()
+
+    days = np.array([day for day, _ in entries], dtype="datetime64[D]")
+    weights = np.array([weight for _, weight in entries], dtype=np.float64)
+
+    mondays = days - (days.astype(np.int64) + 3) % 7  # 1970-01-01 was a Thursday
+    weeks, inverse = np.unique(mondays, return_inverse=True)
+    totals = np.bincount(inverse, weights=weights)
+    counts = np.bincount(inverse)
+
+    in_window = days > days[-1] - np.timedelta64(ROLLING_WINDOW_DAYS, "D")
+    return WeightTrendState(
+        count=len(weights),
+        last_date=days[-1].item(),
+        latest=float(weights[-1]),
+        ema=float(ema(weights)[-1]),
+        window=[(day.item(), float(weight)) for day, weight in zip(days[in_window], weights[in_window], strict=True)],
+        weeks=[
+            WeekTotal(week_start=week.item(), total=float(total), count=int(count))
+            for week, total, count in zip(weeks[-WEEKS_KEPT:], totals[-WEEKS_KEPT:], counts[-WEEKS_KEPT:], strict=True)
+        ],
+    )
+
+
+def apply_entry(state: WeightTrendState, day: date, weight: float) -> WeightTrendState | None:
+    """Fold one entry into the state in O(1), or return None when it predates the series and needs a rebuild."""
+    if state.last_date is not None and day < state.last_date:
+        return None
+
+    state.ema = weight if state.ema is None else EMA_ALPHA * weight + (1 - EMA_ALPHA) * state.ema
+    state.count += 1
+    state.last_date = day
+    state.latest = weight
+
+    state.window.append((day, weight))
+    cutoff = day - timedelta(days=ROLLING_WINDOW_DAYS)
+    while state.window[0][0] <= cutoff:
+        state.window.pop(0)
+
+    monday = week_start(day)
+    if state.weeks and state.weeks[-1].week_start == monday:
+        state.weeks[-1].total += weight
+        state.weeks[-1].count += 1
+    else:
+        state.weeks = [*state.weeks[-(WEEKS_KEPT - 1) :], WeekTotal(week_start=monday, total=weight, count=1)]
+    return state
+
+
+def to_schema(state: WeightTrendState) -> WeightTrendSchema:
+    weeks = []
+    previous = None
+    for week in state.weeks:
+        average = week.total / week.count
+        consecutive = previous is not None and week.week_start - previous[0] == timedelta(weeks=1)
+        weeks.append(
+            WeekTrendSchema(
+                week_start=week.week_start,
+                average=round(average, 2),
+                delta=round(average - previous[1], 2) if consecutive else None,
+            )
+        )
+        previous = (week.week_start, average)
+
+    return WeightTrendSchema(
+        count=state.count,
+        latest=state.latest,
+        rolling_average=round(sum(weight for _, weight in state.window) / len(state.window), 2) if state.window else None,
+        ema=round(state.ema, 2) if state.ema is not None else None,
+        week_over_week=weeks[-1].delta if weeks else None,
+        weeks=weeks,
+    )
+
+
+def build_series(entries: Sequence[tuple[date, float]]) -> list[WeightTrendPointSchema]:
+    """Per-entry rolling average and EMA over the whole history, for charting."""
+    if not entries:
+        return []
+    days = np.array([day for day, _ in entries], dtype="datetime64[D]")
+    weights = np.array([weight for _, weight in entries], dtype=np.float64)
+    rolling = np.round(rolling_mean(days, weights), 2)
+    smoothed = np.round(ema(weights), 2)
+    return [
+        WeightTrendPointSchema(date=day, weight=weight, rolling_average=avg, ema=smooth)
+        for (day, weight), avg, smooth in zip(entries, rolling.tolist(), smoothed.tolist(), strict=True)
+    ]
+
+
+def get_cached_state(user_id: int) -> WeightTrendState | None:
+    cached = cache.get(_state_key(user_id))
+    return WeightTrendState.model_validate(cached) if cached is not None else None
+
+
+def store_state(user_id: int, state: WeightTrendState) -> None:
+    cache.set(_state_key(user_id), state.model_dump(), timeout=settings.WEIGHT_TREND_CACHE_TIMEOUT)
+
+
+def record_entry(user_id: int, day: date | str, weight: float | str) -> None:
+    """Fold a newly created entry into the cached trend once the write commits.
+
+    Concurrent writers can race on the read-modify-write, so the cached state also expires after
+    ``WEIGHT_TREND_CACHE_TIMEOUT``; anything that is not a plain append drops it instead.
+    """
+
+    def update():
+        state = get_cached_state(user_id)
+        if state is None:
+            return
+        try:
+            entry = WeightEntryImportSchema.model_validate({"date": day, "weight": weight})
+        except ValidationError:
+            entry = None
+        state = apply_entry(state, entry.date, entry.weight) if entry else None
+        if state is None:
+            cache.delete(_state_key(user_id))
+        else:
+            store_state(user_id, state)
+
+    transaction.on_commit(update)
+
+
+def invalidate_trend(user_id: int) -> None:
+    transaction.on_commit(lambda: cache.delete(_state_key(user_id)))
@@ -1,5 +1,6 @@
 from tracker.schemas.workout_plan_schema import WorkoutPlanSchema
 
+from .data_version import bump_plan_data_version
 from .exceptions import ServiceError
 from ..models import WorkoutPlan
 
@@ -49,6 +50,7 @@ def update_workout_plan(plan_id: int, payload: dict, full: bool = False) -> Work
     plan.description = payload.get("description", plan.description)
     plan.version = payload.get("version", plan.version)
     plan.save()
+    bump_plan_data_version([plan.id])
 
     return WorkoutPlanSchema.model_validate(plan)
 
@@ -58,4 +60,5 @@ def delete_workout_plan(plan_id: int):
         plan = WorkoutPlan.objects.get(id=plan_id)
     except WorkoutPlan.DoesNotExist:
         raise ServiceError(f"Workout plan with id {plan_id} not found", code=404)
+    bump_plan_data_version([plan.id])
     plan.delete()
@@ -1 +1,1252 @@
-# Create your tests here.
+import base64
+import csv
+import gzip
+import io
+import json
+import os
+import time
+from dataclasses import dataclass
+from datetime import UTC
+from datetime import date
+from datetime import datetime
+from datetime import timedelta
+from http import HTTPStatus
+from importlib import import_module
+from typing import Any
+from unittest import mock
+from unittest import skipUnless
+from urllib.parse import urlsplit
+
+import numpy as np
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import caches
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import DatabaseError
+from django.db import connection
+from django.db import transaction
+from django.http import HttpResponse
+from django.http import StreamingHttpResponse
+from django.test import RequestFactory
+from django.test import SimpleTestCase
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.test.utils import override_settings
+from django.urls import resolve
+from django.urls import reverse
+from django.utils import timezone
+from prometheus_client import REGISTRY
+
+from authentication.models import User
+from config import compression
+from config.compression import CompressionMiddleware
+from config.compression import negotiate
+from config.metrics import ACTIVE_SESSIONS_CACHE_KEY
+from config.query_instrumentation import NPlusOneError
+from config.query_instrumentation import QueryInstrumentationMiddleware
+from config.query_instrumentation import fingerprint
+from config.views import metrics_view
+
+from .models import Exercise
+from .models import ExerciseSet
+from .models import TrainingAggregate
+from .models import WeightTracker
+from .models import WorkoutPlan
+from .models import WorkoutSession
+from .repository.caching import clear_caches
+from .repository.pagination import InvalidCursorError
+from .repository.pagination import encode_cursor
+from .repository.pagination import keyset_paginate
+from .repository.session import WorkoutSessionRepositoryImpl
+from .repository.session import get_session_repository
+from .repository.training_aggregate import get_training_aggregate_repository
+from .repository.weight_tracker import WeightTrackerRepositoryImpl
+from .repository.weight_tracker import get_weight_tracker_repository
+from .schemas.exercise_set_schema import ExerciseSetInputSchema
+from .service import weight_trends
+from .service.data_version import bump_data_version
+from .service.exceptions import ServiceError
+from .service.exercise import delete_exercise
+from .service.exercise_set import add_exercise_set
+from .service.exercise_set import delete_exercise_set
+from .service.exercise_set import refresh_plan_totals
+from .service.exercise_set import save_exercise_sets
+from .service.exercise_set import update_exercise_set
+from .service.export import CSV_COLUMNS
+from .service.export import stream_history
+from .service.session import get_session_service
+from .service.weight_import import MAX_REPORTED_ERRORS
+from .service.weight_import import WeightImportResult
+from .service.weight_tracker import get_weight_tracker_service
+
+USERS = 400
+PLANS_PER_USER = 5
+SESSIONS_PER_USER = 150
+WEIGHTS_PER_USER = 150
+
+# The manifest storage needs collectstatic to have run before {% static %} can resolve a name.
+UNHASHED_STATIC_STORAGES = {
+    **settings.STORAGES,
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+
+# Budgets must not depend on the developer's cache directory or on state left by an earlier request.
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "budget-default"},
+    "sessions": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "budget-sessions"},
+}
+
+# Wall-time budgets are calibrated on a developer machine; slower CI runners can scale them up.
+TIME_BUDGET_SCALE = float(os.getenv("VIEW_TIME_BUDGET_SCALE", "1"))
+
+
+def log_in(client, user: User) -> None:
+    session = client.session
+    session["user_id"] = user.id
+    session["email"] = user.email
+    session.save()
+
+
+def plan_nodes(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+@override_settings(STORAGES=UNHASHED_STATIC_STORAGES)
+class HotQueryPlanTests(TestCase):
+    """Fail when a per-user hot query stops being served by its index.
+
+    Every query is captured from the code path that issues it in production and re-run under
+    ``EXPLAIN`` with the default planner settings against a seeded, analyzed database large enough
+    for the planner to prefer an index over scanning the table. The plan must use the named index
+    from ``tracker.models`` and have no sequential scan of the table and no explicit ``Sort`` node;
+    otherwise the index no longer matches the query shape, or has been dropped or renamed.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        users = User.objects.bulk_create([User(email=f"user{i}@example.com", password="!") for i in range(USERS)])
+        plans = WorkoutPlan.objects.bulk_create(
+            [WorkoutPlan(creator=user, name=f"Plan {i}", description="") for user in users for i in range(PLANS_PER_USER)]
+        )
+        now = timezone.now()
+        WorkoutSession.objects.bulk_create(
+            [
+                WorkoutSession(
+                    user=user,
+                    plan=plans[u * PLANS_PER_USER + i % PLANS_PER_USER],
+                    duration_minutes=45,
+                    status=WorkoutSession.Status.ACTIVE if i == 0 else WorkoutSession.Status.COMPLETED,
+                    start_time=now - timedelta(days=i),
+                )
+                for u, user in enumerate(users)
+                for i in range(SESSIONS_PER_USER)
+            ]
+        )
+        WeightTracker.objects.bulk_create(
+            [
+                WeightTracker(user=user, date=date(2020, 1, 1) + timedelta(days=i), weight=80 - i / 100)
+                for user in users
+                for i in range(WEIGHTS_PER_USER)
+            ]
+        )
+        with connection.cursor() as cursor:
+            for model in (User, WorkoutPlan, WorkoutSession, WeightTracker):
+                cursor.execute(f'ANALYZE "{model._meta.db_table}"')
+        cls.user = users[USERS // 2]
+
+    def capture(self, table: str, func) -> list[str]:
+        with CaptureQueriesContext(connection) as ctx:
+            func()
+        statements = [q["sql"] for q in ctx.captured_queries if f'FROM "{table}"' in q["sql"]]
+        self.assertTrue(statements, f"no query against {table} was captured")
+        return statements
+
+    def assert_index_plan(self, sql: str, table: str, index: str):
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}")
+            raw = cursor.fetchone()[0]
+        plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+        indexes = {node.get("Index Name") for node in plan_nodes(plan) if node.get("Relation Name") == table}
+        self.assertIn(index, indexes, f"{index} not used:\n{sql}\n{json.dumps(plan, indent=2)}")
+        for node in plan_nodes(plan):
+            node_type = node["Node Type"]
+            self.assertFalse(
+                node_type == "Seq Scan" and node.get("Relation Name") == table,
+                f"sequential scan on {table}:\n{sql}\n{json.dumps(plan, indent=2)}",
+            )
+            self.assertNotIn(node_type, ("Sort", "Incremental Sort"), f"explicit sort:\n{sql}\n{json.dumps(plan, indent=2)}")
+
+    def test_session_pages_use_user_start_time_index(self):
+        repo = get_session_repository()
+        first = repo.get_page_by_user(self.user.id, None, 20)
+        statements = self.capture("tracker_workoutsession", lambda: repo.get_page_by_user(self.user.id, first.next_cursor, 20))
+        statements += self.capture("tracker_workoutsession", lambda: repo.get_page_by_user(self.user.id, None, 20))
+        for sql in statements:
+            self.assert_index_plan(sql, "tracker_workoutsession", "session_user_start_idx")
+
+    def test_active_session_lookup_uses_partial_index(self):
+        repo = get_session_repository()
+        for sql in self.capture("tracker_workoutsession", lambda: repo.get_active_by_user(self.user.id)):
+            self.assert_index_plan(sql, "tracker_workoutsession", "session_user_active_idx")
+
+    def test_weight_pages_use_user_date_index(self):
+        repo = get_weight_tracker_repository()
+        first = repo.get_page_by_user(self.user.id, None, 20)
+        statements = self.capture("tracker_weighttracker", lambda: repo.get_page_by_user(self.user.id, first.next_cursor, 20))
+        statements += self.capture("tracker_weighttracker", lambda: repo.get_page_by_user(self.user.id, None, 20))
+        for sql in statements:
+            self.assert_index_plan(sql, "tracker_weighttracker", "weight_user_date_idx")
+
+    def test_plan_list_uses_creator_index(self):
+        session = self.client.session
+        session["user_id"] = self.user.id
+        session.save()
+        for sql in self.capture("tracker_workoutplan", lambda: self.client.get("/plans/")):
+            self.assert_index_plan(sql, "tracker_workoutplan", "plan_creator_id_idx")
+
+
+@skipUnless(connection.settings_dict["OPTIONS"].get("pool"), "the connection pool is disabled")
+class ConnectionPoolTests(TestCase):
+    def test_broken_connections_are_replaced_on_checkout(self):
+        pool = connection.pool
+        with pool.connection() as conn:
+            pid = conn.info.backend_pid
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_terminate_backend(%s)", [pid])
+
+        # The terminated connection is back in the pool; the checkout check has to catch it.
+        for _ in range(pool.get_stats()["pool_size"]):
+            with pool.connection() as conn:
+                self.assertEqual(conn.execute("SELECT 1").fetchone(), (1,))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email="pages@example.com", password="!")
+        plan = WorkoutPlan.objects.create(creator=cls.user, name="Plan", description="")
+        start = timezone.now().replace(microsecond=0)
+        # Groups of three sessions share a start time, so pages have to break ties on id.
+        WorkoutSession.objects.bulk_create(
+            [
+                WorkoutSession(
+                    user=cls.user, plan=plan, duration_minutes=i, status="completed", start_time=start - timedelta(hours=i // 3)
+                )
+                for i in range(20)
+            ]
+        )
+
+    def setUp(self):
+        log_in(self.client, self.user)
+
+    def queryset(self):
+        return WorkoutSession.objects.filter(user=self.user)
+
+    def collect(self, limit: int) -> list[int]:
+        ids, cursor = [], None
+        while True:
+            page = keyset_paginate(self.queryset(), ("start_time", "id"), cursor, limit, descending=True)
+            self.assertLessEqual(len(page), limit)
+            ids += [session.id for session in page]
+            if not page.has_next:
+                return ids
+            cursor = page.next_cursor
+
+    def test_pages_walk_every_row_once_in_order(self):
+        expected = list(self.queryset().order_by("-start_time", "-id").values_list("id", flat=True))
+        for limit in (1, 2, 3, 7, 20, 100):
+            with self.subTest(limit=limit):
+                self.assertEqual(self.collect(limit), expected)
+
+    def test_ascending_pages_of_values_rows(self):
+        expected = list(self.queryset().order_by("start_time", "id").values_list("id", flat=True))
+        page = keyset_paginate(self.queryset().values("id", "start_time"), ("start_time", "id"), None, 4)
+        rest = keyset_paginate(self.queryset().values("id", "start_time"), ("start_time", "id"), page.next_cursor, 100)
+        self.assertEqual([row["id"] for row in [*page, *rest]], expected)
+        self.assertFalse(rest.has_next)
+
+    def test_malformed_cursors_are_rejected(self):
+        cursors = [
+            "not base64!",
+            base64.urlsafe_b64encode(b'{"a": 1}').decode(),
+            encode_cursor([1]),
+            encode_cursor([None, 1]),
+            encode_cursor(["2024-01-01T00:00:00+00:00", None]),
+            encode_cursor([[1], 1]),
+            encode_cursor([1.5, "zz"]),
+            encode_cursor([True, 1]),
+            encode_cursor(["not a date", 1]),
+            encode_cursor(["2024-01-01T00:00:00+00:00", 10**30]),
+            encode_cursor(["2024-01-01T00:00:00+00:00", float("inf")]),
+        ]
+        for cursor in cursors:
+            with self.subTest(cursor=cursor), self.assertRaises(InvalidCursorError):
+                keyset_paginate(self.queryset(), ("start_time", "id"), cursor, 10, descending=True)
+
+    def test_views_turn_malformed_cursors_away(self):
+        cursor = encode_cursor([None, 1])
+        response = self.client.get(reverse("tracker:api_exercises"), {"cursor": encode_cursor([[1], 1])})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        for name in ("exercises_list", "sessions_list", "weight_tracker_list"):
+            with self.subTest(name), self.settings(STORAGES=UNHASHED_STATIC_STORAGES):
+                response = self.client.get(reverse(f"tracker:{name}"), {"cursor": cursor})
+                self.assertEqual(response.status_code, HTTPStatus.FOUND)
+
+
+@override_settings(CACHES=LOCMEM_CACHES, REPOSITORY_CACHE_TTL=30)
+class RepositoryCacheTests(TestCase):
+    """A write committed by another worker, whose LRU is not this one's, must not be served from this one's cache."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email="cache@example.com", password="!")
+        plan = WorkoutPlan.objects.create(creator=cls.user, name="Plan", description="")
+        cls.session = WorkoutSession.objects.create(user=cls.user, plan=plan, duration_minutes=0, start_time=timezone.now())
+        cls.weight = WeightTracker.objects.create(user=cls.user, date=date(2024, 1, 1), weight=80)
+
+    def setUp(self):
+        caches["default"].clear()
+        clear_caches()
+
+    def write_elsewhere(self, repo, instance, **fields):
+        with self.captureOnCommitCallbacks(execute=True):
+            repo.update(repo.get(pk=instance.pk), **fields)
+            bump_data_version(self.user.id)
+
+    def test_session_lookup_sees_other_workers_write(self):
+        repo = get_session_repository()
+        self.assertEqual(repo.get_by_id_and_user(self.session.id, self.user.id).status, WorkoutSession.Status.ACTIVE)
+        with self.assertNumQueries(0):
+            repo.get_by_id_and_user(self.session.id, self.user.id)
+
+        self.write_elsewhere(WorkoutSessionRepositoryImpl(), self.session, status=WorkoutSession.Status.COMPLETED)
+        self.assertEqual(repo.get_by_id_and_user(self.session.id, self.user.id).status, WorkoutSession.Status.COMPLETED)
+
+    def test_weight_lookup_sees_other_workers_write(self):
+        repo = get_weight_tracker_repository()
+        self.assertEqual(repo.get_by_id_and_user(self.weight.id, self.user.id).weight, 80)
+
+        self.write_elsewhere(WeightTrackerRepositoryImpl(), self.weight, weight=79)
+        self.assertEqual(repo.get_by_id_and_user(self.weight.id, self.user.id).weight, 79)
+
+    def test_update_many_invalidates_the_updated_rows(self):
+        repo = get_session_repository()
+        session = repo.get_by_id_and_user(self.session.id, self.user.id)
+        updated_at = session.updated_at
+
+        session.status = WorkoutSession.Status.COMPLETED
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(repo.update_many([session], ["status"]), 1)
+
+        # No data version bump: the entry itself has to be gone.
+        cached = repo.get_by_id_and_user(self.session.id, self.user.id)
+        self.assertEqual(cached.status, WorkoutSession.Status.COMPLETED)
+        self.assertGreater(cached.updated_at, updated_at)
+
+    def test_get_many_is_one_query_keyed_by_pk(self):
+        repo = get_weight_tracker_repository()
+        with self.assertNumQueries(1):
+            rows = repo.get_many([self.weight.id, self.weight.id + 1000])
+        self.assertEqual(list(rows), [self.weight.id])
+        self.assertEqual(rows[self.weight.id].weight, 80)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class WeightImportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email="import@example.com", password="!")
+
+    def run_import(self, text: str, fmt: str) -> WeightImportResult:
+        return get_weight_tracker_service().import_weight_trackers(self.user.id, io.BytesIO(text.encode()), fmt)
+
+    def weights(self) -> list[tuple[date, float]]:
+        return list(WeightTracker.objects.filter(user=self.user).order_by("date").values_list("date", "weight"))
+
+    def test_csv_rows_are_imported_and_bad_rows_reported_by_line(self):
+        result = self.run_import(
+            " Date , WEIGHT \n2024-01-01,80.5\nyesterday,80\n2024-01-03,0\n2024-01-04,\n2024-01-05,79.5\n", "csv"
+        )
+        self.assertEqual(result.created, 2)
+        self.assertEqual(result.error_count, 3)
+        self.assertEqual([error.line for error in result.errors], [3, 4, 5])
+        self.assertIn("date", result.errors[0].error)
+        self.assertIn("weight", result.errors[1].error)
+        self.assertEqual(self.weights(), [(date(2024, 1, 1), 80.5), (date(2024, 1, 5), 79.5)])
+
+    def test_csv_without_required_columns_is_rejected(self):
+        with self.assertRaises(ServiceError) as ctx:
+            self.run_import("day,kg\n2024-01-01,80\n", "csv")
+        self.assertEqual(ctx.exception.code, HTTPStatus.BAD_REQUEST)
+
+    def test_reported_errors_are_capped_but_counted(self):
+        result = self.run_import("".join('{"date": "bad"}\n' for _ in range(MAX_REPORTED_ERRORS + 5)), "jsonl")
+        self.assertEqual(result.error_count, MAX_REPORTED_ERRORS + 5)
+        self.assertEqual(len(result.errors), MAX_REPORTED_ERRORS)
+
+    def test_failed_batch_rolls_back_the_whole_import(self):
+        bulk_create = WeightTracker.objects.bulk_create
+        calls = []
+
+        def fail_second_batch(objs, *args, **kwargs):
+            calls.append(len(objs))
+            if len(calls) > 1:
+                raise DatabaseError("connection lost")
+            return bulk_create(objs, *args, **kwargs)
+
+        rows = "".join(f'{{"date": "2024-01-{day:02d}", "weight": 80}}\n' for day in range(1, 6))
+        with (
+            mock.patch("tracker.service.weight_tracker.IMPORT_BATCH_SIZE", 2),
+            mock.patch.object(WeightTracker.objects, "bulk_create", fail_second_batch),
+            self.assertRaises(DatabaseError),
+        ):
+            self.run_import(rows, "jsonl")
+        self.assertEqual(calls, [2, 2])
+        self.assertEqual(self.weights(), [])
+
+    def test_jsonl_body_through_the_api(self):
+        log_in(self.client, self.user)
+        body = '{"date": "2024-02-01", "weight": 81}\n\nnot json\n[1, 2]\n{"date": "2024-02-02", "weight": 80.5}\n'
+        response = self.client.post(reverse("tracker:api_weight_tracker_import"), body, content_type="application/x-ndjson")
+        self.assertEqual(response.status_code, HTTPStatus.CREATED)
+        payload = response.json()
+        self.assertEqual(payload["created"], 2)
+        self.assertEqual(
+            [(e["line"], e["error"].split(":")[0]) for e in payload["errors"]],
+            [(3, "Invalid JSON"), (4, "Expected a JSON object.")],
+        )
+
+        response = self.client.post(
+            reverse("tracker:api_weight_tracker_import"), "not json\n", content_type="application/x-ndjson"
+        )
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertEqual(response.json()["created"], 0)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class HistoryExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email="export@example.com", password="!")
+        other = User.objects.create(email="other@example.com", password="!")
+        squat = Exercise.objects.create(name="Squat", type="strength", description="")
+        row = Exercise.objects.create(name="Row", type="strength", description="")
+        legs = WorkoutPlan.objects.create(creator=cls.user, name="Legs", description="")
+        empty = WorkoutPlan.objects.create(creator=cls.user, name="Empty", description="")
+        ExerciseSet.objects.create(workout_plan=legs, exercise=squat, sets=5, reps=5, weight=100)
+        ExerciseSet.objects.create(workout_plan=legs, exercise=row, sets=3, reps=10, weight=60)
+        start = datetime(2024, 3, 1, 7, 30, tzinfo=UTC)
+        cls.later = WorkoutSession.objects.create(
+            user=cls.user, plan=empty, duration_minutes=0, status="active", start_time=start + timedelta(days=1)
+        )
+        cls.earlier = WorkoutSession.objects.create(
+            user=cls.user, plan=legs, duration_minutes=50, status="completed", start_time=start
+        )
+        WorkoutSession.objects.create(user=other, plan=legs, duration_minutes=10, status="completed", start_time=start)
+        WeightTracker.objects.create(user=cls.user, date=date(2024, 3, 2), weight=80.5)
+        WeightTracker.objects.create(user=cls.user, date=date(2024, 3, 1), weight=81)
+        WeightTracker.objects.create(user=other, date=date(2024, 3, 1), weight=60)
+
+    def test_csv_has_a_row_per_exercise_set_then_the_weights(self):
+        rows = list(csv.reader("".join(stream_history(self.user.id, "csv")).splitlines()))
+        self.assertEqual(rows[0], CSV_COLUMNS)
+        self.assertEqual(
+            rows[1:],
+            [
+                [
+                    "session",
+                    "2024-03-01T07:30:00+00:00",
+                    str(self.earlier.id),
+                    "Legs",
+                    "completed",
+                    "50",
+                    "Squat",
+                    "5",
+                    "5",
+                    "100.0",
+                    "",
+                ],
+                [
+                    "session",
+                    "2024-03-01T07:30:00+00:00",
+                    str(self.earlier.id),
+                    "Legs",
+                    "completed",
+                    "50",
+                    "Row",
+                    "3",
+                    "10",
+                    "60.0",
+                    "",
+                ],
+                ["session", "2024-03-02T07:30:00+00:00", str(self.later.id), "Empty", "active", "0", "", "", "", "", ""],
+                ["weight", "2024-03-01", "", "", "", "", "", "", "", "", "81.0"],
+                ["weight", "2024-03-02", "", "", "", "", "", "", "", "", "80.5"],
+            ],
+        )
+
+    def test_ndjson_has_a_record_per_session_and_weight(self):
+        records = [json.loads(line) for line in "".join(stream_history(self.user.id, "ndjson")).splitlines()]
+        self.assertEqual(
+            [(r["record"], r["id"]) for r in records[:2]], [("session", self.earlier.id), ("session", self.later.id)]
+        )
+        self.assertEqual(records[0]["plan"], {"id": self.earlier.plan_id, "name": "Legs"})
+        self.assertEqual(
+            records[0]["exercise_sets"],
+            [
+                {"exercise": "Squat", "sets": 5, "reps": 5, "weight": 100.0},
+                {"exercise": "Row", "sets": 3, "reps": 10, "weight": 60.0},
+            ],
+        )
+        self.assertEqual(records[1]["exercise_sets"], [])
+        self.assertEqual(
+            [(r["record"], r["date"], r["weight"]) for r in records[2:]],
+            [("weight", "2024-03-01", 81.0), ("weight", "2024-03-02", 80.5)],
+        )
+
+    def test_api_streams_an_attachment(self):
+        log_in(self.client, self.user)
+        response = self.client.get(reverse("tracker:api_history_export"), {"format": "ndjson"})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertIn("attachment;", response["Content-Disposition"])
+        self.assertEqual(len(b"".join(response.streaming_content).splitlines()), 4)
+
+        response = self.client.get(reverse("tracker:api_history_export"), {"format": "xml"})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class WeightTrendTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email="trend@example.com", password="!")
+
+    def setUp(self):
+        caches["default"].clear()
+        rng = np.random.default_rng(7)
+        # Irregular gaps (some longer than the rolling window) over a few years of entries.
+        days = np.cumsum(rng.integers(1, 10, size=400))
+        weights = 85 + np.cumsum(rng.normal(0, 0.3, size=400))
+        self.entries = [
+            (date(2020, 1, 1) + timedelta(days=int(d)), round(float(w), 1)) for d, w in zip(days, weights, strict=True)
+        ]
+
+    def test_ema_matches_the_recurrence(self):
+        weights = np.array([weight for _, weight in self.entries] * 10)
+        expected = [weights[0]]
+        for weight in weights[1:]:
+            expected.append(weight_trends.EMA_ALPHA * weight + (1 - weight_trends.EMA_ALPHA) * expected[-1])
+        np.testing.assert_allclose(weight_trends.ema(weights), expected, rtol=1e-9)
+
+    def test_rolling_mean_covers_the_trailing_calendar_days(self):
+        days = np.array([day for day, _ in self.entries], dtype="datetime64[D]")
+        weights = np.array([weight for _, weight in self.entries])
+        window = timedelta(days=weight_trends.ROLLING_WINDOW_DAYS)
+        expected = [np.mean([w for d, w in self.entries if day - window < d <= day]) for day, _ in self.entries]
+        np.testing.assert_allclose(weight_trends.rolling_mean(days, weights), expected)
+
+    def test_incremental_state_matches_a_rebuild(self):
+        state = weight_trends.build_state(self.entries[:50])
+        for day, weight in self.entries[50:]:
+            state = weight_trends.apply_entry(state, day, weight)
+        rebuilt = weight_trends.build_state(self.entries)
+        self.assertEqual(weight_trends.to_schema(state), weight_trends.to_schema(rebuilt))
+        self.assertAlmostEqual(state.ema, rebuilt.ema)
+        self.assertEqual(state.window, rebuilt.window)
+        self.assertEqual(len(state.weeks), weight_trends.WEEKS_KEPT)
+
+    def test_backdated_entry_needs_a_rebuild(self):
+        state = weight_trends.build_state(self.entries[:10])
+        self.assertIsNone(weight_trends.apply_entry(state, self.entries[5][0], 80))
+
+    def test_trend_summary(self):
+        entries = [(date(2024, 1, 1), 80.0), (date(2024, 1, 3), 81.0), (date(2024, 1, 8), 79.0), (date(2024, 1, 10), 78.0)]
+        trend = weight_trends.to_schema(weight_trends.build_state(entries))
+        alpha = weight_trends.EMA_ALPHA
+        ema = 80.0
+        for _, weight in entries[1:]:
+            ema = alpha * weight + (1 - alpha) * ema
+        self.assertEqual(trend.count, 4)
+        self.assertEqual(trend.latest, 78.0)
+        self.assertEqual(trend.rolling_average, 78.5)  # Jan 8 and Jan 10; Jan 3 is outside the 7 days
+        self.assertEqual(trend.ema, round(ema, 2))
+        self.assertEqual(
+            [(w.week_start, w.average, w.delta) for w in trend.weeks],
+            [(date(2024, 1, 1), 80.5, None), (date(2024, 1, 8), 78.5, -2.0)],
+        )
+        self.assertEqual(trend.week_over_week, -2.0)
+
+    def test_service_keeps_the_cached_trend_current(self):
+        service = get_weight_tracker_service()
+        WeightTracker.objects.bulk_create([WeightTracker(user=self.user, date=day, weight=w) for day, w in self.entries[:-2]])
+        service.get_trend(self.user.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            service.create_weight_tracker(self.user.id, self.entries[-2][1], self.entries[-2][0])
+        self.assertEqual(weight_trends.get_cached_state(self.user.id).count, len(self.entries) - 1)
+
+        # A backdated entry cannot be folded in; the cached state is dropped and rebuilt on the next read.
+        with self.captureOnCommitCallbacks(execute=True):
+            service.create_weight_tracker(self.user.id, self.entries[-1][1], self.entries[0][0] - timedelta(days=1))
+        self.assertIsNone(weight_trends.get_cached_state(self.user.id))
+        series = list(WeightTracker.objects.filter(user=self.user).order_by("date", "id").values_list("date", "weight"))
+        self.assertEqual(service.get_trend(self.user.id), weight_trends.to_schema(weight_trends.build_state(series)))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TrainingAggregateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email="rollups@example.com", password="!")
+        cls.plan = WorkoutPlan.objects.create(creator=cls.user, name="Plan", description="")
+
+    def setUp(self):
+        self.repo = get_training_aggregate_repository()
+
+    def rows(self) -> list[tuple]:
+        return list(
+            TrainingAggregate.objects.filter(user=self.user)
+            .order_by("period", "period_start")
+            .values_list("period", "period_start", "session_count", "completed_count", "active_count", "total_minutes")
+        )
+
+    def assert_matches_rebuild(self) -> None:
+        incremental = self.rows()
+        self.repo.rebuild([self.user.id])
+        self.assertEqual(incremental, self.rows())
+
+    def test_service_writes_match_a_rebuild(self):
+        service = get_session_service()
+        first = service.start_session(self.user.id, self.plan.id)
+        self.assert_matches_rebuild()
+        WorkoutSession.objects.filter(id=first.id).update(start_time=first.start_time - timedelta(minutes=42))
+        service.finish_session(first.id, self.user.id)
+        self.assert_matches_rebuild()
+
+        second = service.start_session(self.user.id, self.plan.id)
+        self.assertEqual(self.rows()[0][2:], (2, 1, 1, 42))
+        service.delete_session(second.id, self.user.id)
+        self.assert_matches_rebuild()
+
+        service.delete_session(first.id, self.user.id)
+        self.assertEqual(self.rows(), [])
+        self.assert_matches_rebuild()
+
+    def test_deltas_over_days_and_weeks_match_a_rebuild(self):
+        monday = datetime(2024, 1, 1, 9, tzinfo=timezone.get_default_timezone())
+        for offset, status, minutes in [(0, "completed", 30), (2, "completed", 45), (2, "active", 0), (8, "completed", 60)]:
+            start = monday + timedelta(days=offset)
+            WorkoutSession.objects.create(
+                user=self.user, plan=self.plan, duration_minutes=minutes, status=status, start_time=start
+            )
+            completed = status == "completed"
+            self.repo.apply_delta(
+                self.user.id, start.date(), sessions=1, completed=int(completed), active=int(not completed), minutes=minutes
+            )
+        self.assertEqual(
+            [row for row in self.rows() if row[0] == "week"],
+            [("week", date(2024, 1, 1), 3, 2, 1, 75), ("week", date(2024, 1, 8), 1, 1, 0, 60)],
+        )
+        self.assert_matches_rebuild()
+
+    def test_decrements_are_clamped_and_empty_rows_removed(self):
+        day = date(2024, 1, 3)
+        self.repo.apply_delta(self.user.id, day, sessions=-1, completed=-1, minutes=-30)
+        self.assertEqual(self.rows(), [])
+
+        self.repo.apply_delta(self.user.id, day, sessions=2, completed=1, minutes=20)
+        self.repo.apply_delta(self.user.id, day, sessions=-1, completed=-3, minutes=-50)
+        self.assertEqual(self.rows(), [("day", day, 1, 0, 0, 0), ("week", date(2024, 1, 1), 1, 0, 0, 0)])
+
+        self.repo.apply_delta(self.user.id, day, sessions=-1)
+        self.assertEqual(self.rows(), [])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PlanCounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email="counters@example.com", password="!")
+        cls.squat, cls.row, cls.press = Exercise.objects.bulk_create(
+            [Exercise(name=name, type="strength", description="") for name in ("Squat", "Row", "Press")]
+        )
+
+    def setUp(self):
+        self.plan = WorkoutPlan.objects.create(creator=self.user, name="Plan", description="")
+
+    def assert_counters(self, count: int, volume: float) -> None:
+        sets = ExerciseSet.objects.filter(workout_plan=self.plan)
+        self.assertEqual(count, sets.count())
+        self.assertAlmostEqual(volume, sum(es.sets * es.reps * es.weight for es in sets))
+        self.plan.refresh_from_db()
+        self.assertEqual((self.plan.exercise_count, self.plan.total_volume), (count, volume))
+
+    def test_counters_follow_exercise_set_writes(self):
+        squat = add_exercise_set(self.plan.id, {"exercise_id": self.squat.id, "sets": 5, "reps": 5, "weight": 100})
+        add_exercise_set(self.plan.id, {"exercise_id": self.row.id, "sets": 3, "reps": 10, "weight": 50})
+        self.assert_counters(2, 2500 + 1500)
+
+        update_exercise_set(squat.id, {"weight": 120})
+        self.assert_counters(2, 3000 + 1500)
+
+        delete_exercise_set(squat.id)
+        self.assert_counters(1, 1500)
+
+        save_exercise_sets(
+            self.plan.id, [ExerciseSetInputSchema(exercise_id=self.press.id, sets=4, reps=8, weight=40)], replace=True
+        )
+        self.assert_counters(1, 1280)
+
+        delete_exercise(self.press.id)
+        self.assert_counters(0, 0)
+
+    def test_check_plan_counters_reports_and_repairs_drift(self):
+        add_exercise_set(self.plan.id, {"exercise_id": self.squat.id, "sets": 5, "reps": 5, "weight": 100})
+        call_command("check_plan_counters", stdout=io.StringIO())
+
+        WorkoutPlan.objects.filter(id=self.plan.id).update(exercise_count=7, total_volume=1)
+        with self.assertRaises(CommandError):
+            call_command("check_plan_counters", stdout=io.StringIO())
+        out = io.StringIO()
+        call_command("check_plan_counters", "--fix", stdout=out)
+        self.assertIn("Repaired 1 plans.", out.getvalue())
+        self.assert_counters(1, 2500)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class AddExerciseSetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email="upsert@example.com", password="!")
+        cls.plan = WorkoutPlan.objects.create(creator=cls.user, name="Plan", description="")
+        cls.squat = Exercise.objects.create(name="Squat", type="strength", description="")
+
+    def test_inserts_then_updates_only_the_given_fields(self):
+        with self.assertNumQueries(1):
+            created = add_exercise_set(self.plan.id, {"exercise_id": self.squat.id, "sets": 5, "reps": 5, "weight": 100})
+        self.assertEqual(created.exercise_name, "Squat")
+        self.assertEqual((created.sets, created.reps, created.weight), (5, 5, 100))
+
+        with self.assertNumQueries(1):
+            updated = add_exercise_set(self.plan.id, {"exercise_id": self.squat.id, "weight": 120})
+        self.assertEqual(updated.id, created.id)
+        self.assertEqual((updated.sets, updated.reps, updated.weight), (5, 5, 120))
+        self.assertEqual(ExerciseSet.objects.filter(workout_plan=self.plan).count(), 1)
+
+        self.plan.refresh_from_db()
+        self.assertEqual((self.plan.exercise_count, self.plan.total_volume), (1, 3000))
+
+    def test_missing_parents_are_not_found(self):
+        missing = [
+            (self.plan.id + 1000, {"exercise_id": self.squat.id}, 404),
+            (self.plan.id, {"exercise_id": self.squat.id + 1000}, 404),
+            (self.plan.id, {"sets": 3}, 400),
+        ]
+        for plan_id, payload, code in missing:
+            with self.subTest(payload=payload), self.assertRaises(ServiceError) as raised:
+                add_exercise_set(plan_id, payload)
+            self.assertEqual(raised.exception.code, code)
+
+        self.assertFalse(ExerciseSet.objects.exists())
+        self.plan.refresh_from_db()
+        self.assertEqual((self.plan.exercise_count, self.plan.total_volume), (0, 0))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ExerciseSetBatchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email="batch@example.com", password="!")
+        cls.squat, cls.row, cls.press = Exercise.objects.bulk_create(
+            [Exercise(name=name, type="strength", description="") for name in ("Squat", "Row", "Press")]
+        )
+
+    def setUp(self):
+        log_in(self.client, self.user)
+        self.plan = WorkoutPlan.objects.create(creator=self.user, name="Plan", description="")
+        ExerciseSet.objects.bulk_create(
+            [
+                ExerciseSet(workout_plan=self.plan, exercise=self.squat, sets=5, reps=5, weight=100),
+                ExerciseSet(workout_plan=self.plan, exercise=self.row, sets=3, reps=10, weight=50),
+            ]
+        )
+        refresh_plan_totals([self.plan.id])
+        self.url = reverse("tracker:api_plan_exercise_sets", args=[self.plan.id])
+
+    def send(self, method: str, *items: dict, url: str | None = None):
+        body = json.dumps({"exercise_sets": list(items)})
+        return getattr(self.client, method)(url or self.url, body, content_type="application/json")
+
+    def stored(self) -> dict[int, tuple]:
+        return {
+            exercise_id: (sets, reps, weight)
+            for exercise_id, sets, reps, weight in ExerciseSet.objects.filter(workout_plan=self.plan).values_list(
+                "exercise_id", "sets", "reps", "weight"
+            )
+        }
+
+    def test_patch_upserts_and_keeps_unlisted_sets(self):
+        response = self.send(
+            "patch",
+            {"exercise_id": self.squat.id, "sets": 5, "reps": 3, "weight": 120},
+            {"exercise_id": self.press.id, "sets": 4, "reps": 8, "weight": 40},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        expected = {self.squat.id: (5, 3, 120), self.row.id: (3, 10, 50), self.press.id: (4, 8, 40)}
+        self.assertEqual(self.stored(), expected)
+        self.assertEqual({item["exercise_id"] for item in response.json()["exercise_sets"]}, set(expected))
+        self.plan.refresh_from_db()
+        self.assertEqual((self.plan.exercise_count, self.plan.total_volume), (3, 1800 + 1500 + 1280))
+
+    def test_put_replaces_the_plans_sets(self):
+        response = self.send("put", {"exercise_id": self.press.id, "sets": 4, "reps": 8, "weight": 40})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.stored(), {self.press.id: (4, 8, 40)})
+        self.plan.refresh_from_db()
+        self.assertEqual((self.plan.exercise_count, self.plan.total_volume), (1, 1280))
+
+    def test_put_with_empty_list_clears_the_plan(self):
+        response = self.send("put")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"exercise_sets": []})
+        self.assertEqual(self.stored(), {})
+
+    def test_rejected_batches_change_nothing(self):
+        before = self.stored()
+        duplicate = {"exercise_id": self.press.id, "sets": 1, "reps": 1, "weight": 1}
+        unknown = {"exercise_id": self.press.id + 1000, "sets": 1, "reps": 1, "weight": 1}
+
+        self.assertEqual(self.send("put", duplicate, duplicate).status_code, 400)
+        self.assertEqual(self.send("put", duplicate, unknown).status_code, 400)
+        response = self.send("put", {"exercise_id": self.press.id, "sets": "many"})
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(response.json()["errors"])
+        self.assertEqual(self.stored(), before)
+
+    def test_other_users_plan_is_not_found(self):
+        other = WorkoutPlan.objects.create(
+            creator=User.objects.create(email="other-batch@example.com", password="!"), name="Other", description=""
+        )
+        url = reverse("tracker:api_plan_exercise_sets", args=[other.id])
+
+        self.assertEqual(self.send("put", url=url).status_code, 404)
+        self.assertEqual(
+            self.send("patch", url=reverse("tracker:api_plan_exercise_sets", args=[other.id + 1000])).status_code, 404
+        )
+
+
+@override_settings(COMPRESSION_MIN_SIZE=512)
+class CompressionMiddlewareTests(SimpleTestCase):
+    BODY = b"<tr><td>Squat</td><td>5 x 5</td></tr>" * 100
+
+    def process(self, response, accept_encoding: str = "gzip"):
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING=accept_encoding)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_negotiation_honours_q_values_and_preference(self):
+        self.assertEqual(negotiate("gzip"), "gzip")
+        self.assertEqual(negotiate("gzip;q=0.5, br"), "br" if compression.brotli else "gzip")
+        self.assertEqual(negotiate("br;q=0, gzip"), "gzip")
+        self.assertEqual(negotiate("*"), compression.supported_codings()[0])
+        self.assertIsNone(negotiate("gzip;q=0, deflate"))
+        self.assertIsNone(negotiate(""))
+
+    def test_large_html_is_compressed(self):
+        response = self.process(HttpResponse(self.BODY, headers={"ETag": '"abc"'}))
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), self.BODY)
+        self.assertEqual(response["Content-Length"], str(len(response.content)))
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(response["ETag"], 'W/"abc"')
+
+    @skipUnless(compression.brotli, "brotli is not installed")
+    def test_brotli_is_preferred_when_accepted(self):
+        response = self.process(HttpResponse(self.BODY), "gzip, br")
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(compression.brotli.decompress(response.content), self.BODY)
+
+    def test_small_and_binary_responses_are_untouched(self):
+        for response in (HttpResponse(b"<p>ok</p>"), HttpResponse(self.BODY, content_type="image/png")):
+            with self.subTest(content_type=response["Content-Type"]):
+                processed = self.process(response)
+                self.assertFalse(processed.has_header("Content-Encoding"))
+                self.assertFalse(processed.has_header("Vary"))
+
+    def test_uncompressed_response_still_varies_on_accept_encoding(self):
+        response = self.process(HttpResponse(self.BODY), accept_encoding="identity")
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(response.content, self.BODY)
+        self.assertIn("Accept-Encoding", response["Vary"])
+
+    def test_streaming_response_is_compressed_incrementally(self):
+        rows = [f"{day},80.5\n".encode() for day in range(1000)]
+        response = self.process(StreamingHttpResponse(iter(rows), content_type="text/csv"))
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertFalse(response.has_header("Content-Length"))
+        self.assertEqual(gzip.decompress(b"".join(response.streaming_content)), b"".join(rows))
+
+    async def test_async_streaming_response_is_compressed(self):
+        async def rows():
+            for day in range(1000):
+                yield f"{day},80.5\n".encode()
+
+        response = self.process(StreamingHttpResponse(rows(), content_type="application/x-ndjson"))
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        body = b"".join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(gzip.decompress(body), b"".join(f"{day},80.5\n".encode() for day in range(1000)))
+
+
+@override_settings(QUERY_REPEAT_THRESHOLD=3, QUERY_RAISE_ON_REPEAT=False, QUERY_SERVER_TIMING=False)
+class QueryInstrumentationTests(TestCase):
+    @staticmethod
+    def view(lookups: int):
+        def get_response(request):
+            for pk in range(lookups):
+                Exercise.objects.filter(pk=pk).first()
+            return HttpResponse("ok")
+
+        return get_response
+
+    def process(self, get_response):
+        return QueryInstrumentationMiddleware(get_response)(RequestFactory().get("/exercises/"))
+
+    def test_fingerprint_collapses_literals_and_parameter_lists(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE  id IN (%s, %s, %s) AND name = 'O''Brien' LIMIT 21"),
+            fingerprint("SELECT * FROM t WHERE id IN (%s, %s) AND name = 'x' LIMIT 1"),
+        )
+
+    @override_settings(QUERY_SERVER_TIMING=True)
+    def test_server_timing_reports_the_request_queries(self):
+        response = self.process(self.view(2))
+        self.assertRegex(response["Server-Timing"], r'^db;dur=[\d.]+;desc="2 queries", app;dur=[\d.]+$')
+
+    def test_server_timing_is_off_by_default(self):
+        self.assertFalse(self.process(self.view(2)).has_header("Server-Timing"))
+
+    @override_settings(QUERY_RAISE_ON_REPEAT=True)
+    def test_repeated_queries_raise_in_raise_mode(self):
+        self.process(self.view(2))
+        with self.assertRaisesMessage(NPlusOneError, "3x SELECT"):
+            self.process(self.view(3))
+
+    def test_repeated_queries_are_logged_otherwise(self):
+        with self.assertLogs("config.query_instrumentation", "WARNING") as logs:
+            response = self.process(self.view(3))
+        self.assertEqual(response.content, b"ok")
+        self.assertIn("Repeated queries in GET /exercises/", logs.output[0])
+
+    @override_settings(QUERY_SERVER_TIMING=True)
+    async def test_async_views_are_counted_on_the_orm_thread(self):
+        async def get_response(request):
+            await Exercise.objects.filter(pk=0).afirst()
+            return HttpResponse("ok")
+
+        response = await self.process(get_response)
+        self.assertIn('desc="1 queries"', response["Server-Timing"])
+
+
+@override_settings(CACHES=LOCMEM_CACHES, METRICS_ENABLED=True, METRICS_TOKEN="", METRICS_ALLOWED_IPS=["127.0.0.1"])
+class MetricsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create(email="metrics@example.com", password="!")
+        plan = WorkoutPlan.objects.create(creator=user, name="Plan", description="")
+        WorkoutSession.objects.create(user=user, plan=plan, duration_minutes=0, start_time=timezone.now())
+
+    def setUp(self):
+        caches["default"].clear()
+
+    def scrape(self, **headers):
+        return metrics_view(RequestFactory().get("/metrics", **headers))
+
+    def test_only_allowlisted_addresses_and_the_token_may_scrape(self):
+        self.assertEqual(self.scrape().status_code, HTTPStatus.OK)
+        outside = {"REMOTE_ADDR": "203.0.113.7"}
+        self.assertEqual(self.scrape(**outside).status_code, HTTPStatus.FORBIDDEN)
+        self.assertEqual(self.scrape(**outside, HTTP_AUTHORIZATION="Bearer ").status_code, HTTPStatus.FORBIDDEN)
+
+        with override_settings(METRICS_TOKEN="s3cret"):
+            self.assertEqual(self.scrape(**outside, HTTP_AUTHORIZATION="Bearer s3cret").status_code, HTTPStatus.OK)
+            self.assertEqual(self.scrape(**outside, HTTP_AUTHORIZATION="Bearer wrong").status_code, HTTPStatus.FORBIDDEN)
+            self.assertEqual(self.scrape(**outside, HTTP_AUTHORIZATION="Bearer sécret").status_code, HTTPStatus.FORBIDDEN)
+
+    def test_active_sessions_are_counted_once_per_cache_interval(self):
+        with self.assertNumQueries(1):
+            body = self.scrape().content.decode()
+        self.assertIn("workout_sessions_active 1.0", body)
+
+        with self.assertNumQueries(0):
+            self.scrape()
+        caches["default"].delete(ACTIVE_SESSIONS_CACHE_KEY)
+        with self.assertNumQueries(1):
+            self.scrape()
+
+    def test_requests_are_recorded_by_the_metrics_middleware(self):
+        labels = {"view": "metrics", "method": "GET", "status": "200"}
+        before = REGISTRY.get_sample_value("http_request_duration_seconds_count", labels) or 0
+
+        self.client.get("/metrics")
+        self.assertEqual(REGISTRY.get_sample_value("http_request_duration_seconds_count", labels), before + 1)
+        self.assertIn('http_request_db_queries_count{view="metrics"}', self.client.get("/metrics").content.decode())
+
+        with override_settings(METRICS_ENABLED=False):
+            self.client.get("/metrics")
+        self.assertEqual(REGISTRY.get_sample_value("http_request_duration_seconds_count", labels), before + 2)
+
+
+@dataclass(frozen=True)
+class ViewBudget:
+    url: str
+    queries: int
+    milliseconds: int = 250
+    method: str = "get"
+    data: Any = None
+    content_type: str | None = None
+    status: int = HTTPStatus.OK
+    user: User | None = None  # defaults to the test case's user
+
+
+# Applied to every ViewBudgetMixin test case.
+VIEW_BUDGET_SETTINGS = {
+    "CACHES": LOCMEM_CACHES,
+    "STORAGES": UNHASHED_STATIC_STORAGES,
+    "SESSION_ENGINE": "django.contrib.sessions.backends.db",
+    "QUERY_RAISE_ON_REPEAT": True,
+}
+
+
+class ViewBudgetMixin:
+    """Hold every URL of ``urlconf`` to a maximum query count and a wall-time budget.
+
+    Each request starts from empty caches, so the count is the cold-cache worst case, and runs in a
+    savepoint that is rolled back, so writes do not change what later requests see. Besides the
+    budget, ``QueryInstrumentationMiddleware`` raises on any statement repeated
+    ``QUERY_REPEAT_THRESHOLD`` times. When a view legitimately needs more queries, raise its budget
+    in the same change that explains why.
+    """
+
+    urlconf: str
+
+    def budgets(self) -> list[ViewBudget]:
+        raise NotImplementedError()
+
+    def test_every_url_has_a_budget(self):
+        budgeted = {resolve(urlsplit(budget.url).path).url_name for budget in self.budgets()}
+        names = {pattern.name for pattern in import_module(self.urlconf).urlpatterns}
+        self.assertEqual(names - budgeted, set(), "URLs without a query budget")
+
+    def test_views_stay_within_budget(self):
+        for budget in self.budgets():
+            with self.subTest(f"{budget.method.upper()} {budget.url}"):
+                self.assert_within_budget(budget)
+
+    def assert_within_budget(self, budget: ViewBudget) -> None:
+        for cache in caches.all():
+            cache.clear()
+        clear_caches()
+        self.client.cookies.clear()
+        log_in(self.client, budget.user or self.user)
+        request = getattr(self.client, budget.method)
+        kwargs = {"content_type": budget.content_type} if budget.content_type else {}
+
+        with transaction.atomic(), CaptureQueriesContext(connection) as ctx:
+            started = time.perf_counter()
+            response = request(budget.url, budget.data, **kwargs)
+            if response.streaming:
+                b"".join(response.streaming_content)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            transaction.set_rollback(True)
+
+        label = f"{budget.method.upper()} {budget.url}"
+        self.assertEqual(response.status_code, budget.status, f"{label} answered {response.status_code}")
+        errors = [str(m) for m in messages.get_messages(response.wsgi_request) if m.level >= messages.WARNING]
+        self.assertEqual(errors, [], f"{label} took its error path")
+        statements = "\n".join(q["sql"] for q in ctx.captured_queries)
+        self.assertLessEqual(len(ctx), budget.queries, f"{label} ran {len(ctx)} queries:\n{statements}")
+        limit_ms = budget.milliseconds * TIME_BUDGET_SCALE
+        self.assertLessEqual(elapsed_ms, limit_ms, f"{label} took {elapsed_ms:.0f}ms")
+
+
+@override_settings(**VIEW_BUDGET_SETTINGS)
+class TrackerViewBudgetTests(ViewBudgetMixin, TestCase):
+    urlconf = "tracker.urls"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email="budget@example.com", password="!")
+        exercises = Exercise.objects.bulk_create(
+            [Exercise(name=f"Exercise {i}", type=f"Type {i % 8}", description=f"Description of exercise {i}") for i in range(300)]
+        )
+        plans = WorkoutPlan.objects.bulk_create(
+            [WorkoutPlan(creator=cls.user, name=f"Plan {i}", description="", exercise_count=8) for i in range(25)]
+        )
+        ExerciseSet.objects.bulk_create(
+            [
+                ExerciseSet(workout_plan=plan, exercise=exercises[(p * 8 + i) % len(exercises)], sets=3, reps=10, weight=40)
+                for p, plan in enumerate(plans)
+                for i in range(8)
+            ]
+        )
+        now = timezone.now()
+        sessions = WorkoutSession.objects.bulk_create(
+            [
+                WorkoutSession(
+                    user=cls.user,
+                    plan=plans[i % len(plans)],
+                    duration_minutes=45,
+                    status=WorkoutSession.Status.COMPLETED,
+                    start_time=now - timedelta(days=i),
+                )
+                for i in range(400)
+            ]
+        )
+        weights = WeightTracker.objects.bulk_create(
+            [WeightTracker(user=cls.user, date=date(2024, 1, 1) + timedelta(days=i), weight=85 - i / 50) for i in range(730)]
+        )
+        # Sessions can only be started without an active one and finished with one, so a second user holds it.
+        cls.trainee = User.objects.create(email="trainee@example.com", password="!")
+        cls.active_session = WorkoutSession.objects.create(
+            user=cls.trainee, plan=plans[0], duration_minutes=0, status=WorkoutSession.Status.ACTIVE, start_time=now
+        )
+        get_training_aggregate_repository().rebuild([cls.user.id, cls.trainee.id])
+        cls.exercise, cls.plan, cls.session, cls.weight = exercises[0], plans[0], sessions[0], weights[-1]
+        cls.exercise_set = ExerciseSet.objects.filter(workout_plan=cls.plan).first()
+
+    def budgets(self) -> list[ViewBudget]:
+        found = HTTPStatus.FOUND
+        exercise, plan, session, weight = self.exercise.id, self.plan.id, self.session.id, self.weight.id
+        exercise_form = {"name": "Budget squat", "type": "Legs", "description": "Budgeted"}
+        plan_form = {"name": "Budget plan", "description": "Budgeted"}
+        return [
+            ViewBudget(reverse("tracker:index"), queries=1),
+            ViewBudget(reverse("tracker:exercises_list"), queries=3),
+            ViewBudget(reverse("tracker:exercises_list") + "?search=exercise&type=Type+1", queries=3),
+            ViewBudget(reverse("tracker:exercise_detail", args=[exercise]), queries=4),
+            ViewBudget(reverse("tracker:exercise_create"), queries=1),
+            ViewBudget(reverse("tracker:exercise_create"), queries=2, method="post", data=exercise_form, status=found),
+            ViewBudget(reverse("tracker:exercise_update", args=[exercise]), queries=2),
+            ViewBudget(
+                reverse("tracker:exercise_update", args=[exercise]), queries=3, method="post", data=exercise_form, status=found
+            ),
+            ViewBudget(reverse("tracker:exercise_delete", args=[exercise]), queries=8, method="post", status=found),
+            ViewBudget(reverse("tracker:api_exercises") + "?limit=100", queries=2),
+            ViewBudget(
+                reverse("tracker:api_exercises"),
+                queries=2,
+                method="post",
+                data=exercise_form,
+                content_type="application/json",
+                status=HTTPStatus.CREATED,
+            ),
+            ViewBudget(reverse("tracker:api_exercise_detail", args=[exercise]), queries=2),
+            ViewBudget(
+                reverse("tracker:api_exercise_detail", args=[exercise]),
+                queries=3,
+                method="patch",
+                data={"name": "Budget press"},
+                content_type="application/json",
+            ),
+            ViewBudget(
+                reverse("tracker:api_exercise_detail", args=[exercise]), queries=8, method="delete", status=HTTPStatus.NO_CONTENT
+            ),
+            ViewBudget(reverse("tracker:plans_list"), queries=2),
+            ViewBudget(reverse("tracker:plan_detail", args=[plan]), queries=3),
+            ViewBudget(reverse("tracker:plan_create"), queries=1),
+            ViewBudget(reverse("tracker:plan_create"), queries=2, method="post", data=plan_form, status=found),
+            ViewBudget(reverse("tracker:plan_update", args=[plan]), queries=2),
+            ViewBudget(reverse("tracker:plan_update", args=[plan]), queries=5, method="post", data=plan_form, status=found),
+            ViewBudget(reverse("tracker:plan_delete", args=[plan]), queries=8, method="post", status=found),
+            ViewBudget(reverse("tracker:api_plan_exercise_sets", args=[plan]), queries=3),
+            ViewBudget(
+                reverse("tracker:api_plan_exercise_sets", args=[plan]),
+                queries=10,
+                method="put",
+                data={"exercise_sets": [{"exercise_id": e.id, "reps": 8} for e in Exercise.objects.order_by("id")[:12]]},
+                content_type="application/json",
+            ),
+            ViewBudget(
+                reverse("tracker:exercise_set_delete", args=[self.exercise_set.id]), queries=8, method="post", status=found
+            ),
+            ViewBudget(reverse("tracker:plan_add_exercise", args=[plan]), queries=3),
+            ViewBudget(
+                reverse("tracker:plan_add_exercise", args=[plan]),
+                queries=6,
+                method="post",
+                data={"exercise_id": Exercise.objects.order_by("-id").first().id, "sets": 4, "reps": 6, "weight": 60},
+                status=found,
+            ),
+            ViewBudget(reverse("tracker:sessions_list"), queries=2),
+            ViewBudget(reverse("tracker:session_detail", args=[session]), queries=2),
+            ViewBudget(
+                reverse("tracker:session_detail", args=[self.active_session.id]),
+                queries=6,
+                method="post",
+                data={"status": "completed"},
+                status=found,
+                user=self.trainee,
+            ),
+            ViewBudget(
+                reverse("tracker:session_detail", args=[self.active_session.id]),
+                queries=6,
+                method="patch",
+                data={"status": "completed"},
+                content_type="application/json",
+                user=self.trainee,
+            ),
+            ViewBudget(reverse("tracker:session_start", args=[plan]), queries=7, method="post", status=found),
+            ViewBudget(reverse("tracker:api_training_summary") + "?period=week&limit=100", queries=2),
+            ViewBudget(
+                reverse("tracker:api_session_detail", args=[self.active_session.id]),
+                queries=6,
+                method="patch",
+                data={"status": "completed"},
+                content_type="application/json",
+                user=self.trainee,
+            ),
+            ViewBudget(
+                reverse("tracker:api_session_detail", args=[session]), queries=7, method="delete", status=HTTPStatus.NO_CONTENT
+            ),
+            ViewBudget(
+                reverse("tracker:session_delete", args=[session]), queries=7, method="delete", status=HTTPStatus.NO_CONTENT
+            ),
+            ViewBudget(reverse("tracker:weight_tracker_list"), queries=3),
+            ViewBudget(
+                reverse("tracker:weight_tracker_list"),
+                queries=2,
+                method="post",
+                data={"date": "2030-01-01", "weight": "80.5"},
+                status=found,
+            ),
+            ViewBudget(reverse("tracker:api_weight_trend") + "?series=1", queries=3),
+            ViewBudget(
+                reverse("tracker:api_weight_tracker_import"),
+                queries=4,
+                milliseconds=500,
+                method="post",
+                data="date,weight\n" + "".join(f"{date(2031, 1, 1) + timedelta(days=i)},{80 - i / 100}\n" for i in range(365)),
+                content_type="text/csv",
+                status=HTTPStatus.CREATED,
+            ),
+            ViewBudget(reverse("tracker:api_history_export") + "?format=csv", queries=4, milliseconds=500),
+            ViewBudget(reverse("tracker:weight_tracker_detail", args=[weight]), queries=2),
+            ViewBudget(
+                reverse("tracker:weight_tracker_detail", args=[weight]),
+                queries=3,
+                method="post",
+                data={"_method": "delete"},
+                status=found,
+            ),
+        ]
@@ -18,12 +18,18 @@ urlpatterns = [
     path("plans/create/", views.WorkoutPlanCreateView.as_view(), name="plan_create"),
     path("plans/<int:plan_id>/update/", views.WorkoutPlanUpdateView.as_view(), name="plan_update"),
     path("plans/<int:plan_id>/delete/", views.WorkoutPlanDeleteView.as_view(), name="plan_delete"),
+    path("api/plans/<int:plan_id>/exercise-sets/", views.ApiPlanExerciseSetsView.as_view(), name="api_plan_exercise_sets"),
     path("exercise-sets/<int:es_id>/delete/", views.ExerciseSetDeleteView.as_view(), name="exercise_set_delete"),
     path("plans/<int:plan_id>/add-exercise/", views.WorkoutPlanAddExerciseView.as_view(), name="plan_add_exercise"),
     path("sessions/", views.WorkoutSessionListView.as_view(), name="sessions_list"),
     path("sessions/<int:session_id>/", views.WorkoutSessionDetailView.as_view(), name="session_detail"),
     path("plans/<int:plan_id>/session/start/", views.WorkoutSessionStartView.as_view(), name="session_start"),
+    path("api/sessions/summary/", views.ApiTrainingSummaryView.as_view(), name="api_training_summary"),
+    path("api/sessions/<int:session_id>/", views.ApiWorkoutSessionDetailView.as_view(), name="api_session_detail"),
     path("sessions/<int:session_id>/delete/", views.WorkoutSessionDeleteView.as_view(), name="session_delete"),
     path("weight-tracker/", views.WeightTrackerListView.as_view(), name="weight_tracker_list"),
+    path("api/weight-tracker/trend/", views.ApiWeightTrendView.as_view(), name="api_weight_trend"),
+    path("api/weight-tracker/import/", views.ApiWeightTrackerImportView.as_view(), name="api_weight_tracker_import"),
+    path("api/export/", views.ApiHistoryExportView.as_view(), name="api_history_export"),
     path("weight-tracker/<int:weight_tracker_id>/", views.WeightTrackerDetailView.as_view(), name="weight_tracker_detail"),
 ]
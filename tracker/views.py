@@ -1,33 +1,58 @@
 import json
 import logging
+from datetime import datetime
+from http import HTTPStatus
 from typing import Any
 
+from asgiref.sync import async_to_sync
 from django.contrib import messages
 from django.http import HttpRequest
 from django.http import HttpResponse
-from django.http import JsonResponse
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.shortcuts import redirect
 from django.shortcuts import render
 from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.cache import patch_cache_control
+from django.utils.http import http_date
 from django.views import View
 from django.views.generic import TemplateView
+from pydantic import ValidationError
 
 from .forms import ExerciseForm
 from .forms import WorkoutPlanForm
 from .models import Exercise
 from .models import ExerciseSet
 from .models import WorkoutPlan
-from .models import WorkoutSession
+from .repository.pagination import clamp_limit
 from .repository.session import get_session_repository
+from .schemas.exercise_set_schema import ExerciseSetBatchSchema
+from .schemas.workout_session_schema import TrainingAggregateSchema
+from .schemas.workout_session_schema import WorkoutSessionSchema
+from .serialization import SchemaJsonResponse
+from .serialization import validate_rows
+from .service.catalog_cache import catalog_cache
+from .service.data_version import bump_plan_data_version
+from .service.data_version import get_data_version
+from .service.data_version import version_timestamp
 from .service.exceptions import ServiceError
-from .service.exercise import create_exercise
+from .service.exercise import acreate_exercise
+from .service.exercise import adelete_exercise
+from .service.exercise import aget_exercise_by_id
+from .service.exercise import alist_exercises
+from .service.exercise import aupdate_exercise
 from .service.exercise import delete_exercise
-from .service.exercise import get_exercise_by_id
-from .service.exercise import update_exercise
+from .service.exercise import get_exercise_catalog
+from .service.exercise import get_exercise_types
+from .service.exercise import list_exercises
 from .service.exercise_set import add_exercise_set
 from .service.exercise_set import delete_exercise_set
+from .service.exercise_set import list_exercise_sets
+from .service.exercise_set import save_exercise_sets
+from .service.export import stream_history
 from .service.session import get_session_service
+from .service.weight_import import detect_format
 from .service.weight_tracker import get_weight_tracker_service
 
 logger = logging.getLogger(__name__)
@@ -36,6 +61,37 @@ session_service = get_session_service()
 weight_tracker_service = get_weight_tracker_service()
 
 
+def next_page_query(request: HttpRequest, next_cursor: str | None) -> str | None:
+    if not next_cursor:
+        return None
+    query = request.GET.copy()
+    query["cursor"] = next_cursor
+    return query.urlencode()
+
+
+def version_etag(scope: str, version: int) -> str:
+    # Weak: the same data is rendered with a fresh CSRF token and may be re-encoded by compression.
+    return f'W/"{scope}-{version}"'
+
+
+def not_modified(request: HttpRequest, etag: str, last_modified: datetime | None = None) -> HttpResponse | None:
+    """A 304 carrying the validators when the client's copy is still current, otherwise None."""
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(last_modified.timestamp()) if last_modified else None
+    )
+    return with_validators(response, etag, last_modified) if response is not None else None
+
+
+def with_validators(response: HttpResponse, etag: str, last_modified: datetime | None = None) -> HttpResponse:
+    if response.status_code in (HTTPStatus.OK, HTTPStatus.NOT_MODIFIED):
+        response.headers["ETag"] = etag
+        if last_modified:
+            response.headers["Last-Modified"] = http_date(last_modified.timestamp())
+        # Per-user data: browsers may keep it but must revalidate, shared caches must not store it.
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
 class IndexView(TemplateView):
     template_name = "index.html"
 
@@ -48,22 +104,24 @@ class IndexView(TemplateView):
 
 class ExerciseListView(View):
     def get(self, request: HttpRequest) -> HttpResponse:
-        exercises = Exercise.objects.all()
         search = request.GET.get("search", "")
-        if search:
-            exercises = exercises.filter(name__icontains=search)
-
         exercise_type = request.GET.get("type", "")
-        if exercise_type:
-            exercises = exercises.filter(type=exercise_type)
 
-        types = Exercise.objects.values_list("type", flat=True).distinct()
+        try:
+            page = list_exercises(search, exercise_type, request.GET.get("cursor"), clamp_limit(request.GET.get("limit")))
+        except ServiceError as e:
+            logger.warning(f"Exercise list load failed: {e}")
+            messages.error(request, "Unable to load exercises.")
+            return redirect("tracker:exercises_list")
+
+        types = get_exercise_types()
 
         return render(
             request,
             "exercises/list.html",
             {
-                "exercises": exercises,
+                "exercises": page.items,
+                "next_query": next_page_query(request, page.next_cursor),
                 "types": types,
                 "search": search,
                 "selected_type": exercise_type,
@@ -126,6 +184,7 @@ class WorkoutPlanUpdateView(View):
         form = WorkoutPlanForm(request.POST, instance=plan)
         if form.is_valid():
             form.save()
+            bump_plan_data_version([plan.id])
             messages.success(request, "Workout plan updated.")
             return redirect("tracker:plan_detail", plan_id=plan.id)
         return render(request, "plans/form.html", {"form": form, "mode": "update", "plan": plan})
@@ -139,6 +198,7 @@ class WorkoutPlanDeleteView(View):
 
     def post(self, request, plan_id: int):
         plan = get_object_or_404(WorkoutPlan, id=plan_id, creator_id=request.session["user_id"])
+        bump_plan_data_version([plan.id])
         plan.delete()
         messages.success(request, "Workout plan deleted.")
         return redirect("tracker:plans_list")
@@ -201,8 +261,7 @@ class WorkoutPlanAddExerciseView(View):
 
     def get(self, request, plan_id: int):
         plan = get_object_or_404(WorkoutPlan, id=plan_id, creator_id=request.session["user_id"])
-        exercises = Exercise.objects.all().order_by("name")
-        return render(request, "plans/add_exercise.html", {"plan": plan, "exercises": exercises})
+        return render(request, "plans/add_exercise.html", {"plan": plan, "exercises": get_exercise_catalog()})
 
     def post(self, request, plan_id: int):
         plan = get_object_or_404(WorkoutPlan, id=plan_id, creator_id=request.session["user_id"])
@@ -235,82 +294,127 @@ class WorkoutPlanAddExerciseView(View):
 
 
 class ApiExerciseListView(View):
-    def dispatch(self, request: HttpRequest, *args, **kwargs):
-        if not request.session.get("user_id"):
-            return JsonResponse({"detail": "Authentication required"}, status=401)
-        return super().dispatch(request, *args, **kwargs)
+    async def dispatch(self, request: HttpRequest, *args, **kwargs):
+        if not await request.session.aget("user_id"):
+            return SchemaJsonResponse({"detail": "Authentication required"}, status=401)
+        return await super().dispatch(request, *args, **kwargs)
 
-    def get(self, request: HttpRequest) -> JsonResponse:
+    async def get(self, request: HttpRequest) -> HttpResponse:
         search = request.GET.get("search", "")
         exercise_type = request.GET.get("type", "")
+        etag = version_etag("catalog", await catalog_cache.aversion())
+        if response := not_modified(request, etag):
+            return response
 
-        qs = Exercise.objects.all()
-        if search:
-            qs = qs.filter(name__icontains=search)
-        if exercise_type:
-            qs = qs.filter(type=exercise_type)
+        try:
+            page = await alist_exercises(search, exercise_type, request.GET.get("cursor"), clamp_limit(request.GET.get("limit")))
+        except ServiceError as e:
+            logger.warning(f"Service error listing exercises: {e}")
+            return SchemaJsonResponse({"detail": "Invalid page cursor."}, status=e.code)
 
-        data = list(qs.values("id", "name", "type", "description"))
-        return JsonResponse({"results": data}, status=200)
+        return with_validators(SchemaJsonResponse({"results": page.items, "next_cursor": page.next_cursor}, status=200), etag)
 
-    def post(self, request: HttpRequest) -> JsonResponse:
+    async def post(self, request: HttpRequest) -> SchemaJsonResponse:
         try:
             payload = json.loads(request.body.decode("utf-8"))
         except json.JSONDecodeError:
-            return JsonResponse({"detail": "Invalid JSON"}, status=400)
+            return SchemaJsonResponse({"detail": "Invalid JSON"}, status=400)
 
         try:
-            exercise = create_exercise(payload)
+            exercise = await acreate_exercise(payload)
         except ServiceError as e:
             logger.warning(f"Service error creating exercise: {e}")
-            return JsonResponse({"detail": "Failed to create exercise."}, status=e.code)
+            return SchemaJsonResponse({"detail": "Failed to create exercise."}, status=e.code)
 
-        return JsonResponse(exercise.model_dump(), status=201)
+        return SchemaJsonResponse(exercise, status=201)
 
 
 class ApiExerciseDetailView(View):
-    def dispatch(self, request, *args, **kwargs):
-        if not request.session.get("user_id"):
-            return JsonResponse({"detail": "Authentication required"}, status=401)
-        return super().dispatch(request, *args, **kwargs)
+    async def dispatch(self, request, *args, **kwargs):
+        if not await request.session.aget("user_id"):
+            return SchemaJsonResponse({"detail": "Authentication required"}, status=401)
+        return await super().dispatch(request, *args, **kwargs)
+
+    async def get(self, request: HttpRequest, exercise_id: int) -> HttpResponse:
+        etag = version_etag("catalog", await catalog_cache.aversion())
+        if response := not_modified(request, etag):
+            return response
 
-    def get(self, request: HttpRequest, exercise_id: int) -> JsonResponse:
         try:
-            exercise = get_exercise_by_id(exercise_id)
+            exercise = await aget_exercise_by_id(exercise_id)
         except ServiceError as e:
             logger.warning(f"Service error loading exercise {exercise_id}: {e}")
-            return JsonResponse({"detail": "Failed to load exercise."}, status=e.code)
+            return SchemaJsonResponse({"detail": "Failed to load exercise."}, status=e.code)
 
-        return JsonResponse(exercise.model_dump(), status=200)
+        return with_validators(SchemaJsonResponse(exercise, status=200), etag)
 
-    def put(self, request: HttpRequest, exercise_id: int) -> JsonResponse:
-        return self.update(request, exercise_id, full=True)
+    async def put(self, request: HttpRequest, exercise_id: int) -> SchemaJsonResponse:
+        return await self.update(request, exercise_id, full=True)
 
-    def patch(self, request: HttpRequest, exercise_id: int) -> JsonResponse:
-        return self.update(request, exercise_id, full=False)
+    async def patch(self, request: HttpRequest, exercise_id: int) -> SchemaJsonResponse:
+        return await self.update(request, exercise_id, full=False)
 
-    def delete(self, request: HttpRequest, exercise_id: int) -> JsonResponse:
+    async def delete(self, request: HttpRequest, exercise_id: int) -> SchemaJsonResponse:
         try:
-            delete_exercise(exercise_id)
+            await adelete_exercise(exercise_id)
         except ServiceError as e:
             logger.warning(f"Service error deleting exercise {exercise_id}: {e}")
-            return JsonResponse({"detail": "Failed to delete exercise."}, status=e.code)
+            return SchemaJsonResponse({"detail": "Failed to delete exercise."}, status=e.code)
 
-        return JsonResponse({"deleted": True}, status=204)
+        return SchemaJsonResponse({"deleted": True}, status=204)
 
-    def update(self, request: HttpRequest, exercise_id: int, full: bool) -> JsonResponse:
+    async def update(self, request: HttpRequest, exercise_id: int, full: bool) -> SchemaJsonResponse:
         try:
             payload = json.loads(request.body.decode("utf-8"))
         except json.JSONDecodeError:
-            return JsonResponse({"detail": "Invalid JSON"}, status=400)
+            return SchemaJsonResponse({"detail": "Invalid JSON"}, status=400)
 
         try:
-            updated = update_exercise(exercise_id, payload, full=full)
+            updated = await aupdate_exercise(exercise_id, payload, full=full)
         except ServiceError as e:
             logger.warning(f"Service error updating exercise {exercise_id}: {e}")
-            return JsonResponse({"detail": "Failed to update exercise."}, status=e.code)
+            return SchemaJsonResponse({"detail": "Failed to update exercise."}, status=e.code)
 
-        return JsonResponse(updated.model_dump(), status=200)
+        return SchemaJsonResponse(updated, status=200)
+
+
+class ApiPlanExerciseSetsView(View):
+    def dispatch(self, request: HttpRequest, *args, **kwargs):
+        user_id = request.session.get("user_id")
+        if not user_id:
+            return SchemaJsonResponse({"detail": "Authentication required"}, status=401)
+        if not WorkoutPlan.objects.filter(id=kwargs["plan_id"], creator_id=user_id).exists():
+            return SchemaJsonResponse({"detail": "Workout plan not found."}, status=404)
+        return super().dispatch(request, *args, **kwargs)
+
+    def get(self, request: HttpRequest, plan_id: int) -> SchemaJsonResponse:
+        return SchemaJsonResponse({"exercise_sets": list_exercise_sets(plan_id)}, status=200)
+
+    def put(self, request: HttpRequest, plan_id: int) -> SchemaJsonResponse:
+        return self.save(request, plan_id, replace=True)
+
+    def patch(self, request: HttpRequest, plan_id: int) -> SchemaJsonResponse:
+        return self.save(request, plan_id, replace=False)
+
+    def save(self, request: HttpRequest, plan_id: int, replace: bool) -> SchemaJsonResponse:
+        try:
+            batch = ExerciseSetBatchSchema.model_validate_json(request.body)
+        except ValidationError as e:
+            return SchemaJsonResponse(
+                {
+                    "detail": "Invalid exercise sets payload.",
+                    "errors": e.errors(include_url=False, include_input=False, include_context=False),
+                },
+                status=400,
+            )
+
+        try:
+            sets = save_exercise_sets(plan_id, batch.exercise_sets, replace=replace)
+        except ServiceError as e:
+            logger.warning(f"Service error saving exercise sets of plan {plan_id}: {e}")
+            return SchemaJsonResponse({"detail": str(e)}, status=e.code)
+
+        return SchemaJsonResponse({"exercise_sets": sets}, status=200)
 
 
 class ExerciseCreateView(View):
@@ -327,6 +431,7 @@ class ExerciseCreateView(View):
         form = ExerciseForm(request.POST)
         if form.is_valid():
             form.save()
+            catalog_cache.invalidate()
             messages.success(request, "Exercise created.")
             return redirect("tracker:exercises_list")
         return render(request, "exercises/form.html", {"form": form, "mode": "create"})
@@ -348,6 +453,7 @@ class ExerciseUpdateView(View):
         form = ExerciseForm(request.POST, instance=exercise)
         if form.is_valid():
             form.save()
+            catalog_cache.invalidate()
             messages.success(request, "Exercise updated.")
             return redirect("tracker:exercise_detail", exercise_id=exercise.id)
         return render(request, "exercises/form.html", {"form": form, "mode": "update", "exercise": exercise})
@@ -357,8 +463,12 @@ class ExerciseDeleteView(View):
     def post(self, request: HttpRequest, exercise_id: int) -> HttpResponse:
         if not request.session.get("user_id"):
             return redirect("authentication:login")
-        exercise = get_object_or_404(Exercise, id=exercise_id)
-        exercise.delete()
+        try:
+            delete_exercise(exercise_id)
+        except ServiceError as e:
+            logger.warning(f"Service error deleting exercise {exercise_id}: {e}")
+            messages.error(request, "Unable to delete exercise.")
+            return redirect("tracker:exercises_list")
         messages.success(request, "Exercise deleted.")
         return redirect("tracker:exercises_list")
 
@@ -389,17 +499,30 @@ class WorkoutSessionListView(View):
 
     def get(self, request):
         user_id = request.session.get("user_id")
-        sessions = WorkoutSession.objects.filter(user_id=user_id).select_related("plan").order_by("-start_time")
-        return render(
+        version = get_data_version(user_id)
+        etag, last_modified = version_etag(f"user{user_id}", version), version_timestamp(version)
+        if response := not_modified(request, etag, last_modified):
+            return response
+
+        try:
+            page = session_service.get_page_by_user(user_id, request.GET.get("cursor"), clamp_limit(request.GET.get("limit")))
+        except ServiceError as e:
+            logger.warning(f"Workout session list load failed (user_id={user_id}): {e}")
+            messages.error(request, "Unable to load workout sessions.")
+            return redirect("tracker:sessions_list")
+
+        response = render(
             request,
             "session/list.html",
             {
-                "sessions": sessions,
+                "sessions": page.items,
+                "next_query": next_page_query(request, page.next_cursor),
                 "user_id": user_id,
                 "email": request.session.get("email"),
                 "now": timezone.now(),
             },
         )
+        return with_validators(response, etag, last_modified)
 
 
 class WorkoutSessionDetailView(View):
@@ -452,30 +575,69 @@ class WorkoutSessionDetailView(View):
 
         return redirect("tracker:sessions_list")
 
-    def patch(self, request: HttpRequest, session_id: int) -> JsonResponse:
-        user_id = request.session.get("user_id")
-        if not user_id:
-            return JsonResponse({"detail": "Authentication required"}, status=401)
+    def patch(self, request: HttpRequest, session_id: int) -> HttpResponse:
+        # A view cannot mix sync and async handlers; PATCH here keeps answering for clients of this URL.
+        return async_to_sync(ApiWorkoutSessionDetailView.as_view())(request, session_id=session_id)
+
+
+class ApiWorkoutSessionDetailView(View):
+    async def dispatch(self, request: HttpRequest, *args, **kwargs):
+        if not await request.session.aget("user_id"):
+            return SchemaJsonResponse({"detail": "Authentication required"}, status=401)
+        return await super().dispatch(request, *args, **kwargs)
+
+    async def patch(self, request: HttpRequest, session_id: int) -> SchemaJsonResponse:
+        user_id = await request.session.aget("user_id")
 
         try:
             payload = json.loads(request.body.decode("utf-8"))
         except json.JSONDecodeError:
-            return JsonResponse({"detail": "Invalid JSON payload"}, status=400)
+            return SchemaJsonResponse({"detail": "Invalid JSON payload"}, status=400)
 
         new_status = payload.get("status")
         if not new_status:
-            return JsonResponse({"detail": "Missing 'status' field"}, status=400)
+            return SchemaJsonResponse({"detail": "Missing 'status' field"}, status=400)
 
         if new_status != "completed":
-            return JsonResponse({"detail": "Only 'completed' status is supported."}, status=400)
+            return SchemaJsonResponse({"detail": "Only 'completed' status is supported."}, status=400)
 
         try:
-            session = session_service.finish_session(session_id, user_id)
+            session = await session_service.afinish_session(session_id, user_id)
         except ServiceError as e:
             logger.warning(f"Workout session finish failed (session_id={session_id}, user_id={user_id}): {e}")
-            return JsonResponse({"detail": "Unable to complete workout session."}, status=e.code)
+            return SchemaJsonResponse({"detail": "Unable to complete workout session."}, status=e.code)
+
+        return SchemaJsonResponse(WorkoutSessionSchema.model_validate(session), status=200)
+
+    async def delete(self, request: HttpRequest, session_id: int) -> SchemaJsonResponse:
+        user_id = await request.session.aget("user_id")
+
+        try:
+            await session_service.adelete_session(session_id, user_id)
+        except ServiceError as e:
+            logger.warning(f"Workout session delete failed (session_id={session_id}, user_id={user_id}): {e}")
+            return SchemaJsonResponse({"detail": "Unable to delete workout session."}, status=e.code)
 
-        return JsonResponse(session.model_dump(), status=200)
+        return SchemaJsonResponse({"message": "Workout session deleted"}, status=204)
+
+
+class ApiTrainingSummaryView(View):
+    def dispatch(self, request: HttpRequest, *args, **kwargs):
+        if not request.session.get("user_id"):
+            return SchemaJsonResponse({"detail": "Authentication required"}, status=401)
+        return super().dispatch(request, *args, **kwargs)
+
+    def get(self, request: HttpRequest) -> SchemaJsonResponse:
+        user_id = request.session["user_id"]
+        period = request.GET.get("period", "week")
+
+        try:
+            rows = session_service.get_training_summary(user_id, period, clamp_limit(request.GET.get("limit")))
+        except ServiceError as e:
+            logger.warning(f"Training summary load failed (user_id={user_id}, period={period}): {e}")
+            return SchemaJsonResponse({"detail": str(e)}, status=e.code)
+
+        return SchemaJsonResponse({"period": period, "results": validate_rows(TrainingAggregateSchema, rows)}, status=200)
 
 
 class WorkoutSessionStartView(View):
@@ -496,18 +658,18 @@ class WorkoutSessionStartView(View):
 
 
 class WorkoutSessionDeleteView(View):
-    def delete(self, request: HttpRequest, session_id: int) -> JsonResponse:
-        user_id = request.session.get("user_id")
+    async def delete(self, request: HttpRequest, session_id: int) -> SchemaJsonResponse:
+        user_id = await request.session.aget("user_id")
         if not user_id:
-            return JsonResponse({"detail": "Authentication required"}, status=401)
+            return SchemaJsonResponse({"detail": "Authentication required"}, status=401)
 
         try:
-            session_service.delete_session(session_id, user_id)
+            await session_service.adelete_session(session_id, user_id)
         except ServiceError as e:
             logger.warning(f"Workout session delete failed (session_id={session_id}, user_id={user_id}): {e}")
-            return JsonResponse({"detail": "Unable to delete workout session."}, status=e.code)
+            return SchemaJsonResponse({"detail": "Unable to delete workout session."}, status=e.code)
 
-        return JsonResponse({"message": "Workout session deleted"}, status=204)
+        return SchemaJsonResponse({"message": "Workout session deleted"}, status=204)
 
 
 class WeightTrackerListView(View):
@@ -518,23 +680,32 @@ class WeightTrackerListView(View):
 
     def get(self, request: HttpRequest) -> HttpResponse:
         user_id = request.session["user_id"]
+        version = get_data_version(user_id)
+        etag, last_modified = version_etag(f"user{user_id}", version), version_timestamp(version)
+        if response := not_modified(request, etag, last_modified):
+            return response
 
         try:
-            weight_trackers = weight_tracker_service.get_all_by_user(user_id)
+            page = weight_tracker_service.get_page_by_user(
+                user_id, request.GET.get("cursor"), clamp_limit(request.GET.get("limit"))
+            )
         except ServiceError as e:
             logger.warning(f"Weight tracker list load failed (user_id={user_id}): {e}")
             messages.error(request, "Unable to load weight tracker list.")
             return redirect("tracker:index")
 
-        return render(
+        response = render(
             request,
             "weight_tracker/list.html",
             {
-                "weight_trackers": weight_trackers,
+                "weight_trackers": page.items,
+                "trend": weight_tracker_service.get_trend(user_id),
+                "next_query": next_page_query(request, page.next_cursor),
                 "user_id": user_id,
                 "email": request.session.get("email"),
             },
         )
+        return with_validators(response, etag, last_modified)
 
     def post(self, request: HttpRequest) -> HttpResponse:
         user_id = request.session["user_id"]
@@ -561,6 +732,20 @@ class WeightTrackerListView(View):
         return redirect("tracker:weight_tracker_list")
 
 
+class ApiWeightTrendView(View):
+    def dispatch(self, request: HttpRequest, *args, **kwargs):
+        if not request.session.get("user_id"):
+            return SchemaJsonResponse({"detail": "Authentication required"}, status=401)
+        return super().dispatch(request, *args, **kwargs)
+
+    def get(self, request: HttpRequest) -> SchemaJsonResponse:
+        user_id = request.session["user_id"]
+        data = dict(weight_tracker_service.get_trend(user_id))
+        if request.GET.get("series"):
+            data["series"] = weight_tracker_service.get_trend_series(user_id)
+        return SchemaJsonResponse(data, status=200)
+
+
 class WeightTrackerDetailView(View):
     def dispatch(self, request: HttpRequest, *args, **kwargs):
         if not request.session.get("user_id"):
@@ -603,3 +788,51 @@ class WeightTrackerDetailView(View):
 
         messages.error(request, "Unknown action.")
         return redirect("tracker:weight_tracker_detail", weight_tracker_id=weight_tracker_id)
+
+
+class ApiWeightTrackerImportView(View):
+    def dispatch(self, request: HttpRequest, *args, **kwargs):
+        if not request.session.get("user_id"):
+            return SchemaJsonResponse({"detail": "Authentication required"}, status=401)
+        return super().dispatch(request, *args, **kwargs)
+
+    def post(self, request: HttpRequest) -> SchemaJsonResponse:
+        """Import weights from a multipart ``file`` field or from a raw CSV/JSONL request body."""
+        user_id = request.session["user_id"]
+        upload = request.FILES.get("file")
+
+        try:
+            if upload is not None:
+                fmt = detect_format(request.GET.get("format") or upload.name)
+                result = weight_tracker_service.import_weight_trackers(user_id, upload, fmt)
+            else:
+                fmt = detect_format(request.GET.get("format") or request.content_type)
+                result = weight_tracker_service.import_weight_trackers(user_id, request, fmt)
+        except ServiceError as e:
+            logger.warning(f"Weight import failed (user_id={user_id}): {e}")
+            return SchemaJsonResponse({"detail": str(e)}, status=e.code)
+
+        return SchemaJsonResponse(result, status=201 if result.created else 400)
+
+
+class ApiHistoryExportView(View):
+    content_types = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+    def dispatch(self, request: HttpRequest, *args, **kwargs):
+        if not request.session.get("user_id"):
+            return SchemaJsonResponse({"detail": "Authentication required"}, status=401)
+        return super().dispatch(request, *args, **kwargs)
+
+    def get(self, request: HttpRequest) -> HttpResponse:
+        user_id = request.session["user_id"]
+        fmt = request.GET.get("format", "csv")
+
+        try:
+            rows = stream_history(user_id, fmt)
+        except ServiceError as e:
+            logger.warning(f"History export failed (user_id={user_id}, format={fmt}): {e}")
+            return SchemaJsonResponse({"detail": str(e)}, status=e.code)
+
+        response = StreamingHttpResponse(rows, content_type=self.content_types[fmt])
+        response["Content-Disposition"] = f'attachment; filename="training-history-{timezone.localdate()}.{fmt}"'
+        return response